@@ -10,6 +10,7 @@ Provides a graphical interface for:
 """
 
 import io
+import tempfile
 import streamlit as st
 import sys
 from pathlib import Path
@@ -25,9 +26,10 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 # Import modules
 try:
-    from database import get_db_manager_from_env
+    from database import get_db_manager_from_env, page_key
+    from db_export import EXPORT_FORMATS, export_view
+    from db_writer import active_writers
     from pipeline import ComponentAnalysisPipeline
-    from psycopg2.extras import RealDictCursor
     DB_AVAILABLE = True
 except ImportError as e:
     st.error(f"Error importing modules: {e}")
@@ -39,6 +41,62 @@ try:
 except ImportError:
     DUAL_DETECTOR_AVAILABLE = False
 
+try:
+    from onnx_backend import onnxruntime_available
+except ImportError:
+    def onnxruntime_available() -> bool:
+        return False
+
+try:
+    from timing import StageTimer
+    TIMING_AVAILABLE = True
+except ImportError:
+    TIMING_AVAILABLE = False
+
+try:
+    from content_store import ContentStore, STORE_DIRNAME
+    CONTENT_STORE_AVAILABLE = True
+except ImportError:
+    CONTENT_STORE_AVAILABLE = False
+
+try:
+    from crop import CropEngine, CROP_STORAGES
+    CROP_ENGINE_AVAILABLE = True
+except ImportError:
+    CROP_STORAGES = ('files',)
+    CROP_ENGINE_AVAILABLE = False
+
+try:
+    from crop_archive import PACK_NAME, CropArchive
+    CROP_ARCHIVE_AVAILABLE = True
+except ImportError:
+    PACK_NAME = "crops.pack"
+    CROP_ARCHIVE_AVAILABLE = False
+
+try:
+    from virtual_crops import export_crops, load_crop, render_crop
+    VIRTUAL_CROPS_AVAILABLE = True
+except ImportError:
+    VIRTUAL_CROPS_AVAILABLE = False
+
+try:
+    from tile_pyramid import ensure_pyramid
+    TILE_PYRAMID_AVAILABLE = True
+except ImportError:
+    TILE_PYRAMID_AVAILABLE = False
+
+try:
+    from model_registry import get_registry
+    MODEL_REGISTRY_AVAILABLE = True
+except ImportError:
+    MODEL_REGISTRY_AVAILABLE = False
+
+try:
+    from inference_cache import get_inference_cache
+    INFERENCE_CACHE_AVAILABLE = True
+except ImportError:
+    INFERENCE_CACHE_AVAILABLE = False
+
 # All 13 component classes for smd_comp
 COMP_DETECT_CLASSES = [
     'Button', 'Capacitor', 'Connector', 'Diode',
@@ -51,16 +109,138 @@ def _detect_model_formats(comp_base: str = "smd_comp", ic_base: str = "ic_detect
                            root: Path = None) -> list:
     """Return list of available model format labels (e.g. ['ONNX (.onnx)', 'PT (.pt)'])
     based on whether the *comp* model file exists in each format.
-    The ic_detect model is optional; it does not gate format availability."""
+    The ic_detect model is optional; it does not gate format availability.
+    'ONNX Runtime (.onnx)' runs the same .onnx file on the native onnxruntime
+    backend and is listed when onnxruntime is installed, as is
+    'ONNX INT8 (.int8.onnx)' when a quantized variant (src/quantize.py) exists."""
     root = root or Path(".")
     formats = []
     if (root / f"{comp_base}.onnx").exists():
         formats.append("ONNX (.onnx)")
+        if onnxruntime_available():
+            formats.append("ONNX Runtime (.onnx)")
+    if (root / f"{comp_base}.int8.onnx").exists() and onnxruntime_available():
+        formats.append("ONNX INT8 (.int8.onnx)")
     if (root / f"{comp_base}.pt").exists():
         formats.append("PT (.pt)")
     return formats
 
 
+def _backend_for_format(fmt: str) -> str:
+    """Map a model format label to the ComponentDetector backend name."""
+    if fmt.startswith("ONNX Runtime") or fmt.startswith("ONNX INT8"):
+        return "onnxruntime"
+    return "ultralytics"
+
+
+def _model_filename(base: str, fmt: str) -> str:
+    """Return the model file name for a base name and format label."""
+    if fmt.startswith("ONNX INT8"):
+        return f"{base}.int8.onnx"
+    return f"{base}.onnx" if "ONNX" in fmt else f"{base}.pt"
+
+
+# Longest side of the images sent to the browser by the Job Viewer
+VIEWER_MAX_SIZE = 1600
+
+
+def _show_zoomable(image_path: Path, caption: str, key: str) -> None:
+    """
+    Show a job image through its tile pyramid (built on first view): a
+    downscaled overview, or only the tiles of the zoomed-in region.
+    """
+    try:
+        pyramid = ensure_pyramid(str(image_path)) if TILE_PYRAMID_AVAILABLE else None
+    except Exception:
+        pyramid = None
+    if pyramid is None:
+        # No pyramid (module missing, unreadable tiles folder): show the full image
+        st.image(Image.open(image_path), caption=caption, width="stretch")
+        return
+    # Zooming stops once the view is ~256 px of the full-resolution image
+    zoom_levels = [z for z in (1, 2, 4, 8, 16, 32)
+                   if max(pyramid.width, pyramid.height) / z >= 256] or [1]
+    zoom = (st.select_slider("Zoom", options=zoom_levels, value=1, key=f"{key}_zoom")
+            if len(zoom_levels) > 1 else 1)
+    if zoom == 1:
+        view = pyramid.overview(VIEWER_MAX_SIZE)
+        st.image(view[:, :, ::-1], caption=f"{caption} ({pyramid.width}x{pyramid.height})",
+                 width="stretch")
+        return
+    col_x, col_y = st.columns(2)
+    with col_x:
+        cx = st.slider("Pan \u2194", 0, 100, 50, key=f"{key}_pan_x") / 100
+    with col_y:
+        cy = st.slider("Pan \u2195", 0, 100, 50, key=f"{key}_pan_y") / 100
+    view_w, view_h = pyramid.width / zoom, pyramid.height / zoom
+    x0 = min(max(0.0, cx * pyramid.width - view_w / 2), pyramid.width - view_w)
+    y0 = min(max(0.0, cy * pyramid.height - view_h / 2), pyramid.height - view_h)
+    view = pyramid.region(x0, y0, x0 + view_w, y0 + view_h, VIEWER_MAX_SIZE)
+    st.image(view[:, :, ::-1], caption=f"{caption} \u2014 {zoom}x at ({int(x0)}, {int(y0)})",
+             width="stretch")
+
+
+VIEWER_PAGE_SIZES = (50, 100, 500)
+
+
+def _viewer_page(view: str, **filters) -> list:
+    """
+    Fetch the current page of a Database Viewer view and show the page
+    controls. Pages are keyset-based: the session keeps, per view and
+    filter, the key of the last row before each page visited.
+    """
+    state = f"viewer_pages_{view}_{sorted(filters.items())}"
+    starts = st.session_state.setdefault(state, [None])
+    col_prev, col_page, col_next, col_size = st.columns([1, 1, 1, 2])
+    with col_size:
+        limit = st.selectbox("Rows per page", VIEWER_PAGE_SIZES, index=1, key=f"{state}_size")
+    # One extra row tells whether an older page exists
+    data = st.session_state.db.get_page(view, starts[-1], limit + 1, **filters)
+    has_older = len(data) > limit
+    data = data[:limit]
+    with col_prev:
+        if st.button("\u25c0 Newer", disabled=len(starts) == 1, key=f"{state}_newer"):
+            starts.pop()
+            st.rerun()
+    with col_page:
+        st.markdown(f"Page {len(starts)}")
+    with col_next:
+        if st.button("Older \u25b6", disabled=not has_older, key=f"{state}_older"):
+            starts.append(page_key(view, data[-1]))
+            st.rerun()
+    return data
+
+
+def _viewer_export(view: str, **filters) -> None:
+    """
+    Export every row of a Database Viewer view (streamed in chunks from a
+    server-side cursor into a temporary file) and offer it for download.
+    """
+    state = f"viewer_export_{view}_{sorted(filters.items())}"
+    with st.expander("\u2b07\ufe0f Export all rows"):
+        fmt = st.radio("Format", EXPORT_FORMATS, horizontal=True, key=f"{state}_format")
+        if st.button("Prepare export", key=f"{state}_run"):
+            previous = st.session_state.pop(state, None)
+            if previous and os.path.exists(previous[0]):
+                os.remove(previous[0])
+            fd, path = tempfile.mkstemp(prefix=f"nuts_vision_{view}_", suffix=f".{fmt}")
+            os.close(fd)
+            try:
+                with st.spinner("Exporting..."):
+                    rows = export_view(st.session_state.db, view, path, fmt, **filters)
+                st.session_state[state] = (path, rows)
+            except ImportError as e:
+                os.remove(path)
+                st.error(str(e))
+        export = st.session_state.get(state)
+        if export and os.path.exists(export[0]):
+            path, rows = export
+            suffix = Path(path).suffix
+            with open(path, "rb") as f:
+                st.download_button(f"Download {rows} rows ({suffix[1:]})", f,
+                                   file_name=f"{view}{suffix}", key=f"{state}_download")
+
+
 # Page configuration
 st.set_page_config(
     page_title="nuts_vision - IC Detector",
@@ -125,6 +305,14 @@ if DB_AVAILABLE:
             if "db_error" in st.session_state:
                 del st.session_state.db_error
             st.rerun()
+    # Background job-log writer: backlog while logs wait for the database
+    for writer in active_writers():
+        writer_stats = writer.stats()
+        if writer_stats["queued"] or writer_stats["journal_pending"]:
+            st.sidebar.caption(
+                f"DB log queue: {writer_stats['queued']} · journaled: "
+                f"{writer_stats['journal_pending']} (lag {writer_stats['replay_lag_s']:.0f} s)"
+            )
 else:
     st.sidebar.warning("\u26a0\ufe0f Database Module Not Available")
 
@@ -159,6 +347,7 @@ if page == "\U0001f3e0 Home":
         input.<ext>    — original photo
         result.jpg     — annotated photo with bounding boxes
         crops/         — one cropped image per detected component
+                         (or crops.pack — all crops in one archive)
         metadata.json  — detection data
     ```
     """)
@@ -203,17 +392,17 @@ elif page == "\U0001f4e4 Upload & Process":
                     options=_up_formats,
                     index=0,
                     horizontal=True,
-                    help="Choose between PyTorch (.pt) and ONNX (.onnx) model format",
+                    help="Choose between PyTorch (.pt), ONNX (.onnx) through ultralytics, "
+                         "ONNX on the native ONNX Runtime backend, or the INT8 quantized "
+                         "ONNX variant (src/quantize.py)",
                     key="up_model_format",
                 )
             else:
                 _up_fmt = _up_formats[0]
                 st.text_input("Model format", value=_up_fmt, disabled=True, key="up_model_format_display")
 
-            if "ONNX" in _up_fmt:
-                model_path = str(_up_root / "smd_comp.onnx")
-            else:
-                model_path = str(_up_root / "smd_comp.pt")
+            model_path = str(_up_root / _model_filename("smd_comp", _up_fmt))
+            model_backend = _backend_for_format(_up_fmt)
             st.text_input("Model", value=Path(model_path).name, disabled=True,
                            help="smd_comp model — selected for component detection")
         with col2:
@@ -237,14 +426,28 @@ elif page == "\U0001f4e4 Upload & Process":
 
     st.markdown("### Processing Options")
     use_database = st.checkbox("Log to Database", value=True)
+    crop_storage = st.radio(
+        "Crop storage", CROP_STORAGES, horizontal=True,
+        format_func=lambda v: {"files": "One file per crop", "pack": "Single archive (crops.pack)",
+                               "virtual": "On demand (no crop files)"}[v],
+        help="Dense boards produce thousands of crops; a single archive per job keeps the "
+             "jobs folder small and fast to list. Unpack with `python src/crop_archive.py unpack`. "
+             "On demand writes no crops at all: they are cut from the input photo when viewed, "
+             "and written only when exported from the Job Viewer."
+    )
 
     if st.button("\U0001f680 Start Processing", type="primary",
                  disabled=not uploaded_files or not model_path):
         if not Path(model_path).exists():
             st.error(f"Model file not found: {model_path}")
         else:
-            upload_dir = Path("jobs") / "_uploads"
-            upload_dir.mkdir(parents=True, exist_ok=True)
+            # Uploads are stored once by content hash; identical uploads
+            # (same model and settings) link to the existing job
+            if CONTENT_STORE_AVAILABLE:
+                store = ContentStore(Path("jobs") / STORE_DIRNAME)
+            else:
+                upload_dir = Path("jobs") / "_uploads"
+                upload_dir.mkdir(parents=True, exist_ok=True)
             progress_bar = st.progress(0)
             status_text = st.empty()
             try:
@@ -252,18 +455,28 @@ elif page == "\U0001f4e4 Upload & Process":
                 pipeline = ComponentAnalysisPipeline(
                     model_path=model_path,
                     conf_threshold=conf_threshold,
-                    use_database=use_database and st.session_state.get("db_connected", False)
+                    use_database=use_database and st.session_state.get("db_connected", False),
+                    backend=model_backend,
+                    crop_storage=crop_storage,
                 )
                 total_files = len(uploaded_files)
                 results_summary = []
                 for idx, uploaded_file in enumerate(uploaded_files):
                     status_text.text(f"Processing {uploaded_file.name} ({idx+1}/{total_files})...")
                     progress_bar.progress(idx / total_files)
-                    file_path = upload_dir / uploaded_file.name
-                    with open(file_path, "wb") as f:
-                        f.write(uploaded_file.getbuffer())
+                    if CONTENT_STORE_AVAILABLE:
+                        content_hash, file_path = store.add_bytes(
+                            uploaded_file.getbuffer(), Path(uploaded_file.name).suffix
+                        )
+                    else:
+                        content_hash = None
+                        file_path = upload_dir / Path(uploaded_file.name).name
+                        file_path.write_bytes(uploaded_file.getbuffer())
                     try:
-                        result = pipeline.process_image(str(file_path.resolve()), jobs_base_dir="jobs")
+                        result = pipeline.process_image(
+                            str(file_path.resolve()), jobs_base_dir="jobs",
+                            content_hash=content_hash, original_name=uploaded_file.name
+                        )
                         # Apply optional class filter on the metadata
                         dets = result["metadata"]["total_detections"]
                         if selected_classes:
@@ -272,7 +485,7 @@ elif page == "\U0001f4e4 Upload & Process":
                             dets = len(filtered)
                         results_summary.append({
                             "file": uploaded_file.name,
-                            "status": "\u2705 Success",
+                            "status": "\u267b\ufe0f Reused" if result.get("reused") else "\u2705 Success",
                             "job_folder": result["job_folder"],
                             "detections": dets
                         })
@@ -316,6 +529,10 @@ elif page == "\U0001f4f7 PCBA Photo Booth":
     if not DUAL_DETECTOR_AVAILABLE:
         st.error("DualModelDetector could not be imported. Check that `src/detect.py` is present.")
         st.stop()
+    if not (CONTENT_STORE_AVAILABLE and CROP_ENGINE_AVAILABLE and TIMING_AVAILABLE):
+        st.error("The Photo Booth needs `src/content_store.py`, `src/crop.py` and `src/timing.py`, "
+                 "and one of them could not be imported.")
+        st.stop()
 
     # ------------------------------------------------------------------
     # Helper: draw bounding boxes with semi-transparent filled zones
@@ -394,6 +611,14 @@ elif page == "\U0001f4f7 PCBA Photo Booth":
             st.session_state["pb_image_bytes"] = uploaded.read()
             # Sanitize: keep only the basename, strip any path separators
             st.session_state["pb_image_name"] = Path(uploaded.name).name
+            # Store the upload once under its content hash (the stored name
+            # is never user-controlled)
+            _hash, _stored = ContentStore(Path("jobs") / STORE_DIRNAME).add_bytes(
+                st.session_state["pb_image_bytes"],
+                Path(st.session_state["pb_image_name"]).suffix or ".jpg",
+            )
+            st.session_state["pb_content_hash"] = _hash
+            st.session_state["pb_store_path"] = str(_stored.resolve())
             st.session_state.pop("pb_detections", None)  # reset previous run
 
     if "pb_image_bytes" not in st.session_state:
@@ -438,19 +663,20 @@ elif page == "\U0001f4f7 PCBA Photo Booth":
             options=_pb_formats,
             index=0,
             horizontal=True,
-            help="Choose between ONNX and PyTorch (.pt) model format",
+            help="Choose between ONNX (ultralytics), ONNX on the native ONNX Runtime "
+                 "backend, the INT8 quantized ONNX variant, and PyTorch (.pt) model format",
             key="pb_model_format",
         )
     else:
         _pb_fmt = _pb_formats[0]
         st.info(f"Model format: **{_pb_fmt}** (only format available)")
 
-    if "ONNX" in _pb_fmt:
-        comp_model_name = "smd_comp.onnx"
+    comp_model_name = _model_filename("smd_comp", _pb_fmt)
+    ic_model_name = _model_filename("ic_detect_best", _pb_fmt)
+    if not (_project_root / ic_model_name).exists() and ic_model_name.endswith(".int8.onnx"):
+        # No quantized ic_detect yet: pair the INT8 smd_comp with the FP32 one
         ic_model_name = "ic_detect_best.onnx"
-    else:
-        comp_model_name = "smd_comp.pt"
-        ic_model_name = "ic_detect_best.pt"
+    pb_backend = _backend_for_format(_pb_fmt)
 
     col_m1, col_m2 = st.columns(2)
     with col_m1:
@@ -497,11 +723,31 @@ elif page == "\U0001f4f7 PCBA Photo Booth":
             help="Mild unsharp-mask kernel — recovers edge detail lost to optical blur at the frame edges.",
         )
 
+    st.markdown("### High-Resolution Inference")
+    col_t1, col_t2, col_t3 = st.columns(3)
+    with col_t1:
+        pb_tiled = st.checkbox(
+            "Tiled inference",
+            value=False,
+            key="pb_tiled",
+            help="Run overlapping full-resolution tiles through the models so small parts "
+                 "(0402 resistors, pads) are not lost when large photos are downscaled.",
+        )
+    with col_t2:
+        pb_tile_size = st.select_slider(
+            "Tile size (px)", options=[640, 960, 1280, 1600, 2048], value=1280,
+            key="pb_tile_size", disabled=not pb_tiled,
+        )
+    with col_t3:
+        pb_tile_overlap = st.slider(
+            "Tile overlap", 0.0, 0.5, 0.2, 0.05,
+            key="pb_tile_overlap", disabled=not pb_tiled,
+        )
+
     run_inference = st.button("\U0001f50d Run Detection", type="primary",
                               disabled=not _comp_model_path.exists())
 
     if run_inference:
-        import uuid as _uuid
         # Use only server-side paths resolved from the project root
         comp_model_resolved = _comp_model_path.resolve()
         ic_model_resolved = _ic_model_path.resolve() if _ic_model_path.exists() else None
@@ -509,13 +755,8 @@ elif page == "\U0001f4f7 PCBA Photo Booth":
         if not comp_model_resolved.exists():
             st.error(f"smd_comp model not found: {comp_model_name}")
         else:
-            # Save image to a temp file using a UUID filename (never user-controlled)
-            tmp_dir = Path("/tmp/pb_uploads")
-            tmp_dir.mkdir(parents=True, exist_ok=True)
-            # Preserve the original extension but use a random name to avoid collisions
-            _orig_suffix = Path(img_name).suffix or ".jpg"
-            tmp_path = tmp_dir / f"{_uuid.uuid4().hex}{_orig_suffix}"
-            tmp_path.write_bytes(img_bytes)
+            # The upload was stored under its content hash in Step 1
+            stored_path = st.session_state["pb_store_path"]
 
             ic_path_arg = str(ic_model_resolved) if ic_model_resolved else None
             if not ic_model_resolved:
@@ -523,28 +764,66 @@ elif page == "\U0001f4f7 PCBA Photo Booth":
 
             with st.spinner("Running dual-model inference…"):
                 try:
+                    import cv2
+                    # Reuse the EXIF-corrected image already decoded for display
+                    _pb_bgr = cv2.cvtColor(np.array(pil_image.convert("RGB")), cv2.COLOR_RGB2BGR)
                     detector = DualModelDetector(
                         comp_model_path=str(comp_model_resolved),
                         ic_model_path=ic_path_arg,
                         comp_conf=comp_conf,
                         ic_conf=ic_conf,
+                        backend=pb_backend,
+                        # Moving a confidence slider or the class filter and
+                        # re-running only re-filters the cached raw detections
+                        cache=get_inference_cache() if INFERENCE_CACHE_AVAILABLE else None,
                     )
                     detections = detector.detect(
-                        str(tmp_path),
+                        stored_path,
                         class_filter=selected_classes if selected_classes else None,
                         apply_clahe=pb_apply_clahe,
                         apply_sharpen=pb_apply_sharpen,
+                        image=_pb_bgr,
+                        tile_size=pb_tile_size if pb_tiled else None,
+                        tile_overlap=pb_tile_overlap,
+                        # The display image is decoded from these exact bytes
+                        image_hash=st.session_state["pb_content_hash"],
                     )
+                    detector.close()
                     st.session_state["pb_detections"] = detections
+                    st.session_state["pb_detection_timings"] = detector.last_timings
                     st.session_state["pb_detection_config"] = {
                         "comp_model": comp_model_name,
                         "ic_model": ic_model_name if ic_model_resolved else None,
+                        "backend": pb_backend,
                         "comp_conf": comp_conf,
                         "ic_conf": ic_conf,
                         "class_filter": selected_classes,
-                        "iou_threshold": DualModelDetector.IOU_THRESHOLD,
+                        "iou_threshold": detector.IOU_THRESHOLD,
+                        "ic_matching": detector.matching,
+                        "tile_size": pb_tile_size if pb_tiled else None,
+                        "tile_overlap": pb_tile_overlap if pb_tiled else None,
+                        "apply_clahe": pb_apply_clahe,
+                        "apply_sharpen": pb_apply_sharpen,
                     }
-                    st.success(f"\u2705 Detected {len(detections)} components.")
+                    st.session_state["pb_model_paths"] = [str(comp_model_resolved), ic_path_arg]
+                    _cache_hits = detector.last_cache_hits or {}
+                    _cached_models = [name for name, hit in _cache_hits.items() if hit]
+                    _cache_note = (f" (\u267b\ufe0f {', '.join(_cached_models)} from cache)"
+                                   if _cached_models else "")
+                    st.success(f"\u2705 Detected {len(detections)} components.{_cache_note}")
+                    if detector.last_timings:
+                        with st.expander("\u23f1\ufe0f Stage timings"):
+                            st.dataframe(
+                                pd.DataFrame(list(detector.last_timings.items()),
+                                             columns=["Stage", "ms"]),
+                                width="stretch",
+                            )
+                    if detector.last_tile_timings:
+                        with st.expander("\u23f1\ufe0f Per-tile timing"):
+                            for _model_name, _tiles in detector.last_tile_timings.items():
+                                if _tiles:
+                                    st.markdown(f"**{_model_name}** — {len(_tiles)} tiles")
+                                    st.dataframe(pd.DataFrame(_tiles), width="stretch")
                 except Exception as exc:
                     import traceback
                     st.error(f"Inference error: {exc}")
@@ -661,6 +940,26 @@ elif page == "\U0001f4f7 PCBA Photo Booth":
         if st.button("\u2702\ufe0f Confirm & Generate Crops", type="primary",
                      disabled=len(kept_rows) == 0):
             import cv2
+            export_timer = StageTimer()
+
+            # ---- Link to an identical earlier export ----
+            # Same photo content, models, detection settings and kept rows
+            content_hash = st.session_state.get("pb_content_hash")
+            pb_store = ContentStore(Path("jobs") / STORE_DIRNAME)
+            export_key = ContentStore.job_key(
+                content_hash,
+                *st.session_state.get("pb_model_paths", []),
+                detection_config=st.session_state.get("pb_detection_config", {}),
+                rows=[[int(r["#"]), r["type"], r["ic_subtype"] or None]
+                      for _, r in kept_rows.iterrows()],
+            )
+            existing_job = pb_store.find_job(export_key) if content_hash else None
+            if existing_job is not None:
+                st.info(
+                    f"\u267b\ufe0f This photo was already exported with the same models, "
+                    f"settings and detections: `{existing_job}` — open it in the **Job Viewer**."
+                )
+                st.stop()
             # Use the EXIF-corrected PIL image (already transposed above)
             # to produce a BGR numpy array consistent with detection results.
             corrected_rgb = pil_image.convert("RGB")
@@ -686,35 +985,36 @@ elif page == "\U0001f4f7 PCBA Photo Booth":
             # ---- Save EXIF-corrected input photo ----
             orig_suffix = Path(img_name).suffix or ".jpg"
             input_path = job_dir / f"input{orig_suffix}"
-            corrected_rgb.save(str(input_path), quality=95)
+            with export_timer.stage("encode"):
+                corrected_rgb.save(str(input_path), quality=95)
 
             # ---- Save annotated photo ----
             annotated_rgb = annotated.convert("RGB")
             result_path = job_dir / "result.jpg"
-            annotated_rgb.save(str(result_path), quality=95)
+            with export_timer.stage("encode"):
+                annotated_rgb.save(str(result_path), quality=95)
 
-            # ---- Generate and save crops ----
+            # ---- Generate and save crops (views of cv_img, encoded in parallel) ----
+            crop_engine = CropEngine(padding=10)
             saved_rows = []
             col_imgs = st.columns(4)
             col_idx = 0
 
-            for _, row in kept_rows.iterrows():
+            kept_list = [row for _, row in kept_rows.iterrows()]
+            crop_paths = crop_engine.save_crops(
+                cv_img,
+                [detections[int(row["#"])]["bbox"] for row in kept_list],
+                [crops_dir / crop_engine.filename(f"{int(row['#']):03d}_{row['type']}")
+                 for row in kept_list],
+                timer=export_timer,
+            )
+
+            for row, crop_path in zip(kept_list, crop_paths):
                 i = int(row["#"])
                 d = detections[i]
-                bbox = d["bbox"]
-                x1, y1, x2, y2 = (max(0, int(v)) for v in bbox[:4])
-                # Apply small padding
-                pad = 10
-                h_img, w_img = cv_img.shape[:2]
-                x1c = max(0, x1 - pad)
-                y1c = max(0, y1 - pad)
-                x2c = min(w_img, x2 + pad)
-                y2c = min(h_img, y2 + pad)
-                crop = cv_img[y1c:y2c, x1c:x2c]
+                x1, y1, x2, y2 = (max(0, int(v)) for v in d["bbox"][:4])
                 cls = row["type"]
-                crop_name = f"{i:03d}_{cls}.jpg"
-                crop_path = crops_dir / crop_name
-                cv2.imwrite(str(crop_path), crop)
+                crop_name = Path(crop_path).name
 
                 saved_rows.append({
                     "row_number":           i,
@@ -726,7 +1026,7 @@ elif page == "\U0001f4f7 PCBA Photo Booth":
                         "x": x1, "y": y1,
                         "width": x2 - x1, "height": y2 - y1
                     },
-                    "cropped_image_path":   str(crop_path),
+                    "cropped_image_path":   crop_path,
                     "crop_file":            crop_name,
                     "processing_status":    "pending",
                 })
@@ -734,7 +1034,7 @@ elif page == "\U0001f4f7 PCBA Photo Booth":
                 # Display crop thumbnail
                 with col_imgs[col_idx % 4]:
                     st.image(
-                        Image.open(io.BytesIO(cv2.imencode(".jpg", crop)[1].tobytes())),
+                        crop_path,
                         caption=f"{cls} ({row['ic_subtype'] or '—'})",
                         width="stretch"
                     )
@@ -745,6 +1045,7 @@ elif page == "\U0001f4f7 PCBA Photo Booth":
             metadata = {
                 "job_name": job_folder_name,
                 "input_file": img_name,
+                "content_hash": content_hash,
                 "date": now.isoformat(),
                 "model": config.get("comp_model", ""),
                 "ic_model": config.get("ic_model"),
@@ -767,42 +1068,68 @@ elif page == "\U0001f4f7 PCBA Photo Booth":
                     for r in saved_rows
                 ],
             }
+
+            # ---- Log to database if available ----
+            # Done before metadata.json is written so its duration is recorded there.
+            # Detection stages come from the Run Detection step; ``total`` sums
+            # detection and export (time spent reviewing in between is excluded).
+            def _pb_timings() -> dict:
+                detect_t = dict(st.session_state.get("pb_detection_timings") or {})
+                export_t = export_timer.as_dict()
+                detect_total = detect_t.pop("total", 0.0)
+                export_total = export_t.pop("total", 0.0)
+                merged = {**detect_t}
+                for stage, ms in export_t.items():
+                    merged[stage] = round(merged.get(stage, 0.0) + ms, 2)
+                merged["detect_total"] = detect_total
+                merged["export_total"] = export_total
+                merged["total"] = round(detect_total + export_total, 2)
+                return merged
+
+            db_message = None
+            if st.session_state.get("db_connected", False):
+                try:
+                    db = st.session_state.db
+                    with export_timer.stage("db_log"):
+                        import_id = db.create_pcba_import(
+                            image_storage_path=st.session_state.get("pb_store_path", img_name),
+                            detection_config=config,
+                            total_detections=len(saved_rows),
+                            status="completed",
+                            timings=_pb_timings(),
+                            content_hash=content_hash,
+                        )
+
+                        for row_data in saved_rows:
+                            db.log_pcba_row_import(
+                                import_id=import_id,
+                                row_number=row_data["row_number"],
+                                detection_type=row_data["detection_type"],
+                                detection_confidence=row_data["detection_confidence"],
+                                bounding_box=row_data["bounding_box"],
+                                ic_subtype=row_data["ic_subtype"],
+                                ic_confidence=row_data["ic_confidence"],
+                                cropped_image_path=row_data["cropped_image_path"],
+                                processing_status=row_data["processing_status"],
+                            )
+
+                    db_message = ("info", f"\U0001f4be Session logged to database (import id: {import_id})")
+                except Exception as exc:
+                    db_message = ("warning", f"Database logging failed: {exc}")
+
+            metadata["timings"] = _pb_timings()
             metadata_path = job_dir / "metadata.json"
             with open(metadata_path, "w") as f:
                 json.dump(metadata, f, indent=2)
+            if content_hash:
+                pb_store.link_job(export_key, str(job_dir), content_hash)
 
             st.success(
                 f"\u2705 {len(saved_rows)} crops generated.\n\n"
                 f"\U0001f4c1 Job saved to `{job_dir}`"
             )
-
-            # Log to database if available
-            if st.session_state.get("db_connected", False):
-                try:
-                    db = st.session_state.db
-                    import_id = db.create_pcba_import(
-                        image_storage_path=img_name,
-                        detection_config=config,
-                        total_detections=len(saved_rows),
-                        status="completed",
-                    )
-
-                    for row_data in saved_rows:
-                        db.log_pcba_row_import(
-                            import_id=import_id,
-                            row_number=row_data["row_number"],
-                            detection_type=row_data["detection_type"],
-                            detection_confidence=row_data["detection_confidence"],
-                            bounding_box=row_data["bounding_box"],
-                            ic_subtype=row_data["ic_subtype"],
-                            ic_confidence=row_data["ic_confidence"],
-                            cropped_image_path=row_data["cropped_image_path"],
-                            processing_status=row_data["processing_status"],
-                        )
-
-                    st.info(f"\U0001f4be Session logged to database (import id: {import_id})")
-                except Exception as exc:
-                    st.warning(f"Database logging failed: {exc}")
+            if db_message:
+                getattr(st, db_message[0])(db_message[1])
 
 
 # ========== JOB VIEWER PAGE ==========
@@ -867,7 +1194,7 @@ elif page == "\U0001f50d Job Viewer":
                 input_photos = list(job_dir.glob("input.*"))
                 if input_photos:
                     try:
-                        st.image(Image.open(input_photos[0]), caption="Input", width="stretch")
+                        _show_zoomable(input_photos[0], "Input", f"input_{job_dir.name}")
                     except Exception as e:
                         st.error(f"Could not display input photo: {e}")
                 else:
@@ -878,32 +1205,84 @@ elif page == "\U0001f50d Job Viewer":
                 result_photo = job_dir / "result.jpg"
                 if result_photo.exists():
                     try:
-                        st.image(Image.open(result_photo), caption="Detected components", width="stretch")
+                        _show_zoomable(result_photo, "Detected components", f"result_{job_dir.name}")
                     except Exception as e:
                         st.error(f"Could not display result photo: {e}")
                 else:
                     st.warning("Result photo not found.")
 
+                # Crops are files under crops/, entries of crops.pack, or (virtual
+                # crop storage) rendered from input.* on request; keyed like the
+                # metadata "crop_file" field
                 crops_dir = job_dir / "crops"
-                crop_files = sorted(crops_dir.glob("*.jpg")) if crops_dir.exists() else []
+                crop_pack = job_dir / PACK_NAME
+                crop_items = []  # (crop_file key, fallback caption, encoded bytes or path)
+                crop_total = 0
+                if metadata.get("crop_storage") == "virtual" and not VIRTUAL_CROPS_AVAILABLE:
+                    st.warning("This job's crops are rendered on demand, but `src/virtual_crops.py` "
+                               "could not be imported.")
+                elif metadata.get("crop_storage") == "virtual":
+                    # Only the page being looked at is cut and encoded
+                    _virtual = metadata.get("detections", [])
+                    crop_total = len(_virtual)
+                    _page_size = 24
+                    _pages = max(1, -(-crop_total // _page_size))
+                    _page = st.number_input(
+                        f"Crop page (of {_pages})", min_value=1, max_value=_pages, value=1,
+                        key=f"crop_page_{job_dir.name}"
+                    ) if _pages > 1 else 1
+                    _start = (int(_page) - 1) * _page_size
+                    try:
+                        crop_items = [
+                            (d.get("crop_file"), f"{i:03d}_{d['class_name']}",
+                             render_crop(str(job_dir), i, metadata))
+                            for i, d in enumerate(_virtual[_start:_start + _page_size], start=_start)
+                        ]
+                    except (OSError, ValueError) as e:
+                        st.error(f"Could not render crops: {e}")
+                    _col_files, _col_pack = st.columns(2)
+                    with _col_files:
+                        if st.button("\U0001f4be Export crops to crops/", key=f"export_files_{job_dir.name}"):
+                            export_crops(str(job_dir))
+                            st.rerun()
+                    with _col_pack:
+                        if st.button("\U0001f4e6 Export crops to crops.pack", key=f"export_pack_{job_dir.name}"):
+                            export_crops(str(job_dir), pack=True)
+                            st.rerun()
+                elif crop_pack.exists() and not CROP_ARCHIVE_AVAILABLE:
+                    st.warning(f"Crops are stored in {PACK_NAME}, but `src/crop_archive.py` "
+                               "could not be imported.")
+                elif crop_pack.exists():
+                    with CropArchive(str(crop_pack)) as _archive:
+                        crop_items = [
+                            (f"{PACK_NAME}#{i}", Path(entry["name"]).stem, _archive.read(i))
+                            for i, entry in enumerate(_archive.entries)
+                        ]
+                elif crops_dir.exists():
+                    crop_items = [
+                        (f.name, f.stem, str(f))
+                        for f in sorted(crops_dir.iterdir())
+                        if f.suffix.lower() in (".jpg", ".png", ".webp")
+                    ]
                 detections = metadata.get("detections", [])
+                crop_total = crop_total or len(crop_items)
 
-                if crop_files:
+                if crop_items:
                     st.markdown("---")
-                    st.markdown(f"### \u2702\ufe0f Cropped Components ({len(crop_files)} total)")
+                    st.markdown(f"### \u2702\ufe0f Cropped Components ({crop_total} total)")
                     det_by_file = {d.get("crop_file"): d for d in detections if d.get("crop_file")}
                     cols_per_row = 4
-                    rows = [crop_files[i:i+cols_per_row] for i in range(0, len(crop_files), cols_per_row)]
+                    rows = [crop_items[i:i+cols_per_row] for i in range(0, len(crop_items), cols_per_row)]
                     for row in rows:
                         cols = st.columns(cols_per_row)
-                        for col, crop_file in zip(cols, row):
+                        for col, (crop_key, crop_stem, crop_source) in zip(cols, row):
                             with col:
                                 try:
-                                    det = det_by_file.get(crop_file.name, {})
-                                    caption = det.get("class_name", crop_file.stem)
+                                    det = det_by_file.get(crop_key, {})
+                                    caption = det.get("class_name", crop_stem)
                                     if "confidence" in det:
                                         caption += f" ({det['confidence']:.2f})"
-                                    st.image(Image.open(crop_file), caption=caption, width="stretch")
+                                    st.image(crop_source, caption=caption, width="stretch")
                                 except Exception as e:
                                     st.error(f"Error: {e}")
                 else:
@@ -955,25 +1334,27 @@ elif page == "\U0001f5c4\ufe0f Database Viewer":
 
         try:
             if table_view == "\U0001f4f8 Images Input":
-                data = st.session_state.db.get_all_images()
+                data = _viewer_page("images")
                 if data:
                     df = pd.DataFrame(data)
                     if "upload_at" in df.columns:
                         df["upload_at"] = pd.to_datetime(df["upload_at"]).dt.strftime("%Y-%m-%d %H:%M:%S")
                     st.dataframe(df, width="stretch", height=400)
-                    st.caption(f"Total records: {len(df)}")
+                    st.caption(f"Records on this page: {len(df)}")
+                    _viewer_export("images")
                 else:
                     st.info("No images in database yet.")
 
             elif table_view == "\U0001f504 Jobs Log":
-                data = st.session_state.db.get_all_jobs()
+                data = _viewer_page("jobs")
                 if data:
                     df = pd.DataFrame(data)
                     for col in ["started_at", "ended_at"]:
                         if col in df.columns:
                             df[col] = pd.to_datetime(df[col]).dt.strftime("%Y-%m-%d %H:%M:%S")
                     st.dataframe(df, width="stretch", height=400)
-                    st.caption(f"Total records: {len(df)}")
+                    st.caption(f"Records on this page: {len(df)}")
+                    _viewer_export("jobs")
                     if len(df) > 0:
                         st.markdown("---")
                         job_id = st.selectbox("Select Job ID", df["job_id"].tolist())
@@ -994,11 +1375,12 @@ elif page == "\U0001f5c4\ufe0f Database Viewer":
                 job_id = None
                 if selected_job != "All Jobs":
                     job_id = int(selected_job.split()[1])
-                data = st.session_state.db.get_all_detections(job_id=job_id)
+                data = _viewer_page("detections", job_id=job_id)
                 if data:
                     df = pd.DataFrame(data)
                     st.dataframe(df, width="stretch", height=400)
-                    st.caption(f"Total records: {len(df)}")
+                    st.caption(f"Records on this page: {len(df)}")
+                    _viewer_export("detections", job_id=job_id)
                     if "class_name" in df.columns:
                         st.markdown("---")
                         st.bar_chart(df["class_name"].value_counts())
@@ -1006,28 +1388,27 @@ elif page == "\U0001f5c4\ufe0f Database Viewer":
                     st.info("No detections in database yet.")
 
             elif table_view == "\u2702\ufe0f Cropped Components":
-                with st.session_state.db.get_connection() as conn:
-                    with conn.cursor() as cursor:
-                        cursor.execute("""
-                            SELECT ic.*, d.class_name, j.job_id, j.job_name
-                            FROM ics_cropped ic
-                            JOIN detections d ON ic.detection_id = d.detection_id
-                            JOIN log_jobs j ON ic.job_id = j.job_id
-                            ORDER BY ic.created_at DESC LIMIT 100
-                        """)
-                        columns = [desc[0] for desc in cursor.description]
-                        data = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                data = _viewer_page("crops")
                 if data:
                     df = pd.DataFrame(data)
                     if "created_at" in df.columns:
                         df["created_at"] = pd.to_datetime(df["created_at"]).dt.strftime("%Y-%m-%d %H:%M:%S")
                     st.dataframe(df, width="stretch", height=400)
-                    st.caption(f"Total records: {len(df)}")
+                    st.caption(f"Records on this page: {len(df)}")
+                    _viewer_export("crops")
+                    # Paths may be image files or crops.pack#N archive references
+                    preview_id = st.selectbox("Preview crop", df["cropped_id"].tolist())
+                    preview_path = df.loc[df["cropped_id"] == preview_id, "cropped_file_path"].iloc[0]
+                    try:
+                        st.image(load_crop(preview_path) if VIRTUAL_CROPS_AVAILABLE else preview_path,
+                                 caption=preview_path)
+                    except (OSError, ValueError, IndexError) as e:
+                        st.warning(f"Crop not available: {e}")
                 else:
                     st.info("No cropped components in database yet.")
 
             elif table_view == "\U0001f4f7 PCBA Imports":
-                data = st.session_state.db.get_all_pcba_imports()
+                data = _viewer_page("pcba_imports")
                 if data:
                     df = pd.DataFrame(data)
                     if "created_at" in df.columns:
@@ -1038,7 +1419,8 @@ elif page == "\U0001f5c4\ufe0f Database Viewer":
                             lambda v: json.dumps(v, ensure_ascii=False)[:80] + "…" if v else "—"
                         )
                     st.dataframe(df, width="stretch", height=400)
-                    st.caption(f"Total records: {len(df)}")
+                    st.caption(f"Records on this page: {len(df)}")
+                    _viewer_export("pcba_imports")
 
                     if len(df) > 0:
                         st.markdown("---")
@@ -1060,22 +1442,15 @@ elif page == "\U0001f5c4\ufe0f Database Viewer":
                     for imp in imports
                 ]
                 selected = st.selectbox("Filter by import session", import_options)
-                if selected == "All Imports":
-                    with st.session_state.db.get_connection() as conn:
-                        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                            cursor.execute(
-                                "SELECT * FROM log_pcba_pb_row_import ORDER BY created_at DESC LIMIT 200"
-                            )
-                            data = [dict(row) for row in cursor.fetchall()]
-                else:
-                    imp_id = selected.split(" — ")[0]
-                    data = st.session_state.db.get_pcba_import_rows(imp_id)
+                imp_id = None if selected == "All Imports" else selected.split(" — ")[0]
+                data = _viewer_page("pcba_rows", import_id=imp_id)
                 if data:
                     df = pd.DataFrame(data)
                     if "created_at" in df.columns:
                         df["created_at"] = pd.to_datetime(df["created_at"]).dt.strftime("%Y-%m-%d %H:%M:%S")
                     st.dataframe(df, width="stretch", height=400)
-                    st.caption(f"Total records: {len(df)}")
+                    st.caption(f"Records on this page: {len(df)}")
+                    _viewer_export("pcba_rows", import_id=imp_id)
                     if "detection_type" in df.columns:
                         st.markdown("---")
                         st.bar_chart(df["detection_type"].value_counts())
@@ -1163,6 +1538,30 @@ elif page == "\U0001f4ca Statistics":
             except Exception:
                 st.info("PCBA logging tables not available yet.")
 
+            # --- Per-stage timings ---
+            st.markdown("---")
+            st.markdown("### \u23f1\ufe0f Stage timings")
+            st.caption("p50 / p95 duration per stage over the last 200 jobs / imports (ms)")
+            try:
+                tcol1, tcol2 = st.columns(2)
+                with tcol1:
+                    st.markdown("**Pipeline jobs**")
+                    job_timings = st.session_state.db.get_stage_timing_percentiles()
+                    if job_timings:
+                        st.dataframe(pd.DataFrame(job_timings).round(1), width="stretch")
+                    else:
+                        st.info("No timed jobs yet.")
+                with tcol2:
+                    st.markdown("**Photo Booth imports**")
+                    pcba_timings = st.session_state.db.get_pcba_stage_timing_percentiles()
+                    if pcba_timings:
+                        st.dataframe(pd.DataFrame(pcba_timings).round(1), width="stretch")
+                    else:
+                        st.info("No timed imports yet.")
+            except Exception:
+                st.info("Timing columns not available yet — run "
+                        "`database/migration_002_stage_timings.sql`.")
+
         except Exception as e:
             st.error(f"Error: {str(e)}")
 
@@ -1193,7 +1592,7 @@ elif page == "\u2139\ufe0f About":
       <image_name>_<YYYYMMDD>_<HHMMSS>/
         input.<ext>    — original photo
         result.jpg     — annotated photo
-        crops/         — one image per component
+        crops/         — one image per component (or crops.pack)
         metadata.json  — detection data
     ```
 
@@ -1219,7 +1618,27 @@ elif page == "\u2139\ufe0f About":
             "smd_comp.pt": Path("smd_comp.pt").exists(),
             "smd_comp.onnx": Path("smd_comp.onnx").exists(),
             "ic_detect_best.onnx": Path("ic_detect_best.onnx").exists(),
+            "smd_comp.int8.onnx": Path("smd_comp.int8.onnx").exists(),
+            "ic_detect_best.int8.onnx": Path("ic_detect_best.int8.onnx").exists(),
             "ic_detect_best.pt": Path("ic_detect_best.pt").exists(),
         }
         for model_name, found in _about_models.items():
             st.text(f"{model_name}: {'✅ Found' if found else '❌ Not found'}")
+        if MODEL_REGISTRY_AVAILABLE:
+            _reg_stats = get_registry().stats()
+            st.markdown("**Loaded models:**")
+            st.text(f"{len(_reg_stats['models'])} cached — {_reg_stats['size_mb']} / "
+                    f"{_reg_stats['max_mb']} MB (loads: {_reg_stats['loads']}, "
+                    f"hits: {_reg_stats['hits']}, evictions: {_reg_stats['evictions']})")
+            for _m in _reg_stats['models']:
+                st.text(f"{Path(_m['path']).name} [{_m['backend']}] — "
+                        f"load {_m['load_ms']} ms, warm-up {_m['warmup_ms']} ms, hits {_m['hits']}")
+        if INFERENCE_CACHE_AVAILABLE:
+            _cache_stats = get_inference_cache().stats()
+            st.markdown("**Inference cache:**")
+            st.text(f"{_cache_stats['entries']} entries — {_cache_stats['size_mb']} / "
+                    f"{_cache_stats['max_mb']} MB (hits: {_cache_stats['hits']}, "
+                    f"misses: {_cache_stats['misses']}, evictions: {_cache_stats['evictions']})")
+            if st.button("Clear inference cache"):
+                get_inference_cache().clear()
+                st.rerun()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ultralytics vs native onnxruntime backend on the same .onnx model.
+
+Reports per-image latency (mean / p50 / p95) for both backends and how
+many detections agree (same class, IoU >= 0.5, one-to-one).
+
+Usage:
+    python benchmarks/bench_backends.py --model smd_comp.onnx --image board.jpg
+    python benchmarks/bench_backends.py --model smd_comp.onnx --runs 50 --threads 4
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from detect import ComponentDetector, load_image_with_exif
+from boxes import iou_matrix, match_greedy
+
+
+def agreement(dets_a, dets_b, threshold=0.5):
+    """Number of one-to-one, same-class matches between two detection lists."""
+    matched = 0
+    for cls in {d['class_name'] for d in dets_a} & {d['class_name'] for d in dets_b}:
+        a = [d['bbox'] for d in dets_a if d['class_name'] == cls]
+        b = [d['bbox'] for d in dets_b if d['class_name'] == cls]
+        matched += len(match_greedy(iou_matrix(a, b), threshold))
+    return matched
+
+
+def time_backend(detector, image, runs, warmup):
+    """Return (latencies_ms, last_detections) for ``runs`` timed inferences."""
+    for _ in range(warmup):
+        detector.detect_components("bench", save_visualization=False, image=image)
+    latencies = []
+    detections = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        detections = detector.detect_components("bench", save_visualization=False, image=image)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.asarray(latencies), detections
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ultralytics and onnxruntime backends")
+    parser.add_argument("--model", type=str, default="smd_comp.onnx", help="Path to .onnx model")
+    parser.add_argument("--image", type=str, help="Image to run on (default: synthetic 4000x3000 board)")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per backend (default: 20)")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed warm-up runs (default: 3)")
+    parser.add_argument("--threads", type=int, help="Intra-op threads for onnxruntime")
+    parser.add_argument("--conf", type=float, default=0.25, help="Confidence threshold (default: 0.25)")
+    args = parser.parse_args()
+
+    if args.image:
+        image = load_image_with_exif(args.image)
+    else:
+        rng = np.random.default_rng(0)
+        image = rng.integers(0, 255, size=(3000, 4000, 3), dtype=np.uint8)
+
+    print(f"Model: {args.model}  |  image: {image.shape[1]}x{image.shape[0]}  |  runs: {args.runs}")
+    print("=" * 72)
+
+    results = {}
+    for backend in ("ultralytics", "onnxruntime"):
+        start = time.perf_counter()
+        detector = ComponentDetector(
+            args.model, conf_threshold=args.conf,
+            backend=backend, intra_op_threads=args.threads,
+        )
+        load_ms = (time.perf_counter() - start) * 1000
+        latencies, detections = time_backend(detector, image, args.runs, args.warmup)
+        results[backend] = detections
+        print(f"{backend:12s} load {load_ms:8.1f} ms | mean {latencies.mean():7.1f} ms | "
+              f"p50 {np.percentile(latencies, 50):7.1f} ms | p95 {np.percentile(latencies, 95):7.1f} ms | "
+              f"{len(detections)} detections")
+
+    ref, ort = results["ultralytics"], results["onnxruntime"]
+    matched = agreement(ref, ort)
+    print("=" * 72)
+    print(f"Agreement: {matched} matched / {len(ref)} ultralytics / {len(ort)} onnxruntime")
+
+
+if __name__ == "__main__":
+    main()
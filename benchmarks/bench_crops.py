@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: writing component crops — one ``cv2.imwrite`` after another
+(the previous loop) vs the CropEngine (zero-copy views, encoding and
+writing on a thread pool), per format and thread count.
+
+Usage:
+    python benchmarks/bench_crops.py --crops 600
+    python benchmarks/bench_crops.py --resolution 24mp --crops 2000 --formats jpg webp --workers 1 4 8
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from crop import CROP_FORMATS, CropEngine, crop_view
+from synthetic_pcb import RESOLUTIONS, generate_pcb
+
+
+def random_boxes(width, height, n, seed=0):
+    """``n`` component-sized boxes spread over a ``width`` x ``height`` board."""
+    rng = np.random.default_rng(seed)
+    scale = max(0.5, min(width, height) / 2000)
+    boxes = []
+    for _ in range(n):
+        w, h = rng.uniform(10, 60) * scale, rng.uniform(8, 40) * scale
+        x, y = rng.uniform(0, width - w), rng.uniform(0, height - h)
+        boxes.append([x, y, x + w, y + h])
+    return boxes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sequential and parallel crop writing")
+    parser.add_argument("--resolution", choices=RESOLUTIONS, default="12mp",
+                        help="Synthetic board resolution (default: 12mp)")
+    parser.add_argument("--crops", type=int, default=600, help="Crops per board (default: 600)")
+    parser.add_argument("--formats", nargs="+", choices=sorted(CROP_FORMATS), default=["jpg"],
+                        help="Crop formats to time (default: jpg)")
+    parser.add_argument("--quality", type=int, default=95, help="JPEG / WebP quality (default: 95)")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4, 8],
+                        help="Thread counts to time (default: 1 2 4 8)")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per setting (default: 3)")
+    args = parser.parse_args()
+
+    width, height = RESOLUTIONS[args.resolution]
+    image = generate_pcb(width, height, seed=1)
+    boxes = random_boxes(width, height, args.crops)
+
+    print(f"Board: {args.resolution} ({width}x{height})  |  crops: {args.crops}  |  runs: {args.runs}")
+    print("=" * 72)
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp)
+
+        def sequential():
+            for i, bbox in enumerate(boxes):
+                cv2.imwrite(str(out / f"seq_{i:04d}.jpg"), crop_view(image, bbox, 10))
+
+        def best_of(fn):
+            latencies = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                fn()
+                latencies.append((time.perf_counter() - start) * 1000)
+            return min(latencies)
+
+        baseline = best_of(sequential)
+        print(f"{'sequential imwrite (jpg)':32s} {baseline:8.1f} ms")
+        for fmt in args.formats:
+            for workers in args.workers:
+                engine = CropEngine(10, fmt, args.quality, workers)
+                paths = [out / engine.filename(f"{fmt}_{i:04d}") for i in range(len(boxes))]
+                ms = best_of(lambda: engine.save_crops(image, boxes, paths))
+                size_kb = sum(p.stat().st_size for p in paths) / 1024
+                print(f"{'CropEngine ' + fmt + ' x' + str(workers):32s} {ms:8.1f} ms  "
+                      f"({baseline / ms:4.1f}x, {size_kb:8.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: DualModelDetector._cross_reference on synthetic dense boards.
+
+Compares the historical pure-Python double loop over ``_compute_iou`` with
+the vectorized IoU matrix + one-to-one matching now used by
+``DualModelDetector``.
+
+Usage:
+    python benchmarks/bench_cross_reference.py --boxes 5000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from detect import DualModelDetector
+
+
+def make_board(n_boxes: int, ic_fraction: float = 0.5, seed: int = 0):
+    """Return (comp_dets, ic_dets) for a synthetic board with ``n_boxes`` comp boxes."""
+    rng = np.random.default_rng(seed)
+    side = int(np.sqrt(n_boxes)) + 1
+    comp_dets, ic_dets = [], []
+    for i in range(n_boxes):
+        gx, gy = i % side, i // side
+        w, h = rng.uniform(20, 60, size=2)
+        x1, y1 = gx * 80 + rng.uniform(0, 10), gy * 80 + rng.uniform(0, 10)
+        bbox = [x1, y1, x1 + w, y1 + h]
+        is_ic = rng.random() < ic_fraction
+        comp_dets.append({
+            'class_id': 5 if is_ic else 10,
+            'class_name': 'IC' if is_ic else 'Resistor',
+            'confidence': float(rng.uniform(0.3, 0.95)),
+            'bbox': bbox,
+            'bbox_center': [x1 + w / 2, y1 + h / 2, w, h],
+        })
+        if is_ic and rng.random() < 0.9:
+            jitter = rng.normal(0, 2, size=4)
+            ic_dets.append({
+                'class_id': 0,
+                'class_name': 'four_side',
+                'confidence': float(rng.uniform(0.3, 0.95)),
+                'bbox': (np.array(bbox) + jitter).tolist(),
+            })
+    return comp_dets, ic_dets
+
+
+def legacy_cross_reference(comp_dets, ic_dets, threshold=0.5):
+    """Original O(N*M) interpreter loop (best match per IC, not one-to-one)."""
+    matched = 0
+    for cd in comp_dets:
+        if cd['class_name'].upper() == 'IC' and ic_dets:
+            best_iou = 0.0
+            for icd in ic_dets:
+                best_iou = max(best_iou, DualModelDetector._compute_iou(cd['bbox'], icd['bbox']))
+            if best_iou >= threshold:
+                matched += 1
+    return matched
+
+
+def make_detector(matching: str) -> DualModelDetector:
+    """Build a DualModelDetector without loading any model weights."""
+    det = DualModelDetector.__new__(DualModelDetector)
+    det.matching = matching
+    return det
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark IC cross-referencing")
+    parser.add_argument("--boxes", type=int, default=5000, help="comp_detect boxes per board (default: 5000)")
+    parser.add_argument("--skip-legacy", action="store_true", help="Do not time the legacy double loop")
+    args = parser.parse_args()
+
+    comp_dets, ic_dets = make_board(args.boxes)
+    n_ic = sum(d['class_name'] == 'IC' for d in comp_dets)
+    print(f"Synthetic board: {len(comp_dets)} comp boxes ({n_ic} ICs), {len(ic_dets)} ic_detect boxes")
+    print("=" * 60)
+
+    if not args.skip_legacy:
+        matched, t = timed(legacy_cross_reference, comp_dets, ic_dets)
+        print(f"legacy loop         : {t * 1000:10.1f} ms  ({matched} ICs confirmed)")
+        legacy_t = t
+    else:
+        legacy_t = None
+
+    for method in ("greedy", "hungarian"):
+        det = make_detector(method)
+        result, t = timed(det._cross_reference, comp_dets, ic_dets)
+        confirmed = sum(1 for d in result if d['ic_confirmed'] and d['class_id'] is not None)
+        speedup = f"  x{legacy_t / t:,.0f}" if legacy_t else ""
+        print(f"vectorized {method:9s}: {t * 1000:10.1f} ms  ({confirmed} ICs confirmed){speedup}")
+
+
+if __name__ == "__main__":
+    main()
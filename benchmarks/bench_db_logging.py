@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark: logging one job to PostgreSQL — one transaction per row
+(log_image_upload + start_job + log_detection / log_cropped_component per
+detection, the previous pipeline code) vs ``log_job_bulk`` (one
+transaction, multi-row INSERTs), against the number of detections.
+
+Needs a running database (settings from .env / DB_* variables, see the
+README). Every logged row is deleted again after timing.
+
+Usage:
+    python benchmarks/bench_db_logging.py
+    python benchmarks/bench_db_logging.py --detections 10 100 1000 5000 --runs 5
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from database import get_db_manager_from_env
+
+
+def fake_detections(n, seed=0):
+    """``n`` detections with random boxes and crop paths."""
+    rng = np.random.default_rng(seed)
+    detections = []
+    for i in range(n):
+        x, y = rng.uniform(0, 4000, 2)
+        detections.append({
+            'class_name': 'IC' if i % 5 == 0 else 'Resistor',
+            'confidence': float(rng.uniform(0.25, 1.0)),
+            'bbox': [float(x), float(y), float(x + 40), float(y + 20)],
+        })
+    crop_paths = [f"/bench/jobs/bench_job/crops/{i:03d}.jpg" for i in range(n)]
+    return detections, crop_paths
+
+
+def log_per_row(db, detections, crop_paths):
+    """The previous logging code path: one transaction per row."""
+    image_id = db.log_image_upload("bench.jpg", "/bench/bench.jpg", "jpg")
+    job_id = db.start_job(image_id, "bench.pt", job_name="bench_job",
+                          job_folder_path="/bench/jobs/bench_job")
+    for d, crop_path in zip(detections, crop_paths):
+        detection_id = db.log_detection(job_id, d["class_name"], d["confidence"], d["bbox"])
+        db.log_cropped_component(job_id, detection_id, crop_path)
+    return image_id
+
+
+def log_bulk(db, detections, crop_paths):
+    logged = db.log_job_bulk("bench.jpg", "/bench/bench.jpg", "bench.pt", detections,
+                             crop_paths=crop_paths, format="jpg", job_name="bench_job",
+                             job_folder_path="/bench/jobs/bench_job")
+    return logged["image_id"]
+
+
+def cleanup(db, image_ids):
+    """Delete the benchmark rows (jobs, detections and crops cascade)."""
+    with db.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM images_input WHERE image_id = ANY(%s)", (list(image_ids),))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-row and bulk job logging")
+    parser.add_argument("--detections", nargs="+", type=int, default=[10, 100, 1000],
+                        help="Detection counts to time (default: 10 100 1000)")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per setting (default: 3)")
+    args = parser.parse_args()
+
+    db = get_db_manager_from_env()
+    if not db.test_connection():
+        sys.exit("Database not reachable; check the DB_* settings")
+
+    print(f"{'detections':>10s} {'per-row (ms)':>14s} {'bulk (ms)':>12s} {'speed-up':>9s}")
+    print("=" * 50)
+    for n in args.detections:
+        detections, crop_paths = fake_detections(n)
+        timings = {}
+        for name, fn in (("per_row", log_per_row), ("bulk", log_bulk)):
+            latencies, image_ids = [], []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                image_ids.append(fn(db, detections, crop_paths))
+                latencies.append((time.perf_counter() - start) * 1000)
+            cleanup(db, image_ids)
+            timings[name] = min(latencies)
+        print(f"{n:10d} {timings['per_row']:14.1f} {timings['bulk']:12.1f} "
+              f"{timings['per_row'] / timings['bulk']:8.1f}x")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: image decoding — PIL + exif_transpose + RGB->BGR (the previous
+loader) vs the OpenCV decoder with EXIF-tag-only orientation handling,
+at full and reduced (1/2, 1/4, 1/8) resolution.
+
+Usage:
+    python benchmarks/bench_decode.py --image board.jpg
+    python benchmarks/bench_decode.py --resolution 48mp --orientation 6 --runs 20
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from detect import DECODE_REDUCTIONS, _decode_with_pil, decode_image
+from synthetic_pcb import RESOLUTIONS, generate_pcb
+
+
+def time_ms(fn, runs, warmup=2):
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.asarray(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare image decoders")
+    parser.add_argument("--image", type=str, help="JPEG to decode (default: synthetic board)")
+    parser.add_argument("--resolution", choices=RESOLUTIONS, default="12mp",
+                        help="Synthetic board resolution (default: 12mp)")
+    parser.add_argument("--orientation", type=int, default=6, choices=range(1, 9),
+                        help="EXIF orientation of the synthetic board (default: 6)")
+    parser.add_argument("--runs", type=int, default=10, help="Timed runs per decoder (default: 10)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.image
+        if not path:
+            width, height = RESOLUTIONS[args.resolution]
+            rgb = generate_pcb(width, height)[:, :, ::-1]
+            pil_img = Image.fromarray(rgb)
+            exif = pil_img.getexif()
+            exif[0x0112] = args.orientation
+            path = str(Path(tmp) / "board.jpg")
+            pil_img.save(path, exif=exif, quality=92)
+
+        print(f"Image: {path}  |  runs: {args.runs}")
+        print("=" * 72)
+        baseline = time_ms(lambda: _decode_with_pil(path), args.runs)
+        print(f"{'PIL + exif_transpose':24s} p50 {np.percentile(baseline, 50):8.1f} ms")
+        for reduction in sorted(DECODE_REDUCTIONS):
+            latencies = time_ms(lambda: decode_image(path, reduction=reduction), args.runs)
+            p50 = np.percentile(latencies, 50)
+            shape = decode_image(path, reduction=reduction)[0].shape
+            print(f"{'cv2 1/' + str(reduction):24s} p50 {p50:8.1f} ms  "
+                  f"({shape[1]}x{shape[0]}, {np.percentile(baseline, 50) / p50:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Benchmark: end-to-end throughput and latency with concurrency sweeps.
+
+Generates synthetic boards (see synthetic_pcb.py) at several resolutions
+and component densities, then runs ``ComponentAnalysisPipeline.process_image``
+and/or ``DualModelDetector.detect`` over them with 1..N worker threads.
+Each worker owns its own model instances, so workers never share a
+predictor. Reports images/sec and p50/p95/p99 latency per configuration
+and writes everything to a JSON file that ``compare`` can diff against a
+stored baseline.
+
+Usage:
+    # Run a sweep and store the results
+    python benchmarks/bench_e2e.py run --model smd_comp.onnx --ic-model ic_detect_best.onnx \\
+        --resolutions 1mp 12mp --densities low high --workers 1 2 4 --output results.json
+
+    # Compare against a baseline (exit code 1 on regression)
+    python benchmarks/bench_e2e.py compare baseline.json results.json --threshold 0.10
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from synthetic_pcb import RESOLUTIONS, DENSITIES, generate_set
+from model_registry import ModelRegistry
+
+TARGETS = ("pipeline", "dual")
+
+
+def _latency_stats(latencies_ms: List[float], wall_s: float) -> dict:
+    values = np.asarray(latencies_ms)
+    return {
+        "images": len(values),
+        "wall_s": round(wall_s, 3),
+        "throughput_ips": round(len(values) / wall_s, 3) if wall_s > 0 else 0.0,
+        "mean_ms": round(float(values.mean()), 2),
+        "p50_ms": round(float(np.percentile(values, 50)), 2),
+        "p95_ms": round(float(np.percentile(values, 95)), 2),
+        "p99_ms": round(float(np.percentile(values, 99)), 2),
+    }
+
+
+def _make_worker_factory(target: str, args, jobs_dir: Path):
+    """
+    Return a callable that builds the per-thread worker for ``target``.
+
+    Each worker gets a private ModelRegistry, so concurrent workers hold
+    independent model instances (as separate processes would).
+    """
+    def build():
+        registry = ModelRegistry()
+        if target == "pipeline":
+            from pipeline import ComponentAnalysisPipeline
+            pipeline = ComponentAnalysisPipeline(
+                args.model, conf_threshold=args.conf,
+                backend=args.backend, registry=registry,
+            )
+            return lambda path: pipeline.process_image(str(path), jobs_base_dir=str(jobs_dir))
+
+        from detect import DualModelDetector
+        detector = DualModelDetector(
+            args.model, args.ic_model,
+            backend=args.backend, registry=registry,
+        )
+        return lambda path: detector.detect(str(path))
+    return build
+
+
+def run_config(target: str, images: List[Path], workers: int, args, jobs_dir: Path) -> dict:
+    """Process every image once with ``workers`` threads and return the stats."""
+    local = threading.local()
+    build = _make_worker_factory(target, args, jobs_dir)
+
+    def worker():
+        if not hasattr(local, "fn"):
+            local.fn = build()
+        return local.fn
+
+    # Build (load + warm up) every worker's models before timing
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        barrier = threading.Barrier(workers)
+
+        def _init(_):
+            worker()
+            barrier.wait()
+        list(pool.map(_init, range(workers)))
+
+        def _timed(path):
+            fn = worker()
+            start = time.perf_counter()
+            fn(path)
+            return (time.perf_counter() - start) * 1000
+
+        list(pool.map(_timed, images[: args.warmup]))
+
+        start = time.perf_counter()
+        latencies = list(pool.map(_timed, images * args.repeat))
+        wall = time.perf_counter() - start
+
+    return _latency_stats(latencies, wall)
+
+
+def cmd_run(args) -> int:
+    if not Path(args.model).exists():
+        print(f"Error: Model file not found: {args.model}")
+        return 1
+    targets = TARGETS if args.target == "both" else (args.target,)
+    workdir = Path(tempfile.mkdtemp(prefix="nuts_bench_"))
+    results = []
+    try:
+        for resolution in args.resolutions:
+            for density in args.densities:
+                image_dir = workdir / f"{resolution}_{density}"
+                images = generate_set(str(image_dir), resolution, density, args.images, seed=args.seed)
+                for target in targets:
+                    for workers in args.workers:
+                        jobs_dir = workdir / "jobs" / f"{target}_{resolution}_{density}_{workers}"
+                        # The pipeline reports every job on stdout; keep the table readable
+                        quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+                        with quiet:
+                            stats = run_config(target, images, workers, args, jobs_dir)
+                        shutil.rmtree(jobs_dir, ignore_errors=True)
+                        row = {
+                            "target": target,
+                            "resolution": resolution,
+                            "density": density,
+                            "workers": workers,
+                            **stats,
+                        }
+                        results.append(row)
+                        print(f"{target:9s} {resolution:5s} {density:7s} workers={workers:<2d} "
+                              f"{stats['throughput_ips']:7.2f} img/s | p50 {stats['p50_ms']:8.1f} ms | "
+                              f"p95 {stats['p95_ms']:8.1f} ms | p99 {stats['p99_ms']:8.1f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(),
+            "host": platform.node(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "model": args.model,
+            "ic_model": args.ic_model,
+            "backend": args.backend,
+            "images_per_config": args.images * args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+def _index(report: dict) -> Dict[tuple, dict]:
+    return {
+        (r["target"], r["resolution"], r["density"], r["workers"]): r
+        for r in report["results"]
+    }
+
+
+def compare_reports(baseline: dict, current: dict, threshold: float = 0.10) -> List[dict]:
+    """
+    Diff two result files.
+
+    A configuration regresses when its throughput drops, or its p95
+    latency rises, by more than ``threshold`` (fraction) versus baseline.
+
+    Returns:
+        One row per configuration present in both files
+    """
+    base, cur = _index(baseline), _index(current)
+    rows = []
+    for key in sorted(base.keys() & cur.keys(), key=str):
+        b, c = base[key], cur[key]
+        throughput_change = (c["throughput_ips"] - b["throughput_ips"]) / b["throughput_ips"] if b["throughput_ips"] else 0.0
+        p95_change = (c["p95_ms"] - b["p95_ms"]) / b["p95_ms"] if b["p95_ms"] else 0.0
+        rows.append({
+            "config": key,
+            "throughput_change": throughput_change,
+            "p95_change": p95_change,
+            "regression": throughput_change < -threshold or p95_change > threshold,
+        })
+    return rows
+
+
+def cmd_compare(args) -> int:
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    rows = compare_reports(baseline, current, args.threshold)
+    if not rows:
+        print("No common configurations between the two files")
+        return 1
+
+    regressions = 0
+    for row in rows:
+        target, resolution, density, workers = row["config"]
+        flag = "REGRESSION" if row["regression"] else "ok"
+        regressions += row["regression"]
+        print(f"{target:9s} {resolution:5s} {density:7s} workers={workers:<2d} "
+              f"throughput {row['throughput_change']:+7.1%} | p95 {row['p95_change']:+7.1%}  {flag}")
+
+    missing = _index(baseline).keys() - _index(current).keys()
+    if missing:
+        print(f"\n{len(missing)} baseline configuration(s) missing from current results")
+    print(f"\n{regressions} regression(s) over {len(rows)} configuration(s) "
+          f"(threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end throughput / latency benchmark")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run a benchmark sweep")
+    run.add_argument("--model", type=str, default="smd_comp.onnx", help="smd_comp model")
+    run.add_argument("--ic-model", type=str, help="ic_detect model for the dual target (optional)")
+    run.add_argument("--backend", choices=("ultralytics", "onnxruntime"), default="ultralytics", help="Inference backend")
+    run.add_argument("--target", choices=TARGETS + ("both",), default="both", help="What to benchmark (default: both)")
+    run.add_argument("--resolutions", nargs="+", choices=RESOLUTIONS, default=["1mp", "12mp"], help="Image resolutions")
+    run.add_argument("--densities", nargs="+", choices=DENSITIES, default=["low", "high"], help="Component densities")
+    run.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4], help="Worker thread counts to sweep")
+    run.add_argument("--images", type=int, default=8, help="Distinct images per configuration (default: 8)")
+    run.add_argument("--repeat", type=int, default=1, help="Passes over the images (default: 1)")
+    run.add_argument("--warmup", type=int, default=1, help="Untimed images per configuration (default: 1)")
+    run.add_argument("--conf", type=float, default=0.25, help="Confidence threshold (default: 0.25)")
+    run.add_argument("--seed", type=int, default=0, help="Image generator seed (default: 0)")
+    run.add_argument("--output", type=str, default="bench_results.json", help="Results file")
+    run.add_argument("--verbose", action="store_true", help="Show the pipeline's per-job output")
+    run.set_defaults(func=cmd_run)
+
+    compare = sub.add_parser("compare", help="Compare results against a baseline")
+    compare.add_argument("baseline", type=str, help="Baseline results JSON")
+    compare.add_argument("current", type=str, help="Current results JSON")
+    compare.add_argument("--threshold", type=float, default=0.10,
+                         help="Relative change counted as a regression (default: 0.10)")
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
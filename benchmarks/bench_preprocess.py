@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: preprocessing at full resolution vs at model input resolution.
+
+Runs ``detect_components`` with ``preprocess_order='full'`` (blur / CLAHE /
+sharpen the full photo, then the model downsamples it) and
+``preprocess_order='letterbox'`` (letterbox first, filter the small model
+input in preallocated buffers). Reports preprocess and end-to-end latency
+per order and how many detections agree (same class, IoU >= 0.5,
+one-to-one).
+
+Usage:
+    python benchmarks/bench_preprocess.py --model smd_comp.onnx --image board.jpg --clahe --sharpen
+    python benchmarks/bench_preprocess.py --model smd_comp.onnx --resolution 24mp --runs 20
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from detect import BACKENDS, PREPROCESS_ORDERS, ComponentDetector, load_image_with_exif
+from timing import StageTimer
+from bench_backends import agreement
+from synthetic_pcb import RESOLUTIONS, generate_pcb
+
+
+def time_order(detector, image, runs, warmup, **kwargs):
+    """Return (preprocess_ms, total_ms, last_detections) over ``runs`` calls."""
+    for _ in range(warmup):
+        detector.detect_components("bench", save_visualization=False, image=image, **kwargs)
+    preprocess, total = [], []
+    detections = []
+    for _ in range(runs):
+        timer = StageTimer()
+        detections = detector.detect_components(
+            "bench", save_visualization=False, image=image, timer=timer, **kwargs)
+        timings = timer.as_dict()
+        preprocess.append(timings.get('preprocess', 0.0))
+        total.append(timings['total'])
+    return np.asarray(preprocess), np.asarray(total), detections
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full-resolution and letterbox-first preprocessing")
+    parser.add_argument("--model", type=str, default="smd_comp.onnx", help="Path to model")
+    parser.add_argument("--backend", choices=BACKENDS, default="ultralytics", help="Inference backend")
+    parser.add_argument("--image", type=str, help="Image to run on (default: synthetic board)")
+    parser.add_argument("--resolution", choices=RESOLUTIONS, default="12mp",
+                        help="Synthetic board resolution (default: 12mp)")
+    parser.add_argument("--clahe", action="store_true", help="Also apply CLAHE")
+    parser.add_argument("--sharpen", action="store_true", help="Also apply sharpening")
+    parser.add_argument("--runs", type=int, default=10, help="Timed runs per order (default: 10)")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed warm-up runs (default: 2)")
+    parser.add_argument("--conf", type=float, default=0.25, help="Confidence threshold (default: 0.25)")
+    args = parser.parse_args()
+
+    if args.image:
+        image = load_image_with_exif(args.image)
+    else:
+        image = generate_pcb(*RESOLUTIONS[args.resolution], density=60)
+
+    print(f"Model: {args.model}  |  image: {image.shape[1]}x{image.shape[0]}  |  "
+          f"clahe: {args.clahe}  sharpen: {args.sharpen}  |  runs: {args.runs}")
+    print("=" * 80)
+
+    results = {}
+    for order in PREPROCESS_ORDERS:
+        detector = ComponentDetector(args.model, conf_threshold=args.conf,
+                                     backend=args.backend, preprocess_order=order)
+        preprocess, total, detections = time_order(
+            detector, image, args.runs, args.warmup,
+            apply_clahe=args.clahe, apply_sharpen=args.sharpen,
+        )
+        results[order] = (np.percentile(total, 50), detections)
+        print(f"{order:10s} preprocess p50 {np.percentile(preprocess, 50):8.1f} ms | "
+              f"total p50 {np.percentile(total, 50):8.1f} ms | "
+              f"p95 {np.percentile(total, 95):8.1f} ms | {len(detections)} detections")
+
+    (full_ms, full), (boxed_ms, boxed) = results['full'], results['letterbox']
+    matched = agreement(full, boxed)
+    denominator = len(full) + len(boxed)
+    print("=" * 80)
+    print(f"Speedup (total p50): {full_ms / boxed_ms:.2f}x")
+    print(f"Agreement: {matched} matched, "
+          f"{2 * matched / denominator if denominator else 1.0:.1%} of detections")
+
+
+if __name__ == "__main__":
+    main()
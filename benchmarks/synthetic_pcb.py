@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Synthetic PCB image generator for the benchmarks.
+
+Draws a solder-mask board with traces, vias and rectangular "components"
+(bodies, pads, pins and silkscreen labels) at a given resolution and
+component density. The images are not meant to be detected correctly —
+they give the pipeline realistic sizes, textures and JPEG entropy so that
+decode, preprocessing, inference, cropping and encoding costs are
+representative and reproducible.
+
+Usage:
+    python benchmarks/synthetic_pcb.py --resolution 12mp --density high --count 5 --output-dir /tmp/pcbs
+"""
+
+import argparse
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+
+# Named resolutions (width, height), from phone snapshots to 48 MP sensors
+RESOLUTIONS: Dict[str, Tuple[int, int]] = {
+    "1mp": (1280, 960),
+    "5mp": (2592, 1944),
+    "12mp": (4000, 3000),
+    "24mp": (6000, 4000),
+    "48mp": (8000, 6000),
+}
+
+# Components per megapixel
+DENSITIES: Dict[str, int] = {
+    "low": 15,
+    "medium": 60,
+    "high": 200,
+}
+
+_BOARD_COLORS = [(40, 90, 20), (60, 40, 10), (30, 30, 120), (20, 20, 20)]
+_BODY_COLORS = [(25, 25, 25), (40, 40, 40), (60, 120, 170), (200, 200, 200), (30, 60, 100)]
+_PAD_COLOR = (170, 190, 200)
+
+
+def generate_pcb(
+    width: int,
+    height: int,
+    density: int = DENSITIES["medium"],
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Generate one synthetic board image.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        density: Components per megapixel
+        seed: Random seed (same seed, same image)
+
+    Returns:
+        BGR image of shape (height, width, 3)
+    """
+    rng = np.random.default_rng(seed)
+    board = np.empty((height, width, 3), dtype=np.uint8)
+    board[:] = _BOARD_COLORS[int(rng.integers(len(_BOARD_COLORS)))]
+
+    # Solder-mask texture
+    noise = rng.normal(0, 6, size=(height // 4 + 1, width // 4 + 1, 1)).astype(np.float32)
+    noise = cv2.resize(noise, (width, height), interpolation=cv2.INTER_LINEAR)
+    board = np.clip(board.astype(np.float32) + noise[:, :, None], 0, 255).astype(np.uint8)
+
+    # Component size grows with resolution, as when the same board is shot
+    # with a higher-resolution camera
+    scale = max(0.5, min(width, height) / 2000)
+    trace_color = tuple(int(c * 1.4) for c in board[0, 0])
+
+    # Traces and vias
+    for _ in range(int(40 * scale)):
+        x, y = int(rng.integers(width)), int(rng.integers(height))
+        for _ in range(int(rng.integers(2, 5))):
+            if rng.random() < 0.5:
+                nx, ny = int(np.clip(x + rng.integers(-400, 400) * scale, 0, width - 1)), y
+            else:
+                nx, ny = x, int(np.clip(y + rng.integers(-400, 400) * scale, 0, height - 1))
+            cv2.line(board, (x, y), (nx, ny), trace_color, max(1, int(3 * scale)))
+            x, y = nx, ny
+        cv2.circle(board, (x, y), max(2, int(5 * scale)), _PAD_COLOR, -1)
+
+    # Components
+    n_components = int(density * width * height / 1e6)
+    for _ in range(n_components):
+        w = int(rng.uniform(10, 60) * scale)
+        h = int(rng.uniform(8, 40) * scale)
+        x1 = int(rng.integers(0, max(1, width - w)))
+        y1 = int(rng.integers(0, max(1, height - h)))
+        x2, y2 = x1 + w, y1 + h
+        kind = rng.random()
+
+        if kind < 0.6:
+            # Two-terminal passive: pads at both ends
+            pad = max(2, w // 5)
+            cv2.rectangle(board, (x1, y1), (x1 + pad, y2), _PAD_COLOR, -1)
+            cv2.rectangle(board, (x2 - pad, y1), (x2, y2), _PAD_COLOR, -1)
+            body = _BODY_COLORS[int(rng.integers(len(_BODY_COLORS)))]
+            cv2.rectangle(board, (x1 + pad, y1), (x2 - pad, y2), body, -1)
+        else:
+            # IC: dark body with pins along two or four sides
+            cv2.rectangle(board, (x1, y1), (x2, y2), (20, 20, 20), -1)
+            pin = max(2, int(3 * scale))
+            step = max(pin * 2, 4)
+            for px in range(x1 + pin, x2 - pin, step):
+                cv2.rectangle(board, (px, y1 - pin * 2), (px + pin, y1), _PAD_COLOR, -1)
+                cv2.rectangle(board, (px, y2), (px + pin, y2 + pin * 2), _PAD_COLOR, -1)
+            if kind > 0.85:
+                for py in range(y1 + pin, y2 - pin, step):
+                    cv2.rectangle(board, (x1 - pin * 2, py), (x1, py + pin), _PAD_COLOR, -1)
+                    cv2.rectangle(board, (x2, py), (x2 + pin * 2, py + pin), _PAD_COLOR, -1)
+            cv2.circle(board, (x1 + pin * 2, y1 + pin * 2), pin, (90, 90, 90), -1)
+
+        # Silkscreen reference designator
+        if rng.random() < 0.5:
+            label = f"{'RCUDL'[int(rng.integers(5))]}{int(rng.integers(1, 999))}"
+            cv2.putText(board, label, (x1, max(0, y1 - int(4 * scale))),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.4 * scale, (235, 235, 235), max(1, int(scale)))
+
+    return board
+
+
+def generate_set(
+    output_dir: str,
+    resolution: str = "12mp",
+    density: str = "medium",
+    count: int = 5,
+    seed: int = 0,
+    quality: int = 92,
+) -> List[Path]:
+    """
+    Write ``count`` synthetic boards as JPEG files.
+
+    Args:
+        output_dir: Destination directory (created if needed)
+        resolution: Key of :data:`RESOLUTIONS`
+        density: Key of :data:`DENSITIES`
+        count: Number of images
+        seed: Base random seed
+        quality: JPEG quality
+
+    Returns:
+        Paths of the written images
+    """
+    width, height = RESOLUTIONS[resolution]
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        image = generate_pcb(width, height, DENSITIES[density], seed=seed + i)
+        path = out / f"synthetic_{resolution}_{density}_{i:03d}.jpg"
+        cv2.imwrite(str(path), image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic PCB images")
+    parser.add_argument("--resolution", choices=RESOLUTIONS, default="12mp", help="Image resolution (default: 12mp)")
+    parser.add_argument("--density", choices=DENSITIES, default="medium", help="Component density (default: medium)")
+    parser.add_argument("--count", type=int, default=5, help="Number of images (default: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="Base random seed (default: 0)")
+    parser.add_argument("--output-dir", type=str, required=True, help="Destination directory")
+    args = parser.parse_args()
+
+    paths = generate_set(args.output_dir, args.resolution, args.density, args.count, args.seed)
+    print(f"Wrote {len(paths)} images to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
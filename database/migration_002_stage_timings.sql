@@ -0,0 +1,31 @@
+-- Migration 002 — Per-stage timings
+-- Adds one duration column (milliseconds) per pipeline stage to log_jobs,
+-- and a JSONB timings block to log_pcba_pb_import for the Photo Booth flow.
+-- The same figures are written to each job's metadata.json ("timings").
+--
+-- Usage:
+--   psql -h <host> -U nuts_user -d nuts_vision -f database/migration_002_stage_timings.sql
+
+-- ---------------------------------------------------------------------------
+-- log_jobs: one column per stage (NULL for jobs recorded before this migration)
+-- ---------------------------------------------------------------------------
+ALTER TABLE log_jobs
+    ADD COLUMN IF NOT EXISTS decode_ms      REAL,   -- file read + JPEG/PNG decode
+    ADD COLUMN IF NOT EXISTS exif_ms        REAL,   -- EXIF orientation transpose
+    ADD COLUMN IF NOT EXISTS preprocess_ms  REAL,   -- blur / CLAHE / sharpen / tile preparation
+    ADD COLUMN IF NOT EXISTS inference_ms   REAL,   -- model forward pass(es)
+    ADD COLUMN IF NOT EXISTS parse_ms       REAL,   -- result parsing + tile merge
+    ADD COLUMN IF NOT EXISTS annotate_ms    REAL,   -- drawing result.jpg
+    ADD COLUMN IF NOT EXISTS crop_ms        REAL,   -- cutting component crops
+    ADD COLUMN IF NOT EXISTS encode_ms      REAL,   -- JPEG encoding + writes
+    ADD COLUMN IF NOT EXISTS db_ms          REAL,   -- database logging
+    ADD COLUMN IF NOT EXISTS total_ms       REAL;   -- wall time of the whole job
+
+-- Recent-jobs percentile queries scan the newest rows first
+CREATE INDEX IF NOT EXISTS idx_log_jobs_started_at ON log_jobs (started_at DESC);
+
+-- ---------------------------------------------------------------------------
+-- log_pcba_pb_import: stage -> milliseconds
+-- ---------------------------------------------------------------------------
+ALTER TABLE log_pcba_pb_import
+    ADD COLUMN IF NOT EXISTS timings JSONB;
@@ -0,0 +1,27 @@
+-- Migration 003 — Content-addressed uploads
+-- Records the SHA-256 of each uploaded photo, so an identical upload maps
+-- to the existing images_input row (and its jobs) instead of a duplicate.
+-- The same hash is written to each job's metadata.json ("content_hash").
+--
+-- Usage:
+--   psql -h <host> -U nuts_user -d nuts_vision -f database/migration_003_content_hash.sql
+
+-- ---------------------------------------------------------------------------
+-- images_input: one row per distinct content (NULL for rows logged before
+-- this migration, which the partial index ignores)
+-- ---------------------------------------------------------------------------
+ALTER TABLE images_input
+    ADD COLUMN IF NOT EXISTS content_hash CHAR(64);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_images_input_content_hash
+    ON images_input (content_hash)
+    WHERE content_hash IS NOT NULL;
+
+-- ---------------------------------------------------------------------------
+-- log_pcba_pb_import: source photo of each Photo Booth export
+-- ---------------------------------------------------------------------------
+ALTER TABLE log_pcba_pb_import
+    ADD COLUMN IF NOT EXISTS content_hash CHAR(64);
+
+CREATE INDEX IF NOT EXISTS idx_log_pcba_pb_import_content_hash
+    ON log_pcba_pb_import (content_hash);
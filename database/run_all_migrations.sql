@@ -158,6 +158,311 @@ BEGIN
 END
 $$;
 
+-- =========================================================================
+-- 3. Per-stage timings (migration_002_stage_timings.sql)
+-- =========================================================================
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM schema_migrations WHERE version = 2) THEN
+
+        ALTER TABLE log_jobs
+            ADD COLUMN IF NOT EXISTS decode_ms      REAL,
+            ADD COLUMN IF NOT EXISTS exif_ms        REAL,
+            ADD COLUMN IF NOT EXISTS preprocess_ms  REAL,
+            ADD COLUMN IF NOT EXISTS inference_ms   REAL,
+            ADD COLUMN IF NOT EXISTS parse_ms       REAL,
+            ADD COLUMN IF NOT EXISTS annotate_ms    REAL,
+            ADD COLUMN IF NOT EXISTS crop_ms        REAL,
+            ADD COLUMN IF NOT EXISTS encode_ms      REAL,
+            ADD COLUMN IF NOT EXISTS db_ms          REAL,
+            ADD COLUMN IF NOT EXISTS total_ms       REAL;
+
+        CREATE INDEX IF NOT EXISTS idx_log_jobs_started_at ON log_jobs (started_at DESC);
+
+        ALTER TABLE log_pcba_pb_import
+            ADD COLUMN IF NOT EXISTS timings JSONB;
+
+        INSERT INTO schema_migrations (version, name) VALUES (2, 'stage_timings');
+        RAISE NOTICE 'Applied migration 2 — stage_timings';
+    ELSE
+        RAISE NOTICE 'Migration 2 (stage_timings) already applied, skipping';
+    END IF;
+END
+$$;
+
+-- =========================================================================
+-- 4. Content-addressed uploads (migration_003_content_hash.sql)
+-- =========================================================================
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM schema_migrations WHERE version = 3) THEN
+
+        ALTER TABLE images_input
+            ADD COLUMN IF NOT EXISTS content_hash CHAR(64);
+
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_images_input_content_hash
+            ON images_input (content_hash)
+            WHERE content_hash IS NOT NULL;
+
+        ALTER TABLE log_pcba_pb_import
+            ADD COLUMN IF NOT EXISTS content_hash CHAR(64);
+
+        CREATE INDEX IF NOT EXISTS idx_log_pcba_pb_import_content_hash
+            ON log_pcba_pb_import (content_hash);
+
+        INSERT INTO schema_migrations (version, name) VALUES (3, 'content_hash');
+        RAISE NOTICE 'Applied migration 3 — content_hash';
+    ELSE
+        RAISE NOTICE 'Migration 3 (content_hash) already applied, skipping';
+    END IF;
+END
+$$;
+
+-- =========================================================================
+-- 5. Summary statistics tables (migration_004_summary_stats.sql)
+-- =========================================================================
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM schema_migrations WHERE version = 4) THEN
+
+        -- ---------------------------------------------------------------------------
+        -- Summary tables
+        --   stats_totals:       one counter per name (images, jobs, detections,
+        --                       pcba_imports, pcba_detections, pcba_completed,
+        --                       pcba_errors)
+        --   stats_class_counts: rows per class, source 'detections' (class_name)
+        --                       or 'pcba_rows' (log_pcba_pb_row_import.detection_type)
+        -- ---------------------------------------------------------------------------
+        CREATE TABLE IF NOT EXISTS stats_totals (
+            name   TEXT   PRIMARY KEY,
+            value  BIGINT NOT NULL DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS stats_class_counts (
+            source      TEXT   NOT NULL,
+            class_name  TEXT   NOT NULL,
+            count       BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (source, class_name)
+        );
+
+        -- ---------------------------------------------------------------------------
+        -- Trigger functions (transition tables: new_rows / old_rows)
+        -- ---------------------------------------------------------------------------
+
+        -- Row count of a table; TG_ARGV[0] is the stats_totals name
+        CREATE OR REPLACE FUNCTION stats_count_rows() RETURNS trigger AS $fn$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE stats_totals SET value = value + (SELECT COUNT(*) FROM new_rows)
+                WHERE name = TG_ARGV[0];
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE stats_totals SET value = value - (SELECT COUNT(*) FROM old_rows)
+                WHERE name = TG_ARGV[0];
+            END IF;
+            RETURN NULL;
+        END
+        $fn$ LANGUAGE plpgsql;
+
+        -- detections: total and per class_name
+        CREATE OR REPLACE FUNCTION stats_detections_changed() RETURNS trigger AS $fn$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE stats_class_counts c SET count = c.count - o.n
+                FROM (SELECT class_name, COUNT(*) AS n FROM old_rows GROUP BY class_name) o
+                WHERE c.source = 'detections' AND c.class_name = o.class_name;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                -- Sorted, so concurrent jobs lock the class rows in the same order
+                INSERT INTO stats_class_counts (source, class_name, count)
+                SELECT 'detections', class_name, COUNT(*) FROM new_rows
+                GROUP BY class_name ORDER BY class_name
+                ON CONFLICT (source, class_name)
+                DO UPDATE SET count = stats_class_counts.count + EXCLUDED.count;
+            END IF;
+            IF TG_OP = 'INSERT' THEN
+                UPDATE stats_totals SET value = value + (SELECT COUNT(*) FROM new_rows)
+                WHERE name = 'detections';
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE stats_totals SET value = value - (SELECT COUNT(*) FROM old_rows)
+                WHERE name = 'detections';
+            END IF;
+            RETURN NULL;
+        END
+        $fn$ LANGUAGE plpgsql;
+
+        -- log_pcba_pb_row_import: per detection_type (rows without one are not counted)
+        CREATE OR REPLACE FUNCTION stats_pcba_rows_changed() RETURNS trigger AS $fn$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE stats_class_counts c SET count = c.count - o.n
+                FROM (SELECT detection_type, COUNT(*) AS n FROM old_rows
+                      WHERE detection_type IS NOT NULL GROUP BY detection_type) o
+                WHERE c.source = 'pcba_rows' AND c.class_name = o.detection_type;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO stats_class_counts (source, class_name, count)
+                SELECT 'pcba_rows', detection_type, COUNT(*) FROM new_rows
+                WHERE detection_type IS NOT NULL
+                GROUP BY detection_type ORDER BY detection_type
+                ON CONFLICT (source, class_name)
+                DO UPDATE SET count = stats_class_counts.count + EXCLUDED.count;
+            END IF;
+            RETURN NULL;
+        END
+        $fn$ LANGUAGE plpgsql;
+
+        -- log_pcba_pb_import: imports, summed total_detections, completed / error
+        CREATE OR REPLACE FUNCTION stats_pcba_imports_changed() RETURNS trigger AS $fn$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE stats_totals t SET value = t.value - d.value
+                FROM (
+                    SELECT 'pcba_imports' AS name, COUNT(*) AS value FROM old_rows
+                    UNION ALL SELECT 'pcba_detections', COALESCE(SUM(total_detections), 0) FROM old_rows
+                    UNION ALL SELECT 'pcba_completed', COUNT(*) FILTER (WHERE status = 'completed') FROM old_rows
+                    UNION ALL SELECT 'pcba_errors', COUNT(*) FILTER (WHERE status = 'error') FROM old_rows
+                ) d
+                WHERE t.name = d.name;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE stats_totals t SET value = t.value + d.value
+                FROM (
+                    SELECT 'pcba_imports' AS name, COUNT(*) AS value FROM new_rows
+                    UNION ALL SELECT 'pcba_detections', COALESCE(SUM(total_detections), 0) FROM new_rows
+                    UNION ALL SELECT 'pcba_completed', COUNT(*) FILTER (WHERE status = 'completed') FROM new_rows
+                    UNION ALL SELECT 'pcba_errors', COUNT(*) FILTER (WHERE status = 'error') FROM new_rows
+                ) d
+                WHERE t.name = d.name;
+            END IF;
+            RETURN NULL;
+        END
+        $fn$ LANGUAGE plpgsql;
+
+        -- TRUNCATE: TG_ARGV holds the stats_totals names / class sources to reset
+        CREATE OR REPLACE FUNCTION stats_truncated() RETURNS trigger AS $fn$
+        BEGIN
+            UPDATE stats_totals SET value = 0 WHERE name = ANY (TG_ARGV);
+            DELETE FROM stats_class_counts WHERE source = ANY (TG_ARGV);
+            RETURN NULL;
+        END
+        $fn$ LANGUAGE plpgsql;
+
+        -- Recompute every counter from the source tables (backfill / repair).
+        -- Blocks writers to the source tables until the calling transaction ends.
+        CREATE OR REPLACE FUNCTION refresh_summary_stats() RETURNS void AS $fn$
+        BEGIN
+            LOCK TABLE images_input, log_jobs, detections,
+                       log_pcba_pb_import, log_pcba_pb_row_import IN SHARE MODE;
+            LOCK TABLE stats_totals, stats_class_counts IN EXCLUSIVE MODE;
+
+            DELETE FROM stats_totals;
+            INSERT INTO stats_totals (name, value)
+                      SELECT 'images', COUNT(*) FROM images_input
+            UNION ALL SELECT 'jobs', COUNT(*) FROM log_jobs
+            UNION ALL SELECT 'detections', COUNT(*) FROM detections
+            UNION ALL SELECT 'pcba_imports', COUNT(*) FROM log_pcba_pb_import
+            UNION ALL SELECT 'pcba_detections', COALESCE(SUM(total_detections), 0) FROM log_pcba_pb_import
+            UNION ALL SELECT 'pcba_completed', COUNT(*) FILTER (WHERE status = 'completed') FROM log_pcba_pb_import
+            UNION ALL SELECT 'pcba_errors', COUNT(*) FILTER (WHERE status = 'error') FROM log_pcba_pb_import;
+
+            DELETE FROM stats_class_counts;
+            INSERT INTO stats_class_counts (source, class_name, count)
+            SELECT 'detections', class_name, COUNT(*) FROM detections GROUP BY class_name;
+            INSERT INTO stats_class_counts (source, class_name, count)
+            SELECT 'pcba_rows', detection_type, COUNT(*) FROM log_pcba_pb_row_import
+            WHERE detection_type IS NOT NULL GROUP BY detection_type;
+        END
+        $fn$ LANGUAGE plpgsql;
+
+        -- ---------------------------------------------------------------------------
+        -- Triggers
+        -- ---------------------------------------------------------------------------
+        DROP TRIGGER IF EXISTS stats_images_insert ON images_input;
+        CREATE TRIGGER stats_images_insert AFTER INSERT ON images_input
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE PROCEDURE stats_count_rows('images');
+        DROP TRIGGER IF EXISTS stats_images_delete ON images_input;
+        CREATE TRIGGER stats_images_delete AFTER DELETE ON images_input
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE PROCEDURE stats_count_rows('images');
+        DROP TRIGGER IF EXISTS stats_images_truncate ON images_input;
+        CREATE TRIGGER stats_images_truncate AFTER TRUNCATE ON images_input
+            FOR EACH STATEMENT EXECUTE PROCEDURE stats_truncated('images');
+
+        DROP TRIGGER IF EXISTS stats_jobs_insert ON log_jobs;
+        CREATE TRIGGER stats_jobs_insert AFTER INSERT ON log_jobs
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE PROCEDURE stats_count_rows('jobs');
+        DROP TRIGGER IF EXISTS stats_jobs_delete ON log_jobs;
+        CREATE TRIGGER stats_jobs_delete AFTER DELETE ON log_jobs
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE PROCEDURE stats_count_rows('jobs');
+        DROP TRIGGER IF EXISTS stats_jobs_truncate ON log_jobs;
+        CREATE TRIGGER stats_jobs_truncate AFTER TRUNCATE ON log_jobs
+            FOR EACH STATEMENT EXECUTE PROCEDURE stats_truncated('jobs');
+
+        DROP TRIGGER IF EXISTS stats_detections_insert ON detections;
+        CREATE TRIGGER stats_detections_insert AFTER INSERT ON detections
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE PROCEDURE stats_detections_changed();
+        DROP TRIGGER IF EXISTS stats_detections_update ON detections;
+        CREATE TRIGGER stats_detections_update AFTER UPDATE ON detections
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE PROCEDURE stats_detections_changed();
+        DROP TRIGGER IF EXISTS stats_detections_delete ON detections;
+        CREATE TRIGGER stats_detections_delete AFTER DELETE ON detections
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE PROCEDURE stats_detections_changed();
+        DROP TRIGGER IF EXISTS stats_detections_truncate ON detections;
+        CREATE TRIGGER stats_detections_truncate AFTER TRUNCATE ON detections
+            FOR EACH STATEMENT EXECUTE PROCEDURE stats_truncated('detections');
+
+        DROP TRIGGER IF EXISTS stats_pcba_imports_insert ON log_pcba_pb_import;
+        CREATE TRIGGER stats_pcba_imports_insert AFTER INSERT ON log_pcba_pb_import
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE PROCEDURE stats_pcba_imports_changed();
+        DROP TRIGGER IF EXISTS stats_pcba_imports_update ON log_pcba_pb_import;
+        CREATE TRIGGER stats_pcba_imports_update AFTER UPDATE ON log_pcba_pb_import
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE PROCEDURE stats_pcba_imports_changed();
+        DROP TRIGGER IF EXISTS stats_pcba_imports_delete ON log_pcba_pb_import;
+        CREATE TRIGGER stats_pcba_imports_delete AFTER DELETE ON log_pcba_pb_import
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE PROCEDURE stats_pcba_imports_changed();
+        DROP TRIGGER IF EXISTS stats_pcba_imports_truncate ON log_pcba_pb_import;
+        CREATE TRIGGER stats_pcba_imports_truncate AFTER TRUNCATE ON log_pcba_pb_import
+            FOR EACH STATEMENT EXECUTE PROCEDURE
+            stats_truncated('pcba_imports', 'pcba_detections', 'pcba_completed', 'pcba_errors');
+
+        DROP TRIGGER IF EXISTS stats_pcba_rows_insert ON log_pcba_pb_row_import;
+        CREATE TRIGGER stats_pcba_rows_insert AFTER INSERT ON log_pcba_pb_row_import
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE PROCEDURE stats_pcba_rows_changed();
+        DROP TRIGGER IF EXISTS stats_pcba_rows_update ON log_pcba_pb_row_import;
+        CREATE TRIGGER stats_pcba_rows_update AFTER UPDATE ON log_pcba_pb_row_import
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE PROCEDURE stats_pcba_rows_changed();
+        DROP TRIGGER IF EXISTS stats_pcba_rows_delete ON log_pcba_pb_row_import;
+        CREATE TRIGGER stats_pcba_rows_delete AFTER DELETE ON log_pcba_pb_row_import
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE PROCEDURE stats_pcba_rows_changed();
+        DROP TRIGGER IF EXISTS stats_pcba_rows_truncate ON log_pcba_pb_row_import;
+        CREATE TRIGGER stats_pcba_rows_truncate AFTER TRUNCATE ON log_pcba_pb_row_import
+            FOR EACH STATEMENT EXECUTE PROCEDURE stats_truncated('pcba_rows');
+
+        -- ---------------------------------------------------------------------------
+        -- Backfill from the rows logged so far
+        -- ---------------------------------------------------------------------------
+        PERFORM refresh_summary_stats();
+
+        INSERT INTO schema_migrations (version, name) VALUES (4, 'summary_stats');
+        RAISE NOTICE 'Applied migration 4 — summary_stats';
+    ELSE
+        RAISE NOTICE 'Migration 4 (summary_stats) already applied, skipping';
+    END IF;
+END
+$$;
+
 COMMIT;
 
 -- =========================================================================
@@ -7,12 +7,13 @@ A computer vision system for automated electronic circuit board analysis.
 __version__ = "2.2.0"
 __author__ = "nuts_vision contributors"
 
-from .detect import ComponentDetector
+from .detect import ComponentDetector, DetectionResult
 from .crop import ComponentCropper
 from .visualize import DetectionVisualizer
 
 __all__ = [
     'ComponentDetector',
+    'DetectionResult',
     'ComponentCropper',
     'DetectionVisualizer'
 ]
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Bounding Box Utilities
+Vectorized IoU computation, one-to-one box matching and non-maximum
+suppression.
+"""
+
+import numpy as np
+from typing import List, Tuple
+
+
+MATCHING_METHODS = ('greedy', 'hungarian')
+
+
+def iou_matrix(boxes_a, boxes_b) -> np.ndarray:
+    """
+    Compute the pairwise IoU between two sets of [x1, y1, x2, y2] boxes.
+
+    Args:
+        boxes_a: Array-like of shape (N, 4)
+        boxes_b: Array-like of shape (M, 4)
+
+    Returns:
+        Array of shape (N, M) with IoU values in [0, 1]
+    """
+    a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float64)
+
+    inter_w = np.minimum(a[:, None, 2], b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0])
+    inter_h = np.minimum(a[:, None, 3], b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1])
+    inter = np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+
+    iou = np.zeros_like(inter)
+    np.divide(inter, union, out=iou, where=(union > 0) & (inter > 0))
+    return iou
+
+
+def match_greedy(iou: np.ndarray, threshold: float) -> List[Tuple[int, int]]:
+    """
+    One-to-one matching that repeatedly takes the highest remaining IoU pair.
+
+    Args:
+        iou: IoU matrix of shape (N, M)
+        threshold: Minimum IoU for a pair to be matched
+
+    Returns:
+        List of (row, col) index pairs
+    """
+    rows, cols = np.nonzero(iou >= threshold)
+    if len(rows) == 0:
+        return []
+    # Highest IoU first; ties broken by row then column for determinism
+    order = np.lexsort((cols, rows, -iou[rows, cols]))
+
+    used_rows, used_cols = set(), set()
+    matches = []
+    for r, c in zip(rows[order].tolist(), cols[order].tolist()):
+        if r in used_rows or c in used_cols:
+            continue
+        used_rows.add(r)
+        used_cols.add(c)
+        matches.append((r, c))
+    return matches
+
+
+def match_hungarian(iou: np.ndarray, threshold: float) -> List[Tuple[int, int]]:
+    """
+    One-to-one matching that maximises the total IoU (Hungarian algorithm).
+
+    Pairs below ``threshold`` are never matched. Requires SciPy.
+
+    Args:
+        iou: IoU matrix of shape (N, M)
+        threshold: Minimum IoU for a pair to be matched
+
+    Returns:
+        List of (row, col) index pairs
+    """
+    try:
+        from scipy.optimize import linear_sum_assignment
+    except ImportError as e:
+        raise ImportError("Hungarian matching requires scipy (pip install scipy)") from e
+
+    if iou.size == 0:
+        return []
+    # Pairs under the threshold carry no weight, so they are only "assigned"
+    # when nothing better exists and are filtered out below.
+    weights = np.where(iou >= threshold, iou, 0.0)
+    rows, cols = linear_sum_assignment(weights, maximize=True)
+    return [
+        (int(r), int(c)) for r, c in zip(rows, cols)
+        if iou[r, c] >= threshold
+    ]
+
+
+def match_boxes(
+    iou: np.ndarray,
+    threshold: float,
+    method: str = 'greedy',
+) -> List[Tuple[int, int]]:
+    """
+    Dispatch to a one-to-one matching method.
+
+    Args:
+        iou: IoU matrix of shape (N, M)
+        threshold: Minimum IoU for a pair to be matched
+        method: 'greedy' or 'hungarian'
+
+    Returns:
+        List of (row, col) index pairs
+    """
+    if method == 'greedy':
+        return match_greedy(iou, threshold)
+    if method == 'hungarian':
+        return match_hungarian(iou, threshold)
+    raise ValueError(f"Unknown matching method '{method}' (expected one of {MATCHING_METHODS})")
+
+
+def nms(boxes, scores, iou_threshold: float = 0.5) -> np.ndarray:
+    """
+    Greedy non-maximum suppression.
+
+    Args:
+        boxes: Array-like of shape (N, 4), [x1, y1, x2, y2]
+        scores: Array-like of shape (N,)
+        iou_threshold: Boxes overlapping a kept box above this IoU are dropped
+
+    Returns:
+        Indices of the kept boxes, highest score first
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    x1, y1, x2, y2 = boxes.T
+    areas = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    order = np.argsort(-scores, kind='stable')
+
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        inter = (
+            np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+            * np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        )
+        union = areas[i] + areas[rest] - inter
+        iou = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def batched_nms(boxes, scores, class_ids, iou_threshold: float = 0.5) -> np.ndarray:
+    """
+    Class-aware NMS: boxes only suppress boxes of the same class.
+
+    Each class is shifted to its own coordinate region so a single NMS pass
+    handles all classes at once.
+
+    Args:
+        boxes: Array-like of shape (N, 4), [x1, y1, x2, y2]
+        scores: Array-like of shape (N,)
+        class_ids: Array-like of shape (N,)
+        iou_threshold: IoU above which same-class boxes are suppressed
+
+    Returns:
+        Indices of the kept boxes, highest score first
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+    class_ids = np.asarray(class_ids, dtype=np.float64).reshape(-1)
+    offset = boxes.max() + 1
+    return nms(boxes + (class_ids * offset)[:, None], scores, iou_threshold)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Content Store
+Content-addressed storage of uploaded images plus an index of the jobs
+already produced from them. Each upload is hashed (SHA-256) on arrival
+and stored once under its hash; a job is recorded under a key built from
+the image hash and the model / configuration, so processing an identical
+image with an identical model and configuration links to the existing
+job folder instead of recomputing it.
+
+Layout (``jobs/_store`` by default — ignored by the Job Viewer, which
+only lists folders holding a metadata.json):
+    objects/<h[:2]>/<hash><ext>   — one file per distinct upload
+    jobs/<key>.json               — job folder produced for (image, model, config)
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+try:
+    from inference_cache import hash_file as sha256_file, hash_model
+except ImportError:  # imported as part of the ``src`` package
+    from .inference_cache import hash_file as sha256_file, hash_model
+
+
+STORE_DIRNAME = "_store"
+
+
+def sha256_bytes(data: bytes) -> str:
+    """SHA-256 hex digest of ``data`` (same key as :func:`sha256_file` of a file holding it)."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ContentStore:
+    """Uploads stored once by content hash, and the jobs derived from them."""
+
+    def __init__(self, root: str = f"jobs/{STORE_DIRNAME}"):
+        """
+        Args:
+            root: Store directory (created on first write)
+        """
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Objects
+    # ------------------------------------------------------------------
+
+    def object_path(self, content_hash: str, suffix: str = "") -> Path:
+        """Path of the stored object for ``content_hash``."""
+        return self.root / "objects" / content_hash[:2] / f"{content_hash}{suffix.lower()}"
+
+    def _write_once(self, target: Path, write) -> None:
+        """Create ``target`` with ``write(tmp_path)`` unless it already exists."""
+        if target.exists():
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        write(tmp)
+        os.replace(tmp, target)
+
+    def add_bytes(self, data: bytes, suffix: str = "") -> Tuple[str, Path]:
+        """
+        Store uploaded bytes (no-op if the same content is already stored).
+
+        Args:
+            data: File content
+            suffix: File extension to keep (e.g. '.jpg')
+
+        Returns:
+            Tuple of (content_hash, stored_path)
+        """
+        data = bytes(data)
+        content_hash = sha256_bytes(data)
+        target = self.object_path(content_hash, suffix)
+        self._write_once(target, lambda tmp: tmp.write_bytes(data))
+        return content_hash, target
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def job_key(content_hash: str, *model_paths: Optional[str], **config) -> str:
+        """
+        Key of the job produced from an image with given models and configuration.
+
+        Args:
+            content_hash: SHA-256 of the input image
+            *model_paths: Model files used (their content hashes are part
+                          of the key; None entries are skipped)
+            **config: Every other setting that changes the job's output
+
+        Returns:
+            Hex key
+        """
+        # Models resolved by name (not a local file) are keyed by that name
+        models = [
+            hash_model(path) if Path(path).is_file() else str(path)
+            for path in model_paths if path
+        ]
+        blob = json.dumps({'image': content_hash, 'models': models, **config},
+                          sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    def _job_record(self, key: str) -> Path:
+        return self.root / "jobs" / f"{key}.json"
+
+    def find_job(self, key: str) -> Optional[Path]:
+        """
+        Return the job folder recorded for ``key``, or None.
+
+        Records whose folder was deleted (or lost its metadata.json) are
+        dropped, so the next run recomputes the job.
+        """
+        record = self._job_record(key)
+        try:
+            job_folder = Path(json.loads(record.read_text())['job_folder'])
+        except (OSError, ValueError, KeyError):
+            return None
+        if (job_folder / "metadata.json").exists():
+            return job_folder
+        with self._lock:
+            try:
+                record.unlink()
+            except OSError:
+                pass
+        return None
+
+    def link_job(self, key: str, job_folder: str, content_hash: Optional[str] = None) -> None:
+        """Record ``job_folder`` as the result for ``key``."""
+        record = self._job_record(key)
+        payload = json.dumps({
+            'job_folder': str(Path(job_folder).resolve()),
+            'content_hash': content_hash,
+        })
+        record.parent.mkdir(parents=True, exist_ok=True)
+        tmp = record.with_name(f"{record.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(payload)
+        os.replace(tmp, record)
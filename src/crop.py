@@ -5,24 +5,213 @@ Crops detected components from images and saves them to individual files.
 """
 
 import argparse
+import os
 import cv2
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence
 import json
 
+try:
+    from detect import load_image_with_exif
+    from timing import timed
+    from crop_archive import write_archive
+except ImportError:  # imported as part of the ``src`` package
+    from .detect import load_image_with_exif
+    from .timing import timed
+    from .crop_archive import write_archive
+
+
+# Crop file formats -> (extension, OpenCV quality flag); PNG is lossless
+# and takes a compression level instead
+CROP_FORMATS = {
+    'jpg': ('.jpg', cv2.IMWRITE_JPEG_QUALITY),
+    'png': ('.png', None),
+    'webp': ('.webp', cv2.IMWRITE_WEBP_QUALITY),
+}
+
+# OpenCV's own JPEG default, so existing crops are unchanged
+DEFAULT_CROP_QUALITY = 95
+
+# How a job keeps its crops: one file each, one crops.pack archive, or
+# none at all (rendered on request from input.* — see virtual_crops.py)
+CROP_STORAGES = ('files', 'pack', 'virtual')
+
+# Fast zlib level: crops are small, and level 1 is several times faster
+# than the maximum for a few percent larger files
+PNG_COMPRESSION = 1
+
+
+def crop_view(image: np.ndarray, bbox: Sequence[float], padding: int = 0) -> np.ndarray:
+    """
+    Return the padded ``bbox`` region of ``image`` as a view (no copy).
+
+    Args:
+        image: Source image
+        bbox: Bounding box [x1, y1, x2, y2]
+        padding: Pixels added on each side, clipped to the image
+
+    Returns:
+        Slice of ``image`` sharing its memory
+    """
+    h, w = image.shape[:2]
+    x1, y1, x2, y2 = map(int, bbox[:4])
+    x1 = max(0, x1 - padding)
+    y1 = max(0, y1 - padding)
+    x2 = min(w, x2 + padding)
+    y2 = min(h, y2 + padding)
+    return image[y1:y2, x1:x2]
+
+
+class CropEngine:
+    """
+    Cuts crops out of an already decoded image and writes them in parallel.
+
+    Crops are views of the source array; only the encoded files are new
+    memory. Encoding (``cv2.imencode`` releases the GIL) and writing run on
+    a thread pool, which dominates the time of dense boards with hundreds
+    of components.
+
+    Example:
+        engine = CropEngine(padding=10, image_format='webp', quality=90)
+        names = [engine.filename(f"{i:03d}_{d['class_name']}") for i, d in enumerate(dets)]
+        engine.save_crops(image, [d['bbox'] for d in dets], [out / n for n in names])
+    """
+
+    def __init__(
+        self,
+        padding: int = 10,
+        image_format: str = "jpg",
+        quality: int = DEFAULT_CROP_QUALITY,
+        workers: Optional[int] = None
+    ):
+        """
+        Args:
+            padding: Padding around each crop (pixels)
+            image_format: 'jpg', 'png' or 'webp'
+            quality: JPEG / WebP quality (1-100); ignored for PNG
+            workers: Encoding threads (default: CPU count, at most 8)
+        """
+        if image_format not in CROP_FORMATS:
+            raise ValueError(f"Unknown crop format {image_format!r}; expected one of {sorted(CROP_FORMATS)}")
+        self.padding = padding
+        self.image_format = image_format
+        self.quality = int(quality)
+        self.workers = max(1, int(workers or min(8, os.cpu_count() or 1)))
+        extension, quality_flag = CROP_FORMATS[image_format]
+        self.extension = extension
+        if quality_flag is None:
+            self._params = [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESSION]
+        else:
+            self._params = [quality_flag, self.quality]
+
+    def filename(self, stem: str) -> str:
+        """File name of a crop: ``stem`` plus this engine's extension."""
+        return f"{stem}{self.extension}"
+
+    def crop(self, image: np.ndarray, bbox: Sequence[float]) -> np.ndarray:
+        """Padded crop of ``bbox`` (a view of ``image``)."""
+        return crop_view(image, bbox, self.padding)
+
+    def encode(self, crop: np.ndarray) -> bytes:
+        """Encode one crop in this engine's format."""
+        ok, buffer = cv2.imencode(self.extension, crop, self._params)
+        if not ok:
+            raise ValueError(f"Could not encode crop of shape {crop.shape}")
+        return buffer.tobytes()
+
+    def _write(self, crop: np.ndarray, path: Path) -> str:
+        path.write_bytes(self.encode(crop))
+        return str(path)
+
+    def save_crops(
+        self,
+        image: np.ndarray,
+        boxes: Sequence[Sequence[float]],
+        paths: Sequence[str],
+        timer=None
+    ) -> List[str]:
+        """
+        Cut ``boxes`` out of ``image`` and write them to ``paths``.
+
+        Args:
+            image: Decoded source image (BGR)
+            boxes: Bounding boxes [x1, y1, x2, y2], one per path
+            paths: Output files (see :meth:`filename` for the extension)
+            timer: Optional StageTimer; records ``crop`` and ``encode``
+                   (wall time of the parallel encode + write)
+
+        Returns:
+            Paths written, in input order
+        """
+        paths = [Path(p) for p in paths]
+        with timed(timer, "crop"):
+            crops = [self.crop(image, bbox) for bbox in boxes]
+        with timed(timer, "encode"):
+            if self.workers == 1 or len(crops) < 2:
+                return [self._write(c, p) for c, p in zip(crops, paths)]
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(crops)),
+                                    thread_name_prefix="crop_encode") as pool:
+                return list(pool.map(self._write, crops, paths))
+
+    def pack_crops(
+        self,
+        image: np.ndarray,
+        boxes: Sequence[Sequence[float]],
+        archive_path: str,
+        names: Sequence[str],
+        fields: Optional[Sequence[dict]] = None,
+        timer=None
+    ) -> List[str]:
+        """
+        Cut ``boxes`` out of ``image`` into a single crop archive.
+
+        Args:
+            image: Decoded source image (BGR)
+            boxes: Bounding boxes [x1, y1, x2, y2]
+            archive_path: Archive file to write (see crop_archive.py)
+            names: File name of each crop (kept in the index, used by unpack)
+            fields: Optional extra index fields per crop (class, bbox, ...)
+            timer: Optional StageTimer; records ``crop`` and ``encode``
+
+        Returns:
+            Archive references (``crops.pack#N``), in input order
+        """
+        with timed(timer, "crop"):
+            crops = [self.crop(image, bbox) for bbox in boxes]
+        with timed(timer, "encode"):
+            if self.workers == 1 or len(crops) < 2:
+                encoded = [self.encode(c) for c in crops]
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.workers, len(crops)),
+                                        thread_name_prefix="crop_encode") as pool:
+                    encoded = list(pool.map(self.encode, crops))
+            fields = fields or [{}] * len(crops)
+            return write_archive(archive_path, zip(names, encoded, fields))
+
 
 class ComponentCropper:
     """Utility for cropping components from circuit board images."""
     
-    def __init__(self, padding: int = 10):
+    def __init__(
+        self,
+        padding: int = 10,
+        image_format: str = "jpg",
+        quality: int = DEFAULT_CROP_QUALITY,
+        workers: Optional[int] = None
+    ):
         """
         Initialize component cropper.
         
         Args:
             padding: Padding to add around cropped components (in pixels)
+            image_format: Crop file format, 'jpg', 'png' or 'webp'
+            quality: JPEG / WebP quality (1-100)
+            workers: Encoding threads (default: CPU count, at most 8)
         """
         self.padding = padding
+        self.engine = CropEngine(padding, image_format, quality, workers)
     
     def crop_component(
         self,
@@ -39,26 +228,10 @@ class ComponentCropper:
             padding: Optional padding override
             
         Returns:
-            Cropped component image
+            Cropped component image (a view of ``image``)
         """
         padding = padding if padding is not None else self.padding
-        
-        # Get image dimensions
-        h, w = image.shape[:2]
-        
-        # Extract and expand bbox
-        x1, y1, x2, y2 = map(int, bbox)
-        
-        # Add padding and clip to image boundaries
-        x1 = max(0, x1 - padding)
-        y1 = max(0, y1 - padding)
-        x2 = min(w, x2 + padding)
-        y2 = min(h, y2 + padding)
-        
-        # Crop component
-        cropped = image[y1:y2, x1:x2]
-        
-        return cropped
+        return crop_view(image, bbox, padding)
     
     def crop_from_detections(
         self,
@@ -66,23 +239,34 @@ class ComponentCropper:
         detections: List[Dict],
         output_dir: str = "outputs/cropped_components",
         save_metadata: bool = True,
-        component_filter: Optional[List[str]] = None
+        component_filter: Optional[List[str]] = None,
+        image: Optional[np.ndarray] = None
     ) -> List[str]:
         """
         Crop all detected components from an image.
         
         Args:
             image_path: Path to source image
-            detections: List of detection dictionaries from detector
+            detections: List of detection dictionaries from detector. When a
+                        ``DetectionResult`` carrying its decoded image is
+                        passed, that image is reused instead of re-reading
+                        the file (unless it was decoded at reduced
+                        resolution).
             output_dir: Directory to save cropped components
             save_metadata: Whether to save metadata JSON
             component_filter: List of component types to crop (e.g., ['IC']). If None, crop all.
+            image: Optional pre-loaded BGR image (skips file I/O if provided)
             
         Returns:
             List of paths to saved component images
         """
-        # Load image
-        image = cv2.imread(str(image_path))
+        # Reuse the image decoded for detection when available — unless it
+        # is a reduced decode, whose pixels do not match the full-resolution boxes
+        if image is None and getattr(detections, 'image_scale', (1.0, 1.0)) == (1.0, 1.0):
+            image = getattr(detections, 'image', None)
+        if image is None:
+            # Same EXIF-corrected decode as detection, so boxes line up
+            image = load_image_with_exif(str(image_path))
         if image is None:
             raise ValueError(f"Could not load image: {image_path}")
         
@@ -93,40 +277,32 @@ class ComponentCropper:
         # Get base name for output files
         base_name = Path(image_path).stem
         
-        saved_paths = []
-        metadata = []
+        # Apply filter if specified
+        selected = [
+            (i, detection) for i, detection in enumerate(detections)
+            if not component_filter or detection['class_name'] in component_filter
+        ]
+        output_paths = [
+            output_dir / self.engine.filename(f"{base_name}_{detection['class_name']}_{i}")
+            for i, detection in selected
+        ]
         
-        # Process each detection
-        for i, detection in enumerate(detections):
-            # Extract information
-            class_name = detection['class_name']
-            bbox = detection['bbox']
-            confidence = detection['confidence']
-            
-            # Apply filter if specified
-            if component_filter and class_name not in component_filter:
-                continue
-            
-            # Crop component
-            cropped = self.crop_component(image, bbox)
-            
-            # Generate output filename
-            output_filename = f"{base_name}_{class_name}_{i}.jpg"
-            output_path = output_dir / output_filename
-            
-            # Save cropped image
-            cv2.imwrite(str(output_path), cropped)
-            saved_paths.append(str(output_path))
-            
-            # Store metadata
-            metadata.append({
+        # Cut and encode all crops in parallel
+        saved_paths = self.engine.save_crops(
+            image, [detection['bbox'] for _, detection in selected], output_paths
+        )
+        
+        metadata = [
+            {
                 'original_image': str(image_path),
-                'cropped_image': str(output_path),
-                'component_type': class_name,
-                'confidence': confidence,
-                'bbox': bbox,
+                'cropped_image': path,
+                'component_type': detection['class_name'],
+                'confidence': detection['confidence'],
+                'bbox': detection['bbox'],
                 'crop_index': i
-            })
+            }
+            for (i, detection), path in zip(selected, saved_paths)
+        ]
         
         # Save metadata if requested
         if save_metadata and metadata:
@@ -210,6 +386,23 @@ def main():
         default=10,
         help="Padding around cropped components (pixels)"
     )
+    parser.add_argument(
+        "--format",
+        choices=sorted(CROP_FORMATS),
+        default="jpg",
+        help="Crop file format (default: jpg)"
+    )
+    parser.add_argument(
+        "--quality",
+        type=int,
+        default=DEFAULT_CROP_QUALITY,
+        help=f"JPEG / WebP quality 1-100 (default: {DEFAULT_CROP_QUALITY})"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Encoding threads (default: CPU count, at most 8)"
+    )
     parser.add_argument(
         "--filter",
         type=str,
@@ -220,7 +413,12 @@ def main():
     args = parser.parse_args()
     
     # Initialize cropper
-    cropper = ComponentCropper(padding=args.padding)
+    cropper = ComponentCropper(
+        padding=args.padding,
+        image_format=args.format,
+        quality=args.quality,
+        workers=args.workers
+    )
     
     # Process based on input type
     if args.detection_file:
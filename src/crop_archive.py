@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Crop Archive
+Packs all crops of a job into a single file instead of one small image
+file per detection. Dense boards produce thousands of crops per job;
+one archive keeps the filesystem metadata, backups and Job Viewer
+listing cheap.
+
+Layout of ``crops.pack``:
+    MAGIC                  8 bytes
+    crop 0 .. crop N-1     encoded images (JPEG / PNG / WebP), back to back
+    index                  UTF-8 JSON: name, offset, length, class, bbox, ...
+    footer                 index offset (u64), index length (u64), MAGIC
+
+A crop inside an archive is addressed as ``<archive path>#<index>``
+(e.g. ``crops.pack#12`` in metadata.json, an absolute path in
+``ics_cropped.cropped_file_path``); :func:`read_crop` reads either such a
+reference or a plain image path.
+
+Usage:
+    python src/crop_archive.py list jobs/<job>/crops.pack
+    python src/crop_archive.py unpack jobs/<job>/crops.pack [--output-dir DIR]
+"""
+
+import argparse
+import json
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+PACK_NAME = "crops.pack"
+
+MAGIC = b"NUTSCRP1"
+_FOOTER = struct.Struct("<QQ8s")
+
+
+def write_archive(path: str, entries: Iterable[Tuple[str, bytes, dict]]) -> List[str]:
+    """
+    Write an archive of encoded crops.
+
+    Args:
+        path: Archive file to create (replaced atomically if it exists)
+        entries: (file name, encoded bytes, extra index fields) per crop,
+                 e.g. ``("003_IC.jpg", data, {"class_name": "IC", "bbox": [...]})``
+
+    Returns:
+        References of the crops (``<file name of path>#<index>``), in order
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    index = []
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        for name, data, fields in entries:
+            index.append({**fields, 'name': name, 'offset': f.tell(), 'length': len(data)})
+            f.write(data)
+        index_offset = f.tell()
+        blob = json.dumps({'version': 1, 'entries': index}).encode()
+        f.write(blob)
+        f.write(_FOOTER.pack(index_offset, len(blob), MAGIC))
+    os.replace(tmp, path)
+    return [f"{path.name}#{i}" for i in range(len(index))]
+
+
+class CropArchive:
+    """
+    Read access to a crop archive (thread-safe).
+
+    Example:
+        with CropArchive("jobs/board_20250101_120000/crops.pack") as archive:
+            for i, entry in enumerate(archive.entries):
+                data = archive.read(i)
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Archive file
+
+        Raises:
+            ValueError: If the file is not a crop archive
+        """
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._lock = threading.Lock()
+        try:
+            self._file.seek(-_FOOTER.size, os.SEEK_END)
+            index_offset, index_length, magic = _FOOTER.unpack(self._file.read(_FOOTER.size))
+            if magic != MAGIC:
+                raise ValueError(f"Not a crop archive: {path}")
+            self._file.seek(index_offset)
+            self.entries: List[dict] = json.loads(self._file.read(index_length))['entries']
+        except (OSError, struct.error, ValueError, KeyError) as e:
+            self._file.close()
+            raise ValueError(f"Not a crop archive: {path} ({e})") from e
+        self._by_name: Dict[str, int] = {entry['name']: i for i, entry in enumerate(self.entries)}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def read(self, index: int) -> bytes:
+        """Encoded bytes of crop ``index``."""
+        entry = self.entries[index]
+        with self._lock:
+            self._file.seek(entry['offset'])
+            return self._file.read(entry['length'])
+
+    def index_of(self, name: str) -> Optional[int]:
+        """Index of the crop originally named ``name``, or None."""
+        return self._by_name.get(name)
+
+    def unpack(self, output_dir: str) -> List[str]:
+        """
+        Write every crop to ``output_dir`` under its original file name.
+
+        Returns:
+            Paths written, in archive order
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for i, entry in enumerate(self.entries):
+            target = output_dir / Path(entry['name']).name
+            target.write_bytes(self.read(i))
+            paths.append(str(target))
+        return paths
+
+
+def split_ref(ref: str) -> Tuple[str, Optional[int]]:
+    """Split ``<archive>#<index>`` into (archive path, index); plain paths give (path, None)."""
+    path, sep, index = str(ref).rpartition("#")
+    if sep and index.isdigit():
+        return path, int(index)
+    return str(ref), None
+
+
+def is_archive_ref(ref: str) -> bool:
+    """True if ``ref`` addresses a crop inside an archive."""
+    return split_ref(ref)[1] is not None
+
+
+def read_crop(ref: str) -> bytes:
+    """Encoded bytes of a crop, given an archive reference or an image path."""
+    path, index = split_ref(ref)
+    if index is None:
+        return Path(path).read_bytes()
+    with CropArchive(path) as archive:
+        return archive.read(index)
+
+
+def resolve_crop_file(job_dir: str, crop_file: str) -> str:
+    """
+    Full reference of a metadata.json ``crop_file`` entry.
+
+    Archive references (``crops.pack#N``) are relative to the job folder,
+    plain file names to its ``crops/`` subfolder.
+    """
+    if is_archive_ref(crop_file):
+        return str(Path(job_dir) / crop_file)
+    return str(Path(job_dir) / "crops" / crop_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or unpack a job's crop archive")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_list = sub.add_parser("list", help="List the crops of an archive")
+    p_list.add_argument("archive", type=str, help=f"Path to a {PACK_NAME} file")
+    p_unpack = sub.add_parser("unpack", help="Write every crop to its own file")
+    p_unpack.add_argument("archive", type=str, help=f"Path to a {PACK_NAME} file")
+    p_unpack.add_argument("--output-dir", type=str,
+                          help="Destination (default: crops/ next to the archive)")
+    args = parser.parse_args()
+
+    with CropArchive(args.archive) as archive:
+        if args.command == "list":
+            for i, entry in enumerate(archive.entries):
+                print(f"#{i:<5d} {entry['name']:32s} {entry['length']:8d} B  "
+                      f"{entry.get('class_name', '')}")
+            print(f"{len(archive)} crops")
+        else:
+            output_dir = args.output_dir or Path(args.archive).parent / "crops"
+            paths = archive.unpack(str(output_dir))
+            print(f"Unpacked {len(paths)} crops to {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,154 @@ Manages PostgreSQL database connections and logging operations.
 """
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
+import psycopg2.errors
+import psycopg2.pool
+from psycopg2.extras import RealDictCursor, execute_values
 from contextlib import contextmanager
 from typing import Optional, Dict, List, Any
 import os
+import threading
+import time
 from datetime import datetime
 
 
+# Connection pool defaults (overridable with DB_POOL_MIN / DB_POOL_MAX)
+DEFAULT_POOL_MIN = 1
+DEFAULT_POOL_MAX = 10
+# Rows per multi-row INSERT statement in log_job_bulk
+BULK_PAGE_SIZE = 1000
+# Seconds to wait for a free pooled connection before giving up
+DEFAULT_POOL_TIMEOUT = 30.0
+# Connections idle for longer than this are pinged before reuse (seconds)
+HEALTH_CHECK_IDLE = 30.0
+# Database Viewer / export statements are cancelled after this long
+# (milliseconds, overridable with DB_STATEMENT_TIMEOUT_MS; 0 disables it)
+DEFAULT_STATEMENT_TIMEOUT_MS = 30000
+# Rows fetched per round trip by the server-side export cursor
+EXPORT_CHUNK_SIZE = 5000
+
+
+# metadata.json timing stage -> log_jobs column (migration_002_stage_timings.sql)
+JOB_TIMING_COLUMNS = {
+    'decode': 'decode_ms',
+    'exif_transpose': 'exif_ms',
+    'preprocess': 'preprocess_ms',
+    'inference': 'inference_ms',
+    'parse': 'parse_ms',
+    'annotate': 'annotate_ms',
+    'crop': 'crop_ms',
+    'encode': 'encode_ms',
+    'db_log': 'db_ms',
+    'total': 'total_ms',
+}
+
+
+# Row of an image by content hash, inserted if new. One statement, so two
+# concurrent uploads of the same file cannot both insert; the no-op update
+# makes RETURNING yield the existing row's id (migration_003_content_hash.sql)
+IMAGE_BY_HASH_SQL = """
+    INSERT INTO images_input (file_name, file_path, format, content_hash)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (content_hash) WHERE content_hash IS NOT NULL
+    DO UPDATE SET content_hash = EXCLUDED.content_hash
+    RETURNING image_id
+"""
+
+
+# Database Viewer views, newest first. Each has a base query, the keyset
+# columns it is ordered by (unique together, NOT NULL) and the filters it
+# accepts (argument -> column). Pages continue *below* the key of the last
+# row already shown, so every page is an index range scan however deep.
+VIEWER_QUERIES = {
+    'images': {
+        'query': "SELECT * FROM images_input i",
+        'key': ('i.image_id',),
+        'filters': {},
+    },
+    'jobs': {
+        'query': """
+            SELECT
+                j.*,
+                i.file_name,
+                i.file_path,
+                i.format,
+                (SELECT COUNT(*) FROM detections d WHERE d.job_id = j.job_id) AS detection_count
+            FROM log_jobs j
+            JOIN images_input i ON j.image_id = i.image_id
+        """,
+        'key': ('j.job_id',),
+        'filters': {'image_id': 'j.image_id'},
+    },
+    'detections': {
+        'query': "SELECT * FROM detections d",
+        'key': ('d.detection_id',),
+        'filters': {'job_id': 'd.job_id'},
+    },
+    'crops': {
+        'query': """
+            SELECT ic.*, d.class_name, j.job_name
+            FROM ics_cropped ic
+            JOIN detections d ON ic.detection_id = d.detection_id
+            JOIN log_jobs j ON ic.job_id = j.job_id
+        """,
+        'key': ('ic.cropped_id',),
+        'filters': {'job_id': 'ic.job_id'},
+    },
+    'pcba_imports': {
+        'query': """
+            SELECT
+                p.*,
+                (SELECT COUNT(*) FROM log_pcba_pb_row_import r
+                 WHERE r.log_pcba_pb_import_id = p.id) AS row_count
+            FROM log_pcba_pb_import p
+        """,
+        'key': ('p.created_at', 'p.id'),
+        'filters': {},
+    },
+    'pcba_rows': {
+        'query': "SELECT * FROM log_pcba_pb_row_import r",
+        'key': ('r.created_at', 'r.id'),
+        'filters': {'import_id': 'r.log_pcba_pb_import_id'},
+    },
+}
+
+
+def page_key(view: str, row: Dict[str, Any]) -> tuple:
+    """
+    Keyset position of a row of a viewer view.
+
+    Pass the key of the last row of a page as ``before`` to get the next one.
+    """
+    return tuple(row[column.split('.')[-1]] for column in VIEWER_QUERIES[view]['key'])
+
+
+def _viewer_sql(view: str, filters: Optional[Dict[str, Any]] = None,
+                before: Optional[tuple] = None) -> tuple:
+    """SQL and parameters of a viewer view, newest first (without LIMIT)."""
+    try:
+        spec = VIEWER_QUERIES[view]
+    except KeyError:
+        raise ValueError(f"Unknown view '{view}', expected one of {sorted(VIEWER_QUERIES)}")
+    conditions, params = [], []
+    for name, value in (filters or {}).items():
+        if name not in spec['filters']:
+            raise ValueError(f"View '{view}' cannot be filtered by '{name}'")
+        if value is not None:
+            conditions.append(f"{spec['filters'][name]} = %s")
+            params.append(value)
+    key = spec['key']
+    if before is not None:
+        if len(before) != len(key):
+            raise ValueError(f"before must hold {len(key)} value(s) for view '{view}'")
+        conditions.append(f"({', '.join(key)}) < ({', '.join(['%s'] * len(key))})")
+        params.extend(before)
+    sql = spec['query']
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY " + ", ".join(f"{column} DESC" for column in key)
+    return sql, params
+
+
 class DatabaseManager:
     """Manages database connections and operations for nuts_vision."""
     
@@ -21,10 +162,18 @@ class DatabaseManager:
         port: int = 5432,
         database: str = "nuts_vision",
         user: str = "nuts_user",
-        password: str = "nuts_password"
+        password: str = "nuts_password",
+        min_connections: int = DEFAULT_POOL_MIN,
+        max_connections: int = DEFAULT_POOL_MAX,
+        pool_timeout: float = DEFAULT_POOL_TIMEOUT,
+        statement_timeout_ms: int = DEFAULT_STATEMENT_TIMEOUT_MS
     ):
         """
         Initialize database manager.
+
+        Connections come from a thread-safe pool (opened on first use), so
+        the many short operations of a job reuse a few open connections
+        instead of paying a TCP + authentication handshake each.
         
         Args:
             host: Database host
@@ -32,6 +181,12 @@ class DatabaseManager:
             database: Database name
             user: Database user
             password: Database password
+            min_connections: Connections kept open once the pool exists
+            max_connections: Upper bound of open connections; further
+                             callers wait for one to be returned
+            pool_timeout: Seconds to wait for a free connection
+            statement_timeout_ms: Limit for each Database Viewer / export
+                                  statement (0 = no limit)
         """
         self.connection_params = {
             'host': host,
@@ -40,25 +195,127 @@ class DatabaseManager:
             'user': user,
             'password': password
         }
+        self.min_connections = max(0, int(min_connections))
+        self.max_connections = max(1, int(max_connections), self.min_connections)
+        self.pool_timeout = pool_timeout
+        self.statement_timeout_ms = max(0, int(statement_timeout_ms))
+        self._pool: Optional[psycopg2.pool.ThreadedConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        # ThreadedConnectionPool raises instead of blocking when exhausted
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+        self._idle_since: Dict[int, float] = {}
+        self.reconnects = 0
+
+    def _get_pool(self) -> psycopg2.pool.ThreadedConnectionPool:
+        """The connection pool, created on first use (and after :meth:`close`)."""
+        with self._pool_lock:
+            if self._pool is None or self._pool.closed:
+                self._pool = psycopg2.pool.ThreadedConnectionPool(
+                    self.min_connections, self.max_connections, **self.connection_params
+                )
+            return self._pool
+
+    def _healthy(self, conn) -> bool:
+        """False for closed connections, or idle ones that fail a ping."""
+        if conn.closed:
+            return False
+        idle_since = self._idle_since.pop(id(conn), None)
+        if idle_since is None or time.monotonic() - idle_since < HEALTH_CHECK_IDLE:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _acquire(self):
+        """Take a healthy connection from the pool, replacing dead ones."""
+        if not self._slots.acquire(timeout=self.pool_timeout):
+            raise psycopg2.pool.PoolError(
+                f"No database connection free after {self.pool_timeout:g} s "
+                f"(max_connections={self.max_connections})"
+            )
+        try:
+            pool = self._get_pool()
+            # Every idle connection may have died with a server restart;
+            # the last attempt opens a fresh one
+            for _ in range(self.max_connections + 1):
+                conn = pool.getconn()
+                if self._healthy(conn):
+                    return conn
+                pool.putconn(conn, close=True)
+                self.reconnects += 1
+            return pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, conn, broken: bool = False) -> None:
+        """Return a connection to the pool (closing it if broken)."""
+        try:
+            pool = self._pool
+            close = broken or bool(conn.closed)
+            if pool is not None and not pool.closed:
+                if not close:
+                    self._idle_since[id(conn)] = time.monotonic()
+                pool.putconn(conn, close=close)
+            else:
+                conn.close()
+        finally:
+            self._slots.release()
         
     @contextmanager
     def get_connection(self):
-        """Get a database connection context manager."""
-        conn = psycopg2.connect(**self.connection_params)
+        """
+        Get a pooled database connection context manager.
+
+        The transaction is committed on success and rolled back on error;
+        connections that fail at the connection level are discarded, so
+        the next caller gets a fresh one.
+        """
+        conn = self._acquire()
+        broken = False
         try:
             yield conn
             conn.commit()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
         except Exception as e:
-            conn.rollback()
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
             raise e
         finally:
-            conn.close()
+            self._release(conn, broken)
+
+    def close(self) -> None:
+        """Close every pooled connection (the pool reopens on next use)."""
+        with self._pool_lock:
+            if self._pool is not None and not self._pool.closed:
+                self._pool.closeall()
+            self._pool = None
+            self._idle_since.clear()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Open / in-use connection counts of the pool."""
+        pool = self._pool
+        if pool is None or pool.closed:
+            return {'open': 0, 'in_use': 0, 'max': self.max_connections,
+                    'reconnects': self.reconnects}
+        in_use = len(pool._used)
+        return {'open': in_use + len(pool._pool), 'in_use': in_use,
+                'max': self.max_connections, 'reconnects': self.reconnects}
     
     def log_image_upload(
         self,
         file_name: str,
         file_path: str,
-        format: str = None
+        format: str = None,
+        content_hash: Optional[str] = None
     ) -> int:
         """
         Log an uploaded image to the database.
@@ -67,10 +324,23 @@ class DatabaseManager:
             file_name: Name of the image file
             file_path: Full path to the image file
             format: Image format (e.g., 'jpg', 'png')
+            content_hash: SHA-256 of the file content (migration 003); an
+                          image already logged with the same hash is
+                          reused instead of inserting a duplicate row
             
         Returns:
-            image_id of the inserted record
+            image_id of the inserted (or existing) record
         """
+        if content_hash is not None:
+            try:
+                with self.get_connection() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute(IMAGE_BY_HASH_SQL, (file_name, file_path, format, content_hash))
+                        return cursor.fetchone()[0]
+            except psycopg2.errors.UndefinedColumn:
+                # content_hash column missing (migration 003 not applied)
+                print("Warning: images_input has no content_hash column; run database/migration_003_content_hash.sql")
+
         with self.get_connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(
@@ -116,23 +386,39 @@ class DatabaseManager:
                 job_id = cursor.fetchone()[0]
                 return job_id
     
-    def end_job(self, job_id: int):
+    def end_job(self, job_id: int, timings: Optional[Dict[str, float]] = None):
         """
         Mark a job as ended.
         
         Args:
             job_id: ID of the job to end
+            timings: Optional per-stage durations in ms (StageTimer.as_dict());
+                     stages listed in JOB_TIMING_COLUMNS are stored in the
+                     matching log_jobs columns
         """
-        with self.get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    """
-                    UPDATE log_jobs
-                    SET ended_at = CURRENT_TIMESTAMP
-                    WHERE job_id = %s
-                    """,
-                    (job_id,)
-                )
+        columns = [
+            (column, float(timings[stage]))
+            for stage, column in JOB_TIMING_COLUMNS.items()
+            if timings and stage in timings
+        ]
+        assignments = "".join(f", {column} = %s" for column, _ in columns)
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        f"""
+                        UPDATE log_jobs
+                        SET ended_at = CURRENT_TIMESTAMP{assignments}
+                        WHERE job_id = %s
+                        """,
+                        [value for _, value in columns] + [job_id]
+                    )
+        except psycopg2.Error:
+            if not columns:
+                raise
+            # Timing columns missing (migration 002 not applied): still end the job
+            print("Warning: log_jobs has no timing columns; run database/migration_002_stage_timings.sql")
+            self.end_job(job_id)
     
     def log_detection(
         self,
@@ -196,6 +482,215 @@ class DatabaseManager:
                 )
                 cropped_id = cursor.fetchone()[0]
                 return cropped_id
+
+    @staticmethod
+    def _reserve_ids(cursor, table: str, column: str, count: int) -> List[int]:
+        """Draw ``count`` values from the SERIAL sequence of ``table.column``, in order."""
+        if count == 0:
+            return []
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)",
+            (table, column, count)
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def log_job_bulk(
+        self,
+        file_name: str,
+        file_path: str,
+        model: str,
+        detections: List[Dict[str, Any]],
+        crop_paths: Optional[List[str]] = None,
+        format: str = None,
+        job_name: str = None,
+        job_folder_path: str = None,
+        content_hash: Optional[str] = None,
+        started_at: Optional[str] = None,
+        ended_at: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
+        """
+        Log an image, its job, all detections and all crop links in one transaction.
+
+        Equivalent to :meth:`log_image_upload` + :meth:`start_job` + one
+        :meth:`log_detection` / :meth:`log_cropped_component` per detection,
+        but with one commit and a few multi-row INSERTs instead of
+        2 + 2 x N transactions. Detection and crop ids are drawn from their
+        sequences up front, so they are returned in input order.
+
+        Args:
+            file_name: Name of the image file
+            file_path: Full path to the image file
+            model: Model name/path used for detection
+            detections: Dicts with class_name, confidence and bbox
+            crop_paths: Crop path (or archive / virtual reference) of each
+                        detection, same order; None entries are skipped
+            format: Image format (e.g., 'jpg', 'png')
+            job_name: Human-readable job name
+            job_folder_path: Path to the job output folder
+            content_hash: SHA-256 of the file content; reuses an image row
+                          with the same hash (migration 003)
+            started_at: ISO timestamp the job started (default: now)
+            ended_at: ISO timestamp the job ended; with ``timings``, also
+                      ends the job in the same transaction (see :meth:`end_job`)
+            timings: Per-stage durations in ms (StageTimer.as_dict())
+
+        Returns:
+            Dict with image_id, job_id, detection_ids and cropped_ids
+            (cropped_ids aligned with crop_paths, None where skipped)
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                return self._write_job(
+                    cursor, file_name, file_path, model, detections, crop_paths, format,
+                    job_name, job_folder_path, content_hash, started_at, ended_at, timings
+                )
+
+    def log_jobs_bulk(
+        self,
+        jobs: List[Dict[str, Any]],
+        skip_logged: bool = False
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Log several jobs in one transaction.
+
+        Args:
+            jobs: Keyword arguments of :meth:`log_job_bulk`, one dict per job
+            skip_logged: Skip jobs whose job_folder_path is already in
+                         log_jobs (makes replaying a journal idempotent)
+
+        Returns:
+            The :meth:`log_job_bulk` result of each job (None if skipped)
+        """
+        results = []
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                for job in jobs:
+                    folder = job.get('job_folder_path')
+                    if skip_logged and folder:
+                        cursor.execute(
+                            "SELECT 1 FROM log_jobs WHERE job_folder_path = %s LIMIT 1", (folder,)
+                        )
+                        if cursor.fetchone():
+                            results.append(None)
+                            continue
+                    results.append(self._write_job(cursor, **job))
+        return results
+
+    def _write_job(
+        self,
+        cursor,
+        file_name: str,
+        file_path: str,
+        model: str,
+        detections: List[Dict[str, Any]],
+        crop_paths: Optional[List[str]] = None,
+        format: str = None,
+        job_name: str = None,
+        job_folder_path: str = None,
+        content_hash: Optional[str] = None,
+        started_at: Optional[str] = None,
+        ended_at: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
+        """The statements of :meth:`log_job_bulk`, on an open transaction."""
+        crop_paths = list(crop_paths or [])
+        image_id = None
+        if content_hash is not None:
+            cursor.execute("SAVEPOINT image_by_hash")
+            try:
+                cursor.execute(IMAGE_BY_HASH_SQL, (file_name, file_path, format, content_hash))
+                image_id = cursor.fetchone()[0]
+                cursor.execute("RELEASE SAVEPOINT image_by_hash")
+            except psycopg2.errors.UndefinedColumn:
+                # content_hash column missing (migration 003 not applied)
+                cursor.execute("ROLLBACK TO SAVEPOINT image_by_hash")
+                print("Warning: images_input has no content_hash column; run database/migration_003_content_hash.sql")
+        if image_id is None:
+            cursor.execute(
+                """
+                INSERT INTO images_input (file_name, file_path, format)
+                VALUES (%s, %s, %s)
+                RETURNING image_id
+                """,
+                (file_name, file_path, format)
+            )
+            image_id = cursor.fetchone()[0]
+
+        cursor.execute(
+            """
+            INSERT INTO log_jobs (image_id, model, job_name, job_folder_path, started_at)
+            VALUES (%s, %s, %s, %s, COALESCE(%s::timestamp, CURRENT_TIMESTAMP))
+            RETURNING job_id
+            """,
+            (image_id, model, job_name, job_folder_path, started_at)
+        )
+        job_id = cursor.fetchone()[0]
+
+        detection_ids = self._reserve_ids(cursor, 'detections', 'detection_id', len(detections))
+        execute_values(
+            cursor,
+            """
+            INSERT INTO detections
+            (detection_id, job_id, class_name, confidence, bbox_x1, bbox_y1, bbox_x2, bbox_y2)
+            VALUES %s
+            """,
+            [
+                (det_id, job_id, d["class_name"], float(d["confidence"]), *map(float, d["bbox"][:4]))
+                for det_id, d in zip(detection_ids, detections)
+            ],
+            page_size=BULK_PAGE_SIZE
+        )
+
+        links = [
+            (detection_ids[i], path) for i, path in enumerate(crop_paths[:len(detections)])
+            if path is not None
+        ]
+        link_ids = self._reserve_ids(cursor, 'ics_cropped', 'cropped_id', len(links))
+        execute_values(
+            cursor,
+            """
+            INSERT INTO ics_cropped (cropped_id, job_id, detection_id, cropped_file_path)
+            VALUES %s
+            """,
+            [(cid, job_id, det_id, path) for cid, (det_id, path) in zip(link_ids, links)],
+            page_size=BULK_PAGE_SIZE
+        )
+        link_iter = iter(link_ids)
+        cropped_ids = [next(link_iter) if path is not None else None
+                       for path in crop_paths[:len(detections)]]
+
+        if ended_at is not None or timings:
+            columns = [
+                (column, float(timings[stage]))
+                for stage, column in JOB_TIMING_COLUMNS.items()
+                if timings and stage in timings
+            ]
+            assignments = "".join(f", {column} = %s" for column, _ in columns)
+            cursor.execute("SAVEPOINT end_job")
+            try:
+                cursor.execute(
+                    f"UPDATE log_jobs SET ended_at = COALESCE(%s::timestamp, CURRENT_TIMESTAMP)"
+                    f"{assignments} WHERE job_id = %s",
+                    [ended_at] + [value for _, value in columns] + [job_id]
+                )
+                cursor.execute("RELEASE SAVEPOINT end_job")
+            except psycopg2.Error:
+                # Timing columns missing (migration 002 not applied): still end the job
+                cursor.execute("ROLLBACK TO SAVEPOINT end_job")
+                print("Warning: log_jobs has no timing columns; run database/migration_002_stage_timings.sql")
+                cursor.execute(
+                    "UPDATE log_jobs SET ended_at = COALESCE(%s::timestamp, CURRENT_TIMESTAMP) "
+                    "WHERE job_id = %s",
+                    (ended_at, job_id)
+                )
+
+        return {
+            'image_id': image_id,
+            'job_id': job_id,
+            'detection_ids': detection_ids,
+            'cropped_ids': cropped_ids,
+        }
     
     def get_job_statistics(self, job_id: int) -> Dict[str, Any]:
         """
@@ -245,100 +740,207 @@ class DatabaseManager:
             print(f"Database connection failed: {e}")
             return False
     
-    def get_all_images(self, limit: int = 100) -> List[Dict[str, Any]]:
+    def get_page(
+        self,
+        view: str,
+        before: Optional[tuple] = None,
+        limit: int = 100,
+        **filters
+    ) -> List[Dict[str, Any]]:
         """
-        Get all uploaded images.
-        
+        One page of a Database Viewer view (see ``VIEWER_QUERIES``), newest first.
+
         Args:
+            view: View name, e.g. 'images', 'jobs', 'detections'
+            before: :func:`page_key` of the last row of the previous page
+                    (None for the first page)
             limit: Maximum number of records to return
-            
+            **filters: Column filters accepted by the view (None = no filter)
+
         Returns:
-            List of image records
+            List of records
         """
+        sql, params = _viewer_sql(view, filters, before)
         with self.get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(
-                    """
-                    SELECT * FROM images_input
-                    ORDER BY upload_at DESC
-                    LIMIT %s
-                    """,
-                    (limit,)
-                )
+                self._set_statement_timeout(cursor)
+                cursor.execute(sql + " LIMIT %s", params + [limit])
                 return [dict(row) for row in cursor.fetchall()]
+
+    def iter_view(
+        self,
+        view: str,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+        **filters
+    ):
+        """
+        Stream a whole viewer view, newest first, in chunks of records.
+
+        Rows come from a server-side (named) cursor, so memory use is
+        bounded by ``chunk_size`` whatever the size of the view. A pooled
+        connection is held until the generator is exhausted or closed.
+
+        Args:
+            view: View name (see ``VIEWER_QUERIES``)
+            chunk_size: Rows fetched per round trip
+            **filters: Column filters accepted by the view
+
+        Yields:
+            Lists of at most ``chunk_size`` records
+        """
+        sql, params = _viewer_sql(view, filters)
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                self._set_statement_timeout(cursor)
+            with conn.cursor(name=f"export_{view}", cursor_factory=RealDictCursor) as cursor:
+                cursor.itersize = chunk_size
+                cursor.execute(sql, params)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield [dict(row) for row in rows]
+
+    def _set_statement_timeout(self, cursor) -> None:
+        """Bound every statement of the current transaction by ``statement_timeout_ms``."""
+        cursor.execute("SET LOCAL statement_timeout = %s", (self.statement_timeout_ms,))
+
+    def get_all_images(self, limit: int = 100, before: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        """
+        Get all uploaded images, newest first.
+        
+        Args:
+            limit: Maximum number of records to return
+            before: page_key('images', row) of the last row of the previous page
+            
+        Returns:
+            List of image records
+        """
+        return self.get_page('images', before, limit)
     
-    def get_all_jobs(self, limit: int = 100) -> List[Dict[str, Any]]:
+    def get_all_jobs(self, limit: int = 100, before: Optional[tuple] = None) -> List[Dict[str, Any]]:
         """
-        Get all jobs with image information.
+        Get all jobs with image information, newest first.
         
         Args:
             limit: Maximum number of records to return
+            before: page_key('jobs', row) of the last row of the previous page
             
         Returns:
             List of job records
         """
+        return self.get_page('jobs', before, limit)
+    
+    def get_stage_timing_percentiles(self, limit: int = 200) -> List[Dict[str, Any]]:
+        """
+        Per-stage p50 / p95 durations over the most recent jobs.
+
+        Args:
+            limit: Number of most recent jobs to include
+
+        Returns:
+            One row per stage: stage, jobs, p50_ms, p95_ms
+        """
+        selects = ", ".join(
+            f'percentile_cont(0.5) WITHIN GROUP (ORDER BY {column}) AS "{stage}_p50", '
+            f'percentile_cont(0.95) WITHIN GROUP (ORDER BY {column}) AS "{stage}_p95", '
+            f'COUNT({column}) AS "{stage}_n"'
+            for stage, column in JOB_TIMING_COLUMNS.items()
+        )
         with self.get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                 cursor.execute(
-                    """
-                    SELECT 
-                        j.*,
-                        i.file_name,
-                        i.file_path,
-                        i.format,
-                        COUNT(DISTINCT d.detection_id) as detection_count
-                    FROM log_jobs j
-                    JOIN images_input i ON j.image_id = i.image_id
-                    LEFT JOIN detections d ON j.job_id = d.job_id
-                    GROUP BY j.job_id, i.file_name, i.file_path, i.format
-                    ORDER BY j.started_at DESC
-                    LIMIT %s
+                    f"""
+                    SELECT {selects}
+                    FROM (
+                        SELECT * FROM log_jobs
+                        WHERE ended_at IS NOT NULL
+                        ORDER BY started_at DESC
+                        LIMIT %s
+                    ) recent
                     """,
                     (limit,)
                 )
-                return [dict(row) for row in cursor.fetchall()]
-    
-    def get_all_detections(self, job_id: int = None, limit: int = 100) -> List[Dict[str, Any]]:
+                row = cursor.fetchone() or {}
+                return [
+                    {
+                        'stage': stage,
+                        'jobs': row.get(f"{stage}_n", 0),
+                        'p50_ms': row.get(f"{stage}_p50"),
+                        'p95_ms': row.get(f"{stage}_p95"),
+                    }
+                    for stage in JOB_TIMING_COLUMNS
+                    if row.get(f"{stage}_n")
+                ]
+
+    def get_all_detections(
+        self,
+        job_id: int = None,
+        limit: int = 100,
+        before: Optional[tuple] = None
+    ) -> List[Dict[str, Any]]:
         """
-        Get all detections, optionally filtered by job.
+        Get all detections, optionally filtered by job, newest first.
         
         Args:
             job_id: Optional job ID to filter by
             limit: Maximum number of records to return
+            before: page_key('detections', row) of the last row of the previous page
             
         Returns:
             List of detection records
         """
-        with self.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                if job_id:
-                    cursor.execute(
-                        """
-                        SELECT * FROM detections
-                        WHERE job_id = %s
-                        ORDER BY detection_id DESC
-                        LIMIT %s
-                        """,
-                        (job_id, limit)
-                    )
-                else:
-                    cursor.execute(
-                        """
-                        SELECT * FROM detections
-                        ORDER BY detection_id DESC
-                        LIMIT %s
-                        """,
-                        (limit,)
-                    )
-                return [dict(row) for row in cursor.fetchall()]
+        return self.get_page('detections', before, limit, job_id=job_id or None)
     
+    def _read_summary_stats(self, totals: Dict[str, str], source: str) -> Dict[str, Any]:
+        """
+        Read counters from the summary tables (migration_004_summary_stats.sql).
+
+        Args:
+            totals: Result key -> stats_totals name
+            source: stats_class_counts source for ``component_counts``
+
+        Returns:
+            Dictionary with the totals and ``component_counts`` (largest first)
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT name, value FROM stats_totals WHERE name = ANY(%s)",
+                    (list(totals.values()),)
+                )
+                values = dict(cursor.fetchall())
+                cursor.execute(
+                    """
+                    SELECT class_name, count
+                    FROM stats_class_counts
+                    WHERE source = %s AND count > 0
+                    ORDER BY count DESC
+                    """,
+                    (source,)
+                )
+                result = {key: values.get(name, 0) for key, name in totals.items()}
+                result['component_counts'] = dict(cursor.fetchall())
+                return result
+
     def get_detection_statistics(self) -> Dict[str, Any]:
         """
         Get overall detection statistics.
+
+        Read from the trigger-maintained summary tables; falls back to
+        counting the source tables when migration 004 is not applied.
         
         Returns:
             Dictionary with statistics
         """
+        try:
+            return self._read_summary_stats(
+                {'total_images': 'images', 'total_jobs': 'jobs', 'total_detections': 'detections'},
+                'detections'
+            )
+        except psycopg2.Error:
+            print("Warning: summary statistics tables missing; run database/migration_004_summary_stats.sql")
+
         with self.get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                 cursor.execute(
@@ -382,34 +984,62 @@ class DatabaseManager:
         user_id: Optional[str] = None,
         pcba_id: Optional[str] = None,
         org_id: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+        content_hash: Optional[str] = None,
     ) -> str:
         """
         Create a PCBA Photo Booth import session.
 
+        Args:
+            timings: Optional per-stage durations in ms, stored in the
+                     ``timings`` JSONB column (migration 002)
+            content_hash: Optional SHA-256 of the source photo, stored in
+                     the ``content_hash`` column (migration 003)
+
         Returns:
             UUID of the created import record.
         """
         import json as _json
 
+        columns = ["image_storage_path", "detection_config", "total_detections",
+                   "status", "user_id", "pcba_id", "org_id"]
+        values = [
+            image_storage_path,
+            _json.dumps(detection_config) if detection_config else None,
+            total_detections,
+            status,
+            user_id,
+            pcba_id,
+            org_id,
+        ]
+        # Only referenced when given, so databases without migrations
+        # 002 / 003 keep working
+        optional = {}
+        if timings is not None:
+            optional["timings"] = _json.dumps(timings)
+        if content_hash is not None:
+            optional["content_hash"] = content_hash
+
+        try:
+            return self._insert_pcba_import(columns + list(optional), values + list(optional.values()))
+        except psycopg2.Error:
+            if not optional:
+                raise
+            print("Warning: log_pcba_pb_import is missing the timings / content_hash columns; "
+                  "run database/run_all_migrations.sql")
+            return self._insert_pcba_import(columns, values)
+
+    def _insert_pcba_import(self, columns: List[str], values: List[Any]) -> str:
+        """Insert one log_pcba_pb_import row and return its UUID."""
         with self.get_connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(
-                    """
-                    INSERT INTO log_pcba_pb_import
-                        (image_storage_path, detection_config, total_detections,
-                         status, user_id, pcba_id, org_id)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    f"""
+                    INSERT INTO log_pcba_pb_import ({", ".join(columns)})
+                    VALUES ({", ".join(["%s"] * len(columns))})
                     RETURNING id
                     """,
-                    (
-                        image_storage_path,
-                        _json.dumps(detection_config) if detection_config else None,
-                        total_detections,
-                        status,
-                        user_id,
-                        pcba_id,
-                        org_id,
-                    ),
+                    values,
                 )
                 return str(cursor.fetchone()[0])
 
@@ -486,25 +1116,9 @@ class DatabaseManager:
                 )
                 return str(cursor.fetchone()[0])
 
-    def get_all_pcba_imports(self, limit: int = 100) -> List[Dict[str, Any]]:
-        """Return recent PCBA Photo Booth import sessions."""
-        with self.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(
-                    """
-                    SELECT
-                        p.*,
-                        COUNT(r.id) AS row_count
-                    FROM log_pcba_pb_import p
-                    LEFT JOIN log_pcba_pb_row_import r
-                        ON r.log_pcba_pb_import_id = p.id
-                    GROUP BY p.id
-                    ORDER BY p.created_at DESC
-                    LIMIT %s
-                    """,
-                    (limit,),
-                )
-                return [dict(row) for row in cursor.fetchall()]
+    def get_all_pcba_imports(self, limit: int = 100, before: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        """Return recent PCBA Photo Booth import sessions (keyset-paged like :meth:`get_page`)."""
+        return self.get_page('pcba_imports', before, limit)
 
     def get_pcba_import_rows(
         self, import_id: str, limit: int = 500
@@ -524,7 +1138,20 @@ class DatabaseManager:
                 return [dict(row) for row in cursor.fetchall()]
 
     def get_pcba_statistics(self) -> Dict[str, Any]:
-        """Return aggregate statistics from PCBA Photo Booth tables."""
+        """
+        Return aggregate statistics from PCBA Photo Booth tables.
+
+        Read from the summary tables like :meth:`get_detection_statistics`.
+        """
+        try:
+            return self._read_summary_stats(
+                {'total_imports': 'pcba_imports', 'total_detections': 'pcba_detections',
+                 'completed': 'pcba_completed', 'errors': 'pcba_errors'},
+                'pcba_rows'
+            )
+        except psycopg2.Error:
+            print("Warning: summary statistics tables missing; run database/migration_004_summary_stats.sql")
+
         with self.get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                 cursor.execute(
@@ -553,10 +1180,50 @@ class DatabaseManager:
                 }
                 return stats
 
+    def get_pcba_stage_timing_percentiles(self, limit: int = 200) -> List[Dict[str, Any]]:
+        """
+        Per-stage p50 / p95 durations over the most recent Photo Booth imports.
+
+        Args:
+            limit: Number of most recent imports to include
+
+        Returns:
+            One row per stage: stage, jobs, p50_ms, p95_ms
+        """
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(
+                    """
+                    SELECT
+                        t.key AS stage,
+                        COUNT(*) AS jobs,
+                        percentile_cont(0.5)  WITHIN GROUP (ORDER BY t.value::float) AS p50_ms,
+                        percentile_cont(0.95) WITHIN GROUP (ORDER BY t.value::float) AS p95_ms
+                    FROM (
+                        SELECT timings FROM log_pcba_pb_import
+                        WHERE timings IS NOT NULL
+                        ORDER BY created_at DESC
+                        LIMIT %s
+                    ) recent,
+                    LATERAL jsonb_each_text(recent.timings) AS t
+                    GROUP BY t.key
+                    """,
+                    (limit,),
+                )
+                return [dict(row) for row in cursor.fetchall()]
+
+
+_managers: Dict[tuple, DatabaseManager] = {}
+_managers_lock = threading.Lock()
+
 
 def get_db_manager_from_env() -> DatabaseManager:
     """
-    Create a DatabaseManager using environment variables.
+    Return the process-wide DatabaseManager configured from environment variables.
+
+    Every caller with the same settings (all Streamlit sessions, the
+    pipeline and its watch workers) shares one manager and therefore one
+    connection pool. Worker processes each get their own.
 
     Loads configuration from a .env file if present (using python-dotenv).
     If no .env file is found, falls back to environment variables or defaults
@@ -568,6 +1235,9 @@ def get_db_manager_from_env() -> DatabaseManager:
         DB_NAME: Database name (default: nuts_vision)
         DB_USER: Database user (default: nuts_user)
         DB_PASSWORD: Database password (default: nuts_password)
+        DB_POOL_MIN: Connections kept open (default: 1)
+        DB_POOL_MAX: Maximum open connections (default: 10)
+        DB_STATEMENT_TIMEOUT_MS: Viewer / export statement limit (default: 30000)
 
     Returns:
         DatabaseManager instance
@@ -579,10 +1249,19 @@ def get_db_manager_from_env() -> DatabaseManager:
     else:
         print("No .env file found, using defaults")
 
-    return DatabaseManager(
+    settings = dict(
         host=os.getenv('DB_HOST', 'localhost'),
         port=int(os.getenv('DB_PORT', '5432')),
         database=os.getenv('DB_NAME', 'nuts_vision'),
         user=os.getenv('DB_USER', 'nuts_user'),
-        password=os.getenv('DB_PASSWORD', 'nuts_password')
+        password=os.getenv('DB_PASSWORD', 'nuts_password'),
+        min_connections=int(os.getenv('DB_POOL_MIN', str(DEFAULT_POOL_MIN))),
+        max_connections=int(os.getenv('DB_POOL_MAX', str(DEFAULT_POOL_MAX))),
+        statement_timeout_ms=int(os.getenv('DB_STATEMENT_TIMEOUT_MS', str(DEFAULT_STATEMENT_TIMEOUT_MS)))
     )
+    key = tuple(sorted(settings.items()))
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _managers[key] = DatabaseManager(**settings)
+        return manager
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Streaming Database Export
+Writes a Database Viewer view (see ``database.VIEWER_QUERIES``) to CSV or
+Parquet chunk by chunk, reading through a server-side cursor, so the full
+history can be exported without holding it in memory.
+
+Parquet export needs pyarrow (pip install pyarrow).
+
+Usage:
+    rows = export_view(db, "detections", "detections.parquet", job_id=42)
+    python src/db_export.py detections --output detections.csv
+    python src/db_export.py pcba_rows --output rows.parquet --import-id <uuid>
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+import uuid
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    from database import EXPORT_CHUNK_SIZE, VIEWER_QUERIES
+except ImportError:  # imported as part of the ``src`` package
+    from .database import EXPORT_CHUNK_SIZE, VIEWER_QUERIES
+
+
+EXPORT_FORMATS = ('csv', 'parquet')
+
+
+def _plain(value: Any) -> Any:
+    """A value both writers accept: JSON text for JSONB, str for UUIDs, float for NUMERIC."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _write_csv(chunks: Iterable[List[Dict[str, Any]]], output: Path) -> int:
+    rows = 0
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        writer = None
+        for chunk in chunks:
+            if writer is None:
+                writer = csv.writer(f)
+                writer.writerow(list(chunk[0]))
+            writer.writerows([_plain(value) for value in row.values()] for row in chunk)
+            rows += len(chunk)
+    return rows
+
+
+def _write_parquet(chunks: Iterable[List[Dict[str, Any]]], output: Path) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow)") from e
+
+    rows = 0
+    writer = None
+    text_columns = set()
+    try:
+        for chunk in chunks:
+            records = [{key: _plain(value) for key, value in row.items()} for row in chunk]
+            if writer is None:
+                # Columns that are all NULL in the first chunk have no type
+                # yet; store them as text so later chunks always fit
+                schema = pa.Table.from_pylist(records).schema
+                text_columns = {field.name for field in schema if pa.types.is_null(field.type)}
+                schema = pa.schema([
+                    field.with_type(pa.string()) if field.name in text_columns else field
+                    for field in schema
+                ])
+                writer = pq.ParquetWriter(str(output), schema)
+            for record in records:
+                for name in text_columns:
+                    if record[name] is not None:
+                        record[name] = str(record[name])
+            writer.write_table(pa.Table.from_pylist(records, schema=schema))
+            rows += len(chunk)
+        if writer is None:
+            pq.write_table(pa.table({}), str(output))
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def export_view(
+    db,
+    view: str,
+    output: str,
+    format: Optional[str] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    **filters
+) -> int:
+    """
+    Export a viewer view, newest first, to a CSV or Parquet file.
+
+    Args:
+        db: DatabaseManager instance
+        view: View name (see ``VIEWER_QUERIES``)
+        output: Destination file
+        format: 'csv' or 'parquet' (default: from the file extension)
+        chunk_size: Rows fetched and written per step
+        **filters: Column filters accepted by the view
+
+    Returns:
+        Number of rows written
+    """
+    output = Path(output)
+    format = format or output.suffix.lstrip(".").lower()
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {EXPORT_FORMATS}, got '{format}'")
+    chunks = db.iter_view(view, chunk_size=chunk_size, **filters)
+    try:
+        if format == "csv":
+            return _write_csv(chunks, output)
+        return _write_parquet(chunks, output)
+    finally:
+        chunks.close()  # returns the connection if writing failed midway
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a database view to CSV or Parquet")
+    parser.add_argument("view", choices=sorted(VIEWER_QUERIES), help="View to export")
+    parser.add_argument("--output", type=str, required=True,
+                        help="Output file (.csv or .parquet)")
+    parser.add_argument("--format", type=str, choices=EXPORT_FORMATS, default=None,
+                        help="Output format (default: from the --output extension)")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE,
+                        help=f"Rows per fetch (default: {EXPORT_CHUNK_SIZE})")
+    parser.add_argument("--image-id", type=int, default=None, help="Only this image (jobs)")
+    parser.add_argument("--job-id", type=int, default=None, help="Only this job (detections, crops)")
+    parser.add_argument("--import-id", type=str, default=None,
+                        help="Only this Photo Booth import (pcba_rows)")
+    args = parser.parse_args()
+
+    accepted = VIEWER_QUERIES[args.view]['filters']
+    filters = {name: value for name, value in (("image_id", args.image_id), ("job_id", args.job_id),
+                                                ("import_id", args.import_id))
+               if value is not None}
+    unknown = set(filters) - set(accepted)
+    if unknown:
+        parser.error(f"view '{args.view}' cannot be filtered by {', '.join(sorted(unknown))}")
+
+    from database import get_db_manager_from_env
+    db = get_db_manager_from_env()
+    start = time.perf_counter()
+    try:
+        rows = export_view(db, args.view, args.output, args.format, args.chunk_size, **filters)
+    except ImportError as e:
+        sys.exit(str(e))
+    print(f"Exported {rows} rows to {args.output} in {time.perf_counter() - start:.1f} s")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
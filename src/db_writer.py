@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Asynchronous Database Writer
+Takes job logging off the processing path: ``process_image`` hands the
+job's rows to a bounded in-memory queue and returns, and a background
+thread writes queued jobs in batches (several jobs per transaction, see
+``DatabaseManager.log_jobs_bulk``).
+
+While PostgreSQL is unreachable (or the queue is full) jobs are appended
+to a local journal (``<jobs>/_db_journal.jsonl``, one JSON record per
+line) instead of being dropped. Once the database answers again the
+journal is replayed in order before new jobs are written; replay skips
+jobs already logged, so a crash during replay does not duplicate rows.
+
+Usage:
+    writer = get_db_writer(db, "jobs/_db_journal.jsonl")
+    writer.submit({"file_name": ..., "file_path": ..., "model": ..., "detections": [...]})
+    writer.stats()   # queue depth, journal entries, replay lag
+    python src/db_writer.py replay [--journal jobs/_db_journal.jsonl]
+"""
+
+import argparse
+import atexit
+import json
+import multiprocessing.util
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import psycopg2
+import psycopg2.pool
+
+try:
+    import fcntl  # journal file lock shared with other processes (POSIX)
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+JOURNAL_NAME = "_db_journal.jsonl"
+
+DEFAULT_QUEUE_SIZE = 1024
+DEFAULT_BATCH_SIZE = 32        # jobs per transaction
+DEFAULT_RETRY_INTERVAL = 5.0   # seconds between reconnect attempts
+
+# Errors meaning "database unreachable": spill and retry later. Any other
+# error is a problem with the record itself, which is set aside in
+# <journal>.rejected.jsonl instead of blocking the journal forever.
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError, psycopg2.pool.PoolError)
+
+
+class DBWriter:
+    """
+    Background writer of job logs with a local spill journal.
+
+    Records are keyword dicts of ``DatabaseManager.log_job_bulk`` (JSON
+    serializable); :meth:`submit` adds a ``queued_at`` timestamp used for
+    the replay lag.
+    """
+
+    def __init__(
+        self,
+        db,
+        journal_path: str,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        retry_interval: float = DEFAULT_RETRY_INTERVAL
+    ):
+        """
+        Args:
+            db: DatabaseManager to write through
+            journal_path: Append-only spill journal (created when needed)
+            queue_size: Jobs held in memory before spilling to the journal
+            batch_size: Jobs written per transaction
+            retry_interval: Seconds between attempts while the database
+                            is unreachable
+        """
+        self.db = db
+        self.journal_path = Path(journal_path)
+        self.replay_path = self.journal_path.with_name(self.journal_path.name + ".replay")
+        self.rejected_path = self.journal_path.with_name(
+            self.journal_path.stem + ".rejected" + self.journal_path.suffix
+        )
+        self.batch_size = max(1, int(batch_size))
+        self.retry_interval = retry_interval
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._in_flight = 0
+        self._failed_at: Optional[float] = None
+        self.written = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+        self._journal_pending, self._oldest_pending = self._scan_journal()
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(self, record: dict) -> None:
+        """Queue a job for writing; spills to the journal if the queue is full."""
+        record = dict(record)
+        record.setdefault('queued_at', time.time())
+        if not self._thread.is_alive():  # closed: nothing consumes the queue
+            self._spill([record])
+            return
+        with self._lock:
+            self._in_flight += 1
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self._spill([record])
+            self._done(1)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every submitted job is written or spilled.
+
+        Returns:
+            False if ``timeout`` expired first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        """Flush, then stop the writer thread (unwritten jobs stay in the journal)."""
+        if not self._thread.is_alive():
+            return
+        self.flush(timeout)
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, object]:
+        """Queue depth, journal backlog and replay lag (seconds)."""
+        with self._lock:
+            oldest = self._oldest_pending
+            return {
+                'queued': self._queue.qsize(),
+                'queue_size': self._queue.maxsize,
+                'journal_pending': self._journal_pending,
+                'replay_lag_s': round(time.time() - oldest, 1) if oldest else 0.0,
+                'written': self.written,
+                'spilled': self.spilled,
+                'replayed': self.replayed,
+                'rejected': self.rejected,
+                'db_available': self._failed_at is None,
+                'last_error': self.last_error,
+            }
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.retry_interval)
+            except queue.Empty:
+                first = False
+            batch = [] if first in (None, False) else [first]
+            while first is not None and len(batch) < self.batch_size:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is None:
+                    first = None
+                    break
+                batch.append(record)
+
+            # Shutting down (first is None) always gets one last replay attempt
+            if self._journal_pending and (first is None or self._reconnect_due()):
+                self._replay()
+            if batch:
+                if self._journal_pending:
+                    # Keep the order: new jobs queue up behind the journal
+                    self._spill(batch)
+                elif not self._write(batch, skip_logged=False):
+                    self._spill(batch)
+                self._done(len(batch))
+            if first is None:
+                return
+
+    def _done(self, count: int) -> None:
+        with self._idle:
+            self._in_flight -= count
+            if self._in_flight <= 0:
+                self._idle.notify_all()
+
+    def _reconnect_due(self) -> bool:
+        return self._failed_at is None or time.monotonic() - self._failed_at >= self.retry_interval
+
+    def _write(self, records: List[dict], skip_logged: bool) -> bool:
+        """
+        Write records in one transaction.
+
+        Returns:
+            False if the database is unreachable (nothing written); records
+            rejected by the database are set aside and count as handled
+        """
+        jobs = [{k: v for k, v in r.items() if k != 'queued_at'} for r in records]
+        try:
+            self.db.log_jobs_bulk(jobs, skip_logged=skip_logged)
+        except CONNECTION_ERRORS as e:
+            self._failed_at = time.monotonic()
+            self.last_error = str(e).strip()
+            return False
+        except Exception as e:
+            if len(records) > 1:
+                # Isolate the offending record(s)
+                return all(self._write([r], skip_logged) for r in records)
+            print(f"Warning: Database rejected job log ({e}); kept in {self.rejected_path}")
+            self._append(self.rejected_path, [{**records[0], 'error': str(e).strip()}])
+            self.rejected += 1
+            self.last_error = str(e).strip()
+            return True
+        self._failed_at = None
+        self.written += len(records)
+        return True
+
+    # ------------------------------------------------------------------
+    # Journal
+    # ------------------------------------------------------------------
+
+    def _file_lock(self):
+        """Exclusive lock on the journal (across processes where supported)."""
+        return _JournalLock(self.journal_path.with_name(self.journal_path.name + ".lock"))
+
+    def _replay_lock(self):
+        """
+        Exclusive lock on the replay file, held for a whole replay so two
+        processes sharing the journal never write the same records (appends
+        to the journal only need :meth:`_file_lock` and are not blocked).
+        """
+        return _JournalLock(self.journal_path.with_name(self.journal_path.name + ".replay.lock"))
+
+    def _append(self, path: Path, records: List[dict]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        with self._file_lock():
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _spill(self, records: List[dict]) -> None:
+        if self._journal_pending == 0 and self._failed_at is not None:
+            print(f"Warning: Database unreachable ({self.last_error}); "
+                  f"logging jobs to {self.journal_path} until it is back")
+        self._append(self.journal_path, records)
+        with self._lock:
+            self.spilled += len(records)
+            self._journal_pending += len(records)
+            if self._oldest_pending is None:
+                self._oldest_pending = min(r.get('queued_at', time.time()) for r in records)
+
+    def _scan_journal(self):
+        return journal_backlog(str(self.journal_path))
+
+    def _replay(self) -> None:
+        """Write journaled jobs in order; stops at the first connection failure."""
+        with self._replay_lock():
+            with self._file_lock():
+                if not self.replay_path.exists() and self.journal_path.exists():
+                    # New spills go to a fresh journal while this one is replayed
+                    os.replace(self.journal_path, self.replay_path)
+            records = _read_journal(self.replay_path)
+            done = 0
+            while done < len(records):
+                batch = records[done:done + self.batch_size]
+                if not self._write(batch, skip_logged=True):
+                    break
+                done += len(batch)
+                self.replayed += len(batch)
+            if done >= len(records):
+                self.replay_path.unlink(missing_ok=True)
+            elif done:
+                tmp = self.replay_path.with_name(f"{self.replay_path.name}.{os.getpid()}.tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(r, separators=(",", ":")) + "\n" for r in records[done:])
+                os.replace(tmp, self.replay_path)
+        pending, oldest = self._scan_journal()
+        with self._lock:
+            self._journal_pending, self._oldest_pending = pending, oldest
+        if done and not pending:
+            print(f"Database reachable again: replayed {self.replayed} journaled job logs")
+
+
+def _read_journal(path: Path) -> List[dict]:
+    records = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    pass  # torn last line of a crash mid-append
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def journal_backlog(journal_path: str):
+    """(pending job logs, oldest queued_at) of a journal and its replay file."""
+    journal_path = Path(journal_path)
+    replay_path = journal_path.with_name(journal_path.name + ".replay")
+    records = _read_journal(replay_path) + _read_journal(journal_path)
+    oldest = min((r.get('queued_at', time.time()) for r in records), default=None)
+    return len(records), oldest
+
+
+class _JournalLock:
+    """Thread lock plus (on POSIX) an flock on a lock file, one pair per path."""
+
+    _thread_locks: Dict[str, threading.Lock] = {}
+    _guard = threading.Lock()
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+        with self._guard:
+            self._thread_lock = self._thread_locks.setdefault(str(path.resolve()), threading.Lock())
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if fcntl is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a")
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+
+
+_writers: Dict[str, DBWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_db_writer(db, journal_path: str, **kwargs) -> DBWriter:
+    """Return the process-wide writer for ``journal_path``, creating it on first use."""
+    key = str(Path(journal_path).resolve())
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = DBWriter(db, journal_path, **kwargs)
+        return writer
+
+
+def active_writers() -> List[DBWriter]:
+    """Writers created in this process."""
+    with _writers_lock:
+        return list(_writers.values())
+
+
+def close_db_writers(timeout: Optional[float] = 30.0) -> None:
+    """Flush and stop every writer (also runs at interpreter exit)."""
+    for writer in active_writers():
+        writer.close(timeout)
+
+
+atexit.register(close_db_writers)
+# Worker processes of a multiprocessing pool skip atexit handlers but run
+# multiprocessing finalizers before exiting
+multiprocessing.util.Finalize(None, close_db_writers, exitpriority=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay or inspect the database spill journal")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("replay", "Write journaled job logs to the database now"),
+                            ("status", "Show the journal backlog")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--journal", type=str, default=str(Path("jobs") / JOURNAL_NAME),
+                       help=f"Journal file (default: jobs/{JOURNAL_NAME})")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        pending, oldest = journal_backlog(args.journal)
+        lag = f", oldest {time.time() - oldest:.0f} s old" if oldest else ""
+        print(f"{args.journal}: {pending} job logs waiting{lag}")
+        return
+
+    from database import get_db_manager_from_env
+    writer = DBWriter(get_db_manager_from_env(), args.journal)
+    writer.close()  # the writer thread replays the journal before stopping
+    for key, value in writer.stats().items():
+        print(f"{key:16s} {value}")
+
+
+if __name__ == "__main__":
+    main()
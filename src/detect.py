@@ -5,27 +5,148 @@ Detects electronic components in circuit board images using YOLO and preprocessi
 """
 
 import argparse
+import os
+import threading
+import time
 import cv2
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from ultralytics import YOLO
 from typing import List, Tuple, Optional
 from PIL import Image, ImageOps
 import json
 
+try:
+    from imaging import (letterbox, unletterbox_boxes, boxes_to_detections,
+                         draw_detections, tile_windows, apply_exif_orientation,
+                         scale_boxes)
+    from boxes import iou_matrix, match_boxes, batched_nms, MATCHING_METHODS
+    from onnx_backend import BACKENDS
+    from model_registry import ModelRegistry, get_registry, print_models
+    from timing import StageTimer, timed
+    from inference_cache import (InferenceCache, CACHE_CONF_FLOOR, hash_array,
+                                 hash_file, filter_detections, get_inference_cache)
+    from parallel import WorkerPool, print_throughput, threads_per_worker
+except ImportError:  # imported as part of the ``src`` package
+    from .imaging import (letterbox, unletterbox_boxes, boxes_to_detections,
+                          draw_detections, tile_windows, apply_exif_orientation,
+                          scale_boxes)
+    from .boxes import iou_matrix, match_boxes, batched_nms, MATCHING_METHODS
+    from .onnx_backend import BACKENDS
+    from .model_registry import ModelRegistry, get_registry, print_models
+    from .timing import StageTimer, timed
+    from .inference_cache import (InferenceCache, CACHE_CONF_FLOOR, hash_array,
+                                  hash_file, filter_detections, get_inference_cache)
+    from .parallel import WorkerPool, print_throughput, threads_per_worker
 
-def load_image_with_exif(image_path: str) -> np.ndarray:
+
+EXIF_ORIENTATION_TAG = 0x0112
+
+# Where preprocessing runs: on the full-resolution image before the model
+# downsamples it ('full'), or on the letterboxed model input ('letterbox')
+PREPROCESS_ORDERS = ('full', 'letterbox')
+
+# cv2.imdecode flags per decode reduction factor. JPEGs are decoded
+# directly at 1/2, 1/4 or 1/8 size from the DCT coefficients (other
+# formats are decoded in full and resized by OpenCV).
+DECODE_REDUCTIONS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def _read_header(image_path: str) -> Tuple[int, Optional[Tuple[int, int]]]:
+    """
+    Return (EXIF orientation, (width, height) as stored) without decoding
+    the pixel data. Falls back to (1, None) if PIL cannot parse the header.
+    """
+    try:
+        with Image.open(image_path) as pil_img:
+            return int(pil_img.getexif().get(EXIF_ORIENTATION_TAG, 1)), pil_img.size
+    except Exception:
+        return 1, None
+
+
+def _decode_with_pil(image_path: str, reduction: int = 1) -> np.ndarray:
+    """Slow path for files OpenCV cannot decode: PIL + exif_transpose."""
+    pil_img = ImageOps.exif_transpose(Image.open(image_path)).convert("RGB")
+    if reduction > 1:
+        pil_img = pil_img.reduce(reduction)
+    return cv2.cvtColor(np.asarray(pil_img), cv2.COLOR_RGB2BGR)
+
+
+def decode_image(
+    image_path: str,
+    reduction: int = 1,
+    timer: Optional[StageTimer] = None,
+) -> Tuple[np.ndarray, Tuple[float, float]]:
+    """
+    Decode an image straight to BGR in its EXIF (visual) orientation.
+
+    Only the orientation tag is read from the EXIF block; the pixels are
+    decoded once by OpenCV with its own orientation handling disabled and
+    rotated with a single transpose / flip when the tag asks for it.
+
+    Args:
+        image_path: Path to the image file.
+        reduction: Decode at 1/``reduction`` of the full resolution
+                   (1, 2, 4 or 8), e.g. for previews or low-res inference.
+        timer: Optional StageTimer receiving the ``decode`` and
+               ``exif_transpose`` durations.
+
+    Returns:
+        Tuple of (BGR image, (scale_x, scale_y)) where the scale maps
+        coordinates in the returned image back to the full-resolution,
+        correctly oriented image ((1.0, 1.0) without reduction).
+
+    Raises:
+        ValueError: If the image cannot be loaded or ``reduction`` is invalid.
+    """
+    if reduction not in DECODE_REDUCTIONS:
+        raise ValueError(f"reduction must be one of {sorted(DECODE_REDUCTIONS)}, got {reduction}")
+    try:
+        with timed(timer, 'decode'):
+            orientation, stored_size = _read_header(image_path)
+            # np.fromfile + imdecode also copes with non-ASCII paths on Windows
+            data = np.fromfile(image_path, dtype=np.uint8)
+            image = cv2.imdecode(data, DECODE_REDUCTIONS[reduction] | cv2.IMREAD_IGNORE_ORIENTATION)
+            if image is None:
+                image, orientation = _decode_with_pil(image_path, reduction), 1
+                stored_size = None
+        with timed(timer, 'exif_transpose'):
+            image = apply_exif_orientation(image, orientation)
+    except Exception as e:
+        raise ValueError(f"Could not load image: {image_path} — {e}")
+
+    if reduction == 1 or stored_size is None:
+        # Fallback path: assume an exact 1/reduction decode
+        return image, (float(reduction), float(reduction))
+    full_w, full_h = stored_size
+    if orientation in (5, 6, 7, 8):
+        full_w, full_h = full_h, full_w
+    # Reduced JPEG sizes are rounded up, so the factor is not exactly ``reduction``
+    return image, (full_w / image.shape[1], full_h / image.shape[0])
+
+
+def load_image_with_exif(
+    image_path: str,
+    timer: Optional[StageTimer] = None,
+    reduction: int = 1,
+) -> np.ndarray:
     """
     Load an image with EXIF orientation correction.
 
     PIL/Streamlit auto-rotate images according to EXIF orientation tags,
-    but OpenCV's ``cv2.imread`` ignores them.  This helper opens the file
-    with PIL, applies ``ImageOps.exif_transpose()`` so the pixel data
-    matches the visual orientation, then converts to a BGR numpy array
-    suitable for OpenCV processing.
+    so the returned pixels match what users see in the app. See
+    :func:`decode_image`, which also returns the reduced-decode scale.
 
     Args:
         image_path: Path to the image file.
+        timer: Optional StageTimer receiving the ``decode`` and
+               ``exif_transpose`` durations.
+        reduction: Decode at 1/``reduction`` resolution (1, 2, 4 or 8).
 
     Returns:
         BGR numpy array with correct orientation.
@@ -33,32 +154,141 @@ def load_image_with_exif(image_path: str) -> np.ndarray:
     Raises:
         ValueError: If the image cannot be loaded.
     """
-    try:
-        pil_img = Image.open(image_path)
-        pil_img = ImageOps.exif_transpose(pil_img)
-        # Ensure 3-channel RGB
-        pil_img = pil_img.convert("RGB")
-        # Convert to BGR numpy array for OpenCV
-        rgb_array = np.array(pil_img)
-        bgr_array = cv2.cvtColor(rgb_array, cv2.COLOR_RGB2BGR)
-        return bgr_array
-    except Exception as e:
-        raise ValueError(f"Could not load image: {image_path} — {e}")
+    return decode_image(image_path, reduction=reduction, timer=timer)[0]
+
+
+class DetectionResult(list):
+    """
+    Detections from a single forward pass.
+
+    Behaves exactly like the plain list of detection dictionaries returned
+    historically, but also keeps the raw model output and the image the
+    boxes refer to, so annotation and cropping can reuse the same pass
+    instead of running the model again.
+
+    Attributes:
+        raw:   ultralytics ``Results`` for this image, or None when the
+               detections were mapped from another coordinate space
+               (e.g. batched / letterboxed / tiled inference)
+        image: Original BGR image (before preprocessing), or None
+        image_scale: (scale_x, scale_y) from :attr:`image` to the box
+                     coordinates; not (1, 1) after a reduced decode, where
+                     the boxes are full-resolution but the image is not
+        tile_timings: Per-tile timing records for tiled inference, else None
+        inference_calls: Model calls spent on this image — 1 per call, the
+                         image's share (1 / batch size) of a batched call,
+                         summed over tiles; 0 when served from the cache
+    """
+
+    def __init__(self, detections=(), raw=None, image: Optional[np.ndarray] = None):
+        super().__init__(detections)
+        self.raw = raw
+        self.image = image
+        self.image_scale = (1.0, 1.0)
+        self.tile_timings = None
+        self.inference_calls = 0
+
+    def plot(self, image: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Render the detections on ``image`` (defaults to :attr:`image`).
+
+        Returns:
+            Annotated BGR image
+        """
+        if image is None and self.image_scale != (1.0, 1.0) and self.image is not None:
+            # Reduced decode: draw the full-resolution boxes at the image's scale
+            sx, sy = self.image_scale
+            scaled = [
+                dict(det, bbox=[det['bbox'][0] / sx, det['bbox'][1] / sy,
+                                det['bbox'][2] / sx, det['bbox'][3] / sy])
+                for det in self
+            ]
+            return draw_detections(self.image, scaled)
+        image = image if image is not None else self.image
+        if self.raw is not None:
+            return self.raw.plot(img=image.copy() if image is not None else None)
+        if image is None:
+            raise ValueError("No image available to plot detections on")
+        return draw_detections(image, self)
 
 
 class ComponentDetector:
     """Detector for electronic components on circuit boards."""
     
-    def __init__(self, model_path: str, conf_threshold: float = 0.25):
+    def __init__(
+        self,
+        model_path: str,
+        conf_threshold: float = 0.25,
+        imgsz: int = 640,
+        batch_size: int = 1,
+        backend: str = 'ultralytics',
+        intra_op_threads: Optional[int] = None,
+        inter_op_threads: Optional[int] = None,
+        registry: Optional[ModelRegistry] = None,
+        preprocess_order: str = 'full',
+        cache: Optional[InferenceCache] = None,
+    ):
         """
         Initialize the component detector.
         
         Args:
             model_path: Path to the trained YOLO model
             conf_threshold: Confidence threshold for detections
+            imgsz: Square model input size used for batched letterboxing
+            batch_size: Number of images sent to the model per call in
+                        :meth:`batch_detect` (1 = one call per image)
+            backend: 'ultralytics' (YOLO wrapper, .pt or .onnx) or
+                     'onnxruntime' (native ONNX Runtime session, .onnx only)
+            intra_op_threads: onnxruntime intra-op threads (onnxruntime backend)
+            inter_op_threads: onnxruntime inter-op threads (onnxruntime backend)
+            registry: Model cache to load from (default: the process-wide
+                      registry, so repeated detectors share loaded weights)
+            preprocess_order: 'full' (blur / CLAHE / sharpen the full-resolution
+                      image) or 'letterbox' (letterbox to ``imgsz`` first and
+                      filter the much smaller model input)
+            cache: Inference cache consulted by :meth:`detect_components`
+                      (None = always run the model)
         """
-        self.model = YOLO(model_path)
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, got '{backend}'")
+        if preprocess_order not in PREPROCESS_ORDERS:
+            raise ValueError(f"preprocess_order must be one of {PREPROCESS_ORDERS}, got '{preprocess_order}'")
+        self.backend = backend
+        self.model_path = str(model_path)
+        self.cache = cache
+        # Constructor arguments, to build identical detectors in the worker
+        # processes of batch_detect(workers=N)
+        self.config = dict(
+            model_path=str(model_path), conf_threshold=conf_threshold, imgsz=imgsz,
+            batch_size=batch_size, backend=backend, intra_op_threads=intra_op_threads,
+            inter_op_threads=inter_op_threads, preprocess_order=preprocess_order,
+        )
+        self.last_run_stats = None
+        self.registry = registry if registry is not None else get_registry()
+        # The model and its call lock are shared with every other detector
+        # of the process using the same weights
+        self.model, self._model_lock = self.registry.get_with_lock(
+            model_path,
+            backend=backend,
+            intra_op_threads=intra_op_threads,
+            inter_op_threads=inter_op_threads,
+            imgsz=imgsz,
+        )
+        if backend == 'onnxruntime':
+            imgsz = self.model.imgsz
         self.conf_threshold = conf_threshold
+        self.imgsz = imgsz
+        self.batch_size = max(1, int(batch_size))
+        self.preprocess_order = preprocess_order
+        self._batch_supported = True
+        # CLAHE objects and letterbox-size scratch buffers, per thread
+        # (neither is safe to share between concurrent calls)
+        self._local = threading.local()
+        # Number of forward passes issued by this detector (one per model
+        # call, whatever the batch size) — lets callers measure savings.
+        # Per-image counts are on each DetectionResult.
+        self.inference_calls = 0
+        self._calls_lock = threading.Lock()
         
     def preprocess_image(
         self, 
@@ -115,8 +345,24 @@ class ComponentDetector:
     # Peripheral-detection helpers
     # ------------------------------------------------------------------
 
-    @staticmethod
+    _SHARPEN_KERNEL = np.array(
+        [[0, -1,  0],
+         [-1,  5, -1],
+         [0, -1,  0]], dtype=np.float32
+    )
+
+    def _get_clahe(self, clip_limit: float, tile_grid: Tuple[int, int]):
+        """Return this thread's cached CLAHE object for the given settings."""
+        cache = getattr(self._local, 'clahe', None)
+        if cache is None:
+            cache = self._local.clahe = {}
+        key = (float(clip_limit), tuple(tile_grid))
+        if key not in cache:
+            cache[key] = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid)
+        return cache[key]
+
     def _apply_clahe(
+        self,
         image: np.ndarray,
         clip_limit: float = 2.0,
         tile_grid: Tuple[int, int] = (8, 8),
@@ -124,21 +370,85 @@ class ComponentDetector:
         """Apply CLAHE on the L channel of a LAB image."""
         lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
         l_chan, a_chan, b_chan = cv2.split(lab)
-        clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid)
-        l_chan = clahe.apply(l_chan)
+        l_chan = self._get_clahe(clip_limit, tile_grid).apply(l_chan)
         lab = cv2.merge([l_chan, a_chan, b_chan])
         return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
 
-    @staticmethod
-    def _apply_sharpen(image: np.ndarray) -> np.ndarray:
+    @classmethod
+    def _apply_sharpen(cls, image: np.ndarray) -> np.ndarray:
         """Apply a mild unsharp-mask style sharpening kernel."""
-        kernel = np.array(
-            [[0, -1,  0],
-             [-1,  5, -1],
-             [0, -1,  0]], dtype=np.float32
-        )
-        return cv2.filter2D(image, -1, kernel)
+        return cv2.filter2D(image, -1, cls._SHARPEN_KERNEL)
+
+    def _scratch(self, shape: Tuple[int, ...]) -> dict:
+        """Per-thread buffers for filtering letterboxed inputs of ``shape``."""
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None or buffers['a'].shape != shape:
+            buffers = self._local.buffers = {
+                'a': np.empty(shape, dtype=np.uint8),
+                'b': np.empty(shape, dtype=np.uint8),
+                'lab': np.empty(shape, dtype=np.uint8),
+                'l_in': np.empty(shape[:2], dtype=np.uint8),
+                'l_out': np.empty(shape[:2], dtype=np.uint8),
+            }
+        return buffers
+
+    def preprocess_letterboxed(
+        self,
+        boxed: np.ndarray,
+        apply_clahe: bool = False,
+        apply_sharpen: bool = False,
+        blur_kernel: Tuple[int, int] = (5, 5),
+        clahe_clip: float = 2.0,
+        clahe_grid: Tuple[int, int] = (8, 8),
+    ) -> np.ndarray:
+        """
+        Blur / CLAHE / sharpen an already letterboxed model input, the
+        same steps as :meth:`preprocess_image` but on ``imgsz`` pixels and
+        without allocating: every step writes into preallocated per-thread
+        buffers.
+
+        Args:
+            boxed: Letterboxed BGR image (model input size)
+            apply_clahe: Whether to apply CLAHE contrast enhancement
+            apply_sharpen: Whether to apply mild sharpening
+            blur_kernel: Kernel size for Gaussian blur
+            clahe_clip: CLAHE clip limit
+            clahe_grid: CLAHE tile grid size
+
+        Returns:
+            One of the scratch buffers — overwritten by the next call on
+            the same thread, so copy it if it must outlive that
+        """
+        buf = self._scratch(boxed.shape)
+        out = cv2.GaussianBlur(boxed, blur_kernel, 0, dst=buf['a'])
+        if apply_clahe:
+            lab = cv2.cvtColor(out, cv2.COLOR_BGR2LAB, dst=buf['lab'])
+            cv2.extractChannel(lab, 0, dst=buf['l_in'])
+            self._get_clahe(clahe_clip, clahe_grid).apply(buf['l_in'], dst=buf['l_out'])
+            cv2.insertChannel(buf['l_out'], lab, 0)
+            out = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=buf['b'])
+        if apply_sharpen:
+            dst = buf['b'] if out is buf['a'] else buf['a']
+            out = cv2.filter2D(out, -1, self._SHARPEN_KERNEL, dst=dst)
+        return out
     
+    def cache_key(self, image_hash: str, **flags) -> str:
+        """
+        Inference-cache key of this detector's raw detections on an image.
+
+        Args:
+            image_hash: Content hash of the source image (before preprocessing)
+            **flags: Preprocessing / tiling flags that change the result
+
+        Returns:
+            Hex key (see :meth:`InferenceCache.make_key`)
+        """
+        if flags.get('preprocess'):
+            flags['preprocess_order'] = self.preprocess_order
+        return InferenceCache.make_key(
+            image_hash, self.model_path, backend=self.backend, imgsz=self.imgsz, **flags
+        )
+
     def detect_components(
         self, 
         image_path: str,
@@ -148,7 +458,11 @@ class ComponentDetector:
         apply_clahe: bool = False,
         apply_sharpen: bool = False,
         image: Optional[np.ndarray] = None,
-    ) -> List[dict]:
+        timer: Optional[StageTimer] = None,
+        decode_reduction: int = 1,
+        conf: Optional[float] = None,
+        image_hash: Optional[str] = None,
+    ) -> DetectionResult:
         """
         Detect components in an image.
         
@@ -160,58 +474,478 @@ class ComponentDetector:
             apply_clahe: Whether to apply CLAHE contrast enhancement
             apply_sharpen: Whether to apply mild sharpening
             image: Optional pre-loaded BGR image (skips file I/O if provided)
+            timer: Optional StageTimer receiving decode / preprocess /
+                   inference / parse durations
+            decode_reduction: Decode the file at 1/N resolution (1, 2, 4, 8)
+                   for faster low-res inference; boxes are still returned in
+                   full-resolution coordinates. Ignored when ``image`` is given.
+            conf: Confidence threshold for this call (default: conf_threshold)
+            image_hash: Cache identity of the image (e.g. :func:`hash_file` of
+                   the upload ``image`` was decoded from); hashed from the
+                   pixels / file when omitted
             
         Returns:
-            List of detection dictionaries
+            DetectionResult (a list of detection dictionaries that also
+            carries the raw model output for annotation)
         """
+        conf = self.conf_threshold if conf is None else conf
+        if image is not None:
+            decode_reduction = 1
+
+        # Cached raw detections: only the confidence filter is left to do
+        cache_key = None
+        if self.cache is not None:
+            with timed(timer, 'cache_lookup'):
+                if image_hash is None:
+                    image_hash = hash_array(image) if image is not None else hash_file(str(image_path))
+                cache_key = self.cache_key(
+                    image_hash, mode='single', preprocess=preprocess,
+                    apply_clahe=apply_clahe, apply_sharpen=apply_sharpen,
+                    decode_reduction=decode_reduction,
+                )
+                cached = self.cache.get(cache_key, min_conf=conf)
+            if cached is not None:
+                scale = (1.0, 1.0)
+                if image is None and save_visualization:
+                    image, scale = decode_image(str(image_path), reduction=decode_reduction, timer=timer)
+                detections = DetectionResult(filter_detections(cached, conf), image=image)
+                detections.image_scale = scale
+                if save_visualization:
+                    self._save_visualization(detections, image_path, output_dir)
+                return detections
+
         # Use pre-loaded image or load from file with EXIF correction
+        scale = (1.0, 1.0)
         if image is None:
-            image = load_image_with_exif(str(image_path))
+            image, scale = decode_image(str(image_path), reduction=decode_reduction, timer=timer)
         
-        original_image = image.copy()
+        # preprocess_image works on a copy, so no defensive copy is needed
+        original_image = image
         
         # Preprocess if requested
-        if preprocess:
-            image, edge_map = self.preprocess_image(
-                image,
-                apply_clahe=apply_clahe,
-                apply_sharpen=apply_sharpen,
-            )
+        item = None
+        if preprocess and self.preprocess_order == 'letterbox':
+            # Letterbox first, then filter the small model input in place
+            with timed(timer, 'preprocess'):
+                item = self.prepare_batch_item(
+                    image, apply_clahe=apply_clahe, apply_sharpen=apply_sharpen,
+                    reuse_buffers=True,
+                )
+            image = item['input']
+        elif preprocess:
+            with timed(timer, 'preprocess'):
+                image, edge_map = self.preprocess_image(
+                    image,
+                    apply_clahe=apply_clahe,
+                    apply_sharpen=apply_sharpen,
+                )
         
-        # Run detection
-        results = self.model(image, conf=self.conf_threshold, verbose=False)
+        # Run detection (down to the cache floor when the result is cached)
+        run_conf = min(conf, CACHE_CONF_FLOOR) if cache_key else conf
+        with timed(timer, 'inference'):
+            if item is not None:
+                results = self._predict(image, conf=run_conf, imgsz=self.imgsz)
+            else:
+                results = self._predict(image, conf=run_conf)
+        self._count_call()
         
         # Parse detections
-        detections = []
-        for result in results:
-            boxes = result.boxes
-            for i, box in enumerate(boxes):
-                detection = {
-                    'class_id': int(box.cls[0]),
-                    'class_name': result.names[int(box.cls[0])],
-                    'confidence': float(box.conf[0]),
-                    'bbox': box.xyxy[0].cpu().numpy().tolist(),  # [x1, y1, x2, y2]
-                    'bbox_center': box.xywh[0].cpu().numpy().tolist()  # [x_center, y_center, width, height]
-                }
-                detections.append(detection)
+        with timed(timer, 'parse'):
+            if item is None and scale == (1.0, 1.0) and cache_key is None:
+                detections = DetectionResult(raw=results[0], image=original_image)
+                for result in results:
+                    detections.extend(self._parse_result(result))
+            else:
+                # Map the boxes back from the letterboxed input and / or
+                # the reduced decode to full-resolution coordinates
+                detections = DetectionResult(image=original_image)
+                detections.image_scale = scale
+                for result in results:
+                    xyxy, scores, class_ids = self._result_arrays(result)
+                    if item is not None:
+                        xyxy = unletterbox_boxes(xyxy, item['ratio'], item['pad'], item['shape'])
+                    if scale != (1.0, 1.0):
+                        xyxy = scale_boxes(xyxy, scale)
+                    detections.extend(boxes_to_detections(xyxy, scores, class_ids, result.names))
+
+        detections.inference_calls = 1
+        if cache_key is not None:
+            self.cache.put(cache_key, detections, conf_floor=run_conf)
+            detections[:] = filter_detections(detections, conf)
         
         # Save visualization if requested
         if save_visualization:
-            output_path = Path(output_dir) / f"{Path(image_path).stem}_detected.jpg"
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Annotate image
-            annotated = results[0].plot()
-            cv2.imwrite(str(output_path), annotated)
-            print(f"Saved visualization to: {output_path}")
+            self._save_visualization(detections, image_path, output_dir)
         
         return detections
+
+    @staticmethod
+    def _save_visualization(detections: DetectionResult, image_path: str, output_dir: str) -> None:
+        """Write the annotated image to ``output_dir/<stem>_detected.jpg``."""
+        output_path = Path(output_dir) / f"{Path(image_path).stem}_detected.jpg"
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        cv2.imwrite(str(output_path), detections.plot())
+        print(f"Saved visualization to: {output_path}")
     
+    @staticmethod
+    def _result_arrays(result) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (xyxy, conf, cls) NumPy arrays from a backend result."""
+        boxes = getattr(result, 'boxes', None)
+        if boxes is not None:  # ultralytics Results (torch tensors)
+            return boxes.xyxy.cpu().numpy(), boxes.conf.cpu().numpy(), boxes.cls.cpu().numpy()
+        return result.xyxy, result.conf, result.cls  # OnnxResult
+
+    @classmethod
+    def _parse_result(cls, result) -> List[dict]:
+        """Convert one backend result object to detection dicts."""
+        xyxy, conf, class_ids = cls._result_arrays(result)
+        # bbox: [x1, y1, x2, y2], bbox_center: [x_center, y_center, width, height]
+        return boxes_to_detections(xyxy, conf, class_ids, result.names)
+
+    # ------------------------------------------------------------------
+    # Batched inference
+    # ------------------------------------------------------------------
+
+    def prepare_batch_item(
+        self,
+        image: np.ndarray,
+        preprocess: bool = True,
+        apply_clahe: bool = False,
+        apply_sharpen: bool = False,
+        reuse_buffers: bool = False,
+    ) -> dict:
+        """
+        Preprocess and letterbox one image so it can be stacked into a batch.
+
+        Safe to call from a worker thread while the model runs on the
+        previous batch. Follows :attr:`preprocess_order`.
+
+        Args:
+            image: Input image (BGR format)
+            preprocess: Whether to preprocess the image
+            apply_clahe: Whether to apply CLAHE contrast enhancement
+            apply_sharpen: Whether to apply mild sharpening
+            reuse_buffers: With the 'letterbox' order, return the input in
+                           this thread's scratch buffer instead of a copy
+                           (only when it is consumed before the next call)
+
+        Returns:
+            Dictionary with the letterboxed tensor and the geometry needed
+            to map boxes back to the original image
+        """
+        original = image
+        if preprocess and self.preprocess_order == 'full':
+            image, _ = self.preprocess_image(
+                image, apply_clahe=apply_clahe, apply_sharpen=apply_sharpen
+            )
+        boxed, ratio, pad = letterbox(image, self.imgsz)
+        if preprocess and self.preprocess_order == 'letterbox':
+            boxed = self.preprocess_letterboxed(boxed, apply_clahe, apply_sharpen)
+            if not reuse_buffers:
+                boxed = boxed.copy()
+        return {'input': boxed, 'ratio': ratio, 'pad': pad,
+                'shape': image.shape[:2], 'image': original}
+
+    def _count_call(self) -> None:
+        """Count one model call (detectors may be shared between threads)."""
+        with self._calls_lock:
+            self.inference_calls += 1
+
+    def _predict(self, inputs, **kwargs):
+        """One model call, serialized between threads for the ultralytics backend."""
+        if self._model_lock is None:
+            return self.model(inputs, verbose=False, **kwargs)
+        with self._model_lock:
+            return self.model(inputs, verbose=False, **kwargs)
+
+    def _infer_prepared(
+        self,
+        items: List[dict],
+        conf: Optional[float] = None,
+        errors: Optional[list] = None,
+    ) -> List[DetectionResult]:
+        """
+        Run the model on letterboxed items and split detections per image.
+
+        With ``errors`` (a list aligned with ``items``), an item the model
+        fails on gets its exception stored there and an empty result,
+        instead of the exception aborting the other items.
+        """
+        conf = self.conf_threshold if conf is None else conf
+        inputs = [item['input'] for item in items]
+        if len(inputs) > 1 and self._batch_supported:
+            try:
+                results = self._predict(inputs, conf=conf, imgsz=self.imgsz)
+                self._count_call()
+            except Exception as e:
+                # Static-shape exports (e.g. ONNX with batch=1) reject
+                # multi-image input — retry one call per image. If every
+                # image then succeeds alone, batching is what failed.
+                item_errors = [None] * len(items)
+                out = self._infer_prepared_sequential(items, conf, item_errors)
+                failed = [err for err in item_errors if err is not None]
+                if not failed:
+                    print(f"  Batched inference unavailable ({e}); falling back to batch size 1")
+                    self._batch_supported = False
+                if errors is None and failed:
+                    raise failed[0]
+                if errors is not None:
+                    errors[:] = item_errors
+                return out
+        else:
+            return self._infer_prepared_sequential(items, conf, errors)
+
+        out = [self._unletterbox(result, item) for result, item in zip(results, items)]
+        for detections in out:
+            detections.inference_calls = 1 / len(items)
+        return out
+
+    def _infer_prepared_sequential(
+        self,
+        items: List[dict],
+        conf: Optional[float] = None,
+        errors: Optional[list] = None,
+    ) -> List[DetectionResult]:
+        """Run the model once per letterboxed item (see :meth:`_infer_prepared` for ``errors``)."""
+        conf = self.conf_threshold if conf is None else conf
+        out = []
+        for index, item in enumerate(items):
+            try:
+                results = self._predict(item['input'], conf=conf, imgsz=self.imgsz)
+            except Exception as e:
+                if errors is None:
+                    raise
+                errors[index] = e
+                out.append(DetectionResult(image=item['image']))
+                continue
+            self._count_call()
+            detections = self._unletterbox(results[0], item)
+            detections.inference_calls = 1
+            out.append(detections)
+        return out
+
+    @classmethod
+    def _unletterbox(cls, result, item: dict) -> DetectionResult:
+        """Map one result from letterboxed to original image coordinates."""
+        xyxy, conf, class_ids = cls._result_arrays(result)
+        if len(conf) == 0:
+            return DetectionResult(image=item['image'])
+        xyxy = unletterbox_boxes(xyxy, item['ratio'], item['pad'], item['shape'])
+        return DetectionResult(
+            boxes_to_detections(xyxy, conf, class_ids, result.names),
+            image=item['image'],
+        )
+
+    def detect_batch(
+        self,
+        images: List[np.ndarray],
+        preprocess: bool = True,
+        apply_clahe: bool = False,
+        apply_sharpen: bool = False,
+    ) -> List[DetectionResult]:
+        """
+        Detect components in several already-decoded images with a single
+        model call.
+
+        Args:
+            images: List of BGR images (may have different sizes)
+            preprocess: Whether to preprocess the images
+            apply_clahe: Whether to apply CLAHE contrast enhancement
+            apply_sharpen: Whether to apply mild sharpening
+
+        Returns:
+            One list of detection dictionaries per input image, in order
+        """
+        items = [
+            self.prepare_batch_item(img, preprocess, apply_clahe, apply_sharpen)
+            for img in images
+        ]
+        return self._infer_prepared(items)
+
+    # ------------------------------------------------------------------
+    # Tiled (sliced) high-resolution inference
+    # ------------------------------------------------------------------
+
+    def detect_tiled(
+        self,
+        image_path: str,
+        tile_size: int = 1024,
+        overlap: float = 0.2,
+        batch_size: int = 4,
+        preprocess: bool = True,
+        apply_clahe: bool = False,
+        apply_sharpen: bool = False,
+        image: Optional[np.ndarray] = None,
+        include_full_view: bool = True,
+        nms_iou: float = 0.5,
+        timer: Optional[StageTimer] = None,
+        conf: Optional[float] = None,
+    ) -> DetectionResult:
+        """
+        Detect components on a large image by running overlapping tiles
+        through the model at native resolution.
+
+        Each tile is letterboxed to the model input size, so small parts
+        (0402 resistors, pads) keep their pixels instead of being
+        downscaled with the whole photo. Boxes touching an inner tile
+        border are dropped (the overlapping neighbour sees them whole), a
+        downscaled full-image pass recovers components larger than the
+        overlap, and the union is merged with class-aware NMS.
+
+        Args:
+            image_path: Path to input image
+            tile_size: Tile side in pixels (full-resolution)
+            overlap: Fraction of ``tile_size`` shared by neighbouring tiles
+            batch_size: Tiles per model call
+            preprocess: Whether to preprocess the image
+            apply_clahe: Whether to apply CLAHE contrast enhancement
+            apply_sharpen: Whether to apply mild sharpening
+            image: Optional pre-loaded BGR image (skips file I/O if provided)
+            include_full_view: Also run the whole (downscaled) image
+            nms_iou: IoU threshold of the class-aware merge
+            timer: Optional StageTimer receiving decode / preprocess /
+                   inference / parse durations (summed over tiles)
+            conf: Confidence threshold for this call (default: conf_threshold)
+
+        Returns:
+            DetectionResult in full-image coordinates; its ``tile_timings``
+            attribute lists, per tile, the window, preparation and
+            inference time (ms) and raw detection count
+        """
+        if image is None:
+            image = load_image_with_exif(str(image_path), timer=timer)
+        original_image = image
+        # With the 'letterbox' order each tile is filtered after letterboxing
+        tile_preprocess = preprocess and self.preprocess_order == 'letterbox'
+        if preprocess and not tile_preprocess:
+            with timed(timer, 'preprocess'):
+                image, _ = self.preprocess_image(
+                    image, apply_clahe=apply_clahe, apply_sharpen=apply_sharpen,
+                )
+
+        h, w = image.shape[:2]
+        windows = tile_windows(h, w, tile_size, overlap)
+        if include_full_view and len(windows) > 1:
+            windows.append((0, 0, w, h))
+
+        items, timings = [], []
+        for idx, (x1, y1, x2, y2) in enumerate(windows):
+            start = time.perf_counter()
+            item = self.prepare_batch_item(
+                image[y1:y2, x1:x2], preprocess=tile_preprocess,
+                apply_clahe=apply_clahe, apply_sharpen=apply_sharpen,
+            )
+            prepare_ms = (time.perf_counter() - start) * 1000
+            timings.append({
+                'tile': idx,
+                'window': [x1, y1, x2, y2],
+                'full_view': (x2 - x1, y2 - y1) == (w, h),
+                'prepare_ms': prepare_ms,
+            })
+            items.append(item)
+            if timer is not None:
+                timer.add('preprocess', prepare_ms)
+
+        boxes, scores, classes, names = [], [], [], {}
+        inference_calls = 0
+        batch_size = max(1, int(batch_size))
+        for b in range(0, len(items), batch_size):
+            chunk = items[b:b + batch_size]
+            start = time.perf_counter()
+            chunk_dets = self._infer_prepared(chunk, conf)
+            inference_calls += sum(dets.inference_calls for dets in chunk_dets)
+            chunk_ms = (time.perf_counter() - start) * 1000
+            per_tile_ms = chunk_ms / len(chunk)
+            if timer is not None:
+                timer.add('inference', chunk_ms)
+
+            for offset, dets in enumerate(chunk_dets):
+                record = timings[b + offset]
+                record['inference_ms'] = per_tile_ms
+                record['detections'] = len(dets)
+                x1, y1, x2, y2 = record['window']
+                for d in dets:
+                    bx1, by1, bx2, by2 = d['bbox']
+                    # Truncated by an inner tile border — a neighbour has it whole
+                    if ((bx1 <= 1 and x1 > 0) or (by1 <= 1 and y1 > 0)
+                            or (bx2 >= (x2 - x1) - 1 and x2 < w)
+                            or (by2 >= (y2 - y1) - 1 and y2 < h)):
+                        continue
+                    boxes.append([bx1 + x1, by1 + y1, bx2 + x1, by2 + y1])
+                    scores.append(d['confidence'])
+                    classes.append(d['class_id'])
+                    names[d['class_id']] = d['class_name']
+
+        detections = DetectionResult(image=original_image)
+        with timed(timer, 'parse'):
+            if boxes:
+                boxes_arr = np.asarray(boxes, dtype=np.float32)
+                scores_arr = np.asarray(scores, dtype=np.float32)
+                classes_arr = np.asarray(classes, dtype=np.int64)
+                keep = batched_nms(boxes_arr, scores_arr, classes_arr, nms_iou)
+                detections.extend(boxes_to_detections(
+                    boxes_arr[keep], scores_arr[keep], classes_arr[keep], names
+                ))
+        detections.tile_timings = timings
+        detections.inference_calls = inference_calls
+        return detections
+
+    def iter_batches(self, image_paths: List[str], batch_size: Optional[int] = None):
+        """
+        Yield ``(paths, images, detections, errors)`` chunks for a list of files.
+
+        Decoding and letterboxing of the next chunk run on a background
+        thread while the model processes the current one.  Images that
+        cannot be decoded are reported with ``image=None`` and an empty
+        detection list; images the model fails on keep their ``image`` and
+        also get an empty detection list, with the exception in ``errors``.
+
+        Args:
+            image_paths: Image files to process, in order
+            batch_size: Images per model call (defaults to ``self.batch_size``)
+        """
+        batch_size = max(1, int(batch_size or self.batch_size))
+        chunks = [image_paths[i:i + batch_size] for i in range(0, len(image_paths), batch_size)]
+
+        def _load(paths):
+            images, items, errors = [], [], []
+            for p in paths:
+                try:
+                    img = load_image_with_exif(str(p))
+                    images.append(img)
+                    items.append(self.prepare_batch_item(img))
+                    errors.append(None)
+                except Exception as e:
+                    images.append(None)
+                    errors.append(e)
+            return images, items, errors
+
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            pending = prefetcher.submit(_load, chunks[0]) if chunks else None
+            for idx, paths in enumerate(chunks):
+                images, items, errors = pending.result()
+                if idx + 1 < len(chunks):
+                    pending = prefetcher.submit(_load, chunks[idx + 1])
+                # A model error on one image only drops that image
+                item_errors = [None] * len(items)
+                dets_iter = iter(self._infer_prepared(items, errors=item_errors) if items else [])
+                errors_iter = iter(item_errors)
+                detections = []
+                for index, err in enumerate(errors):
+                    if err is not None:
+                        detections.append(DetectionResult())
+                        continue
+                    detections.append(next(dets_iter))
+                    errors[index] = next(errors_iter)
+                yield paths, images, detections, errors
+
     def batch_detect(
         self,
         image_dir: str,
         output_dir: str = "outputs/results",
-        extensions: List[str] = ['.jpg', '.jpeg', '.png', '.bmp']
+        extensions: List[str] = ['.jpg', '.jpeg', '.png', '.bmp'],
+        batch_size: Optional[int] = None,
+        workers: Optional[int] = None,
     ) -> dict:
         """
         Detect components in multiple images.
@@ -220,12 +954,20 @@ class ComponentDetector:
             image_dir: Directory containing images
             output_dir: Directory to save results
             extensions: List of valid image extensions
+            batch_size: Images per model call (defaults to ``self.batch_size``).
+                        Values above 1 enable batched inference.
+            workers: Worker processes (see ``parallel.WorkerPool``), each
+                     with its own copy of the model; values above 1
+                     replace in-process batching
             
         Returns:
             Dictionary mapping image paths to detections
+            (throughput in ``self.last_run_stats``)
         """
         image_dir = Path(image_dir)
+        start = time.perf_counter()
         all_detections = {}
+        batch_size = max(1, int(batch_size or self.batch_size))
         
         # Find all images
         image_files = []
@@ -234,19 +976,48 @@ class ComponentDetector:
             image_files.extend(image_dir.glob(f"*{ext.upper()}"))
         
         print(f"Found {len(image_files)} images to process")
-        
-        # Process each image
-        for image_path in image_files:
-            print(f"\nProcessing: {image_path.name}")
-            try:
-                detections = self.detect_components(
-                    str(image_path),
-                    output_dir=output_dir
-                )
-                all_detections[str(image_path)] = detections
-                print(f"  Detected {len(detections)} components")
-            except Exception as e:
-                print(f"  Error processing {image_path}: {e}")
+
+        if workers and workers > 1 and len(image_files) > 1:
+            kwargs = dict(self.config)
+            kwargs['intra_op_threads'] = kwargs['intra_op_threads'] or threads_per_worker(workers)
+            print(f"Worker processes: {workers} ({kwargs['intra_op_threads']} threads each)")
+            with WorkerPool(ComponentDetector, kwargs, workers,
+                            threads=kwargs['intra_op_threads']) as pool:
+                tasks = [(str(p), output_dir) for p in image_files]
+                for image_path, (ok, value) in zip(image_files, pool.imap(_detect_task, tasks)):
+                    print(f"\nProcessing: {image_path.name}")
+                    if not ok:
+                        print(f"  Error processing {image_path}: {value}")
+                        continue
+                    all_detections[str(image_path)] = value
+                    print(f"  Detected {len(value)} components")
+        elif batch_size > 1:
+            print(f"Batched inference: {batch_size} images per model call")
+            for paths, images, batch_dets, errors in self.iter_batches(image_files, batch_size):
+                for image_path, image, detections, err in zip(paths, images, batch_dets, errors):
+                    print(f"\nProcessing: {image_path.name}")
+                    if err is not None:
+                        print(f"  Error processing {image_path}: {err}")
+                        continue
+                    all_detections[str(image_path)] = detections
+                    print(f"  Detected {len(detections)} components")
+                    output_path = Path(output_dir) / f"{image_path.stem}_detected.jpg"
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                    cv2.imwrite(str(output_path), detections.plot())
+                    print(f"Saved visualization to: {output_path}")
+        else:
+            # Process each image
+            for image_path in image_files:
+                print(f"\nProcessing: {image_path.name}")
+                try:
+                    detections = self.detect_components(
+                        str(image_path),
+                        output_dir=output_dir
+                    )
+                    all_detections[str(image_path)] = detections
+                    print(f"  Detected {len(detections)} components")
+                except Exception as e:
+                    print(f"  Error processing {image_path}: {e}")
         
         # Save results to JSON
         results_file = Path(output_dir) / "detections.json"
@@ -254,16 +1025,45 @@ class ComponentDetector:
         with open(results_file, 'w') as f:
             json.dump(all_detections, f, indent=2)
         print(f"\nSaved detection results to: {results_file}")
-        
+
+        seconds = time.perf_counter() - start
+        self.last_run_stats = {
+            'images': len(image_files),
+            'failed': len(image_files) - len(all_detections),
+            'workers': max(1, int(workers or 1)),
+            'seconds': round(seconds, 3),
+            'images_per_sec': round(len(image_files) / seconds, 3) if seconds > 0 else None,
+        }
         return all_detections
 
 
+def _detect_task(detector: ComponentDetector, image_path: str, output_dir: str) -> List[dict]:
+    """Worker-process task of batch_detect(workers=N)."""
+    return list(detector.detect_components(image_path, output_dir=output_dir))
+
+
+def limit_torch_threads(n_threads: int) -> None:
+    """
+    Cap the intra-op thread count of the torch runtime, if present.
+
+    The setting is process-wide (every model and session in the process),
+    so call it once at startup rather than per detector.
+    """
+    try:
+        import torch
+        torch.set_num_threads(n_threads)
+    except Exception:
+        pass
+
+
 class DualModelDetector:
     """
     Dual-model detector that combines smd_comp and ic_detect_best
     for enhanced IC detection with visual sub-type classification.
 
-    Cross-referencing rules (IoU threshold = 0.5):
+    Cross-referencing rules (IoU threshold = 0.5 by default):
+    - Each ic_detect box confirms at most one comp_detect IC (one-to-one
+      matching, greedy-by-IoU or Hungarian)
     - IC in comp_detect + match in ic_detect  → confirmed IC, enriched with sub-type
     - IC in ic_detect without match           → added as IC (missed by comp_detect)
     - IC in comp_detect without ic_detect match → kept, flagged as "unconfirmed"
@@ -284,7 +1084,14 @@ class DualModelDetector:
         comp_model_path: str,
         ic_model_path: Optional[str] = None,
         comp_conf: float = 0.25,
-        ic_conf: float = 0.25
+        ic_conf: float = 0.25,
+        intra_op_threads: Optional[int] = None,
+        iou_threshold: Optional[float] = None,
+        matching: str = 'greedy',
+        backend: str = 'ultralytics',
+        registry: Optional[ModelRegistry] = None,
+        preprocess_order: str = 'full',
+        cache: Optional[InferenceCache] = None,
     ):
         """
         Args:
@@ -292,9 +1099,69 @@ class DualModelDetector:
             ic_model_path:   Path to ic_detect_best model (.onnx or .pt), optional
             comp_conf:       Confidence threshold for comp_detect
             ic_conf:         Confidence threshold for ic_detect
+            intra_op_threads: Threads each onnxruntime session may use for a
+                             single forward pass while both run concurrently.
+                             Defaults to half the available cores.
+            iou_threshold:   Per-instance override of IOU_THRESHOLD
+            matching:        IC matching method, 'greedy' (highest IoU
+                             pairs first) or 'hungarian' (max total IoU)
+            backend:         'ultralytics' or 'onnxruntime' (see ComponentDetector)
+            registry:        Model cache (default: the process-wide registry)
+            preprocess_order: 'full' (preprocess once at full resolution,
+                             shared by both models) or 'letterbox' (each
+                             model filters its own letterboxed input)
+            cache:           Inference cache of raw per-model detections, so
+                             re-running an image with other confidence
+                             thresholds or class filters skips the models
+                             (None = always run them)
         """
-        self.comp_detector = ComponentDetector(comp_model_path, comp_conf)
-        self.ic_detector = ComponentDetector(ic_model_path, ic_conf) if ic_model_path else None
+        if matching not in MATCHING_METHODS:
+            raise ValueError(f"matching must be one of {MATCHING_METHODS}, got '{matching}'")
+        if iou_threshold is not None:
+            self.IOU_THRESHOLD = iou_threshold
+        self.matching = matching
+        self.last_tile_timings = None
+        self.last_timings = None
+        self.last_cache_hits = None
+        self.cache = cache
+
+        # ic_detect runs on a worker thread while smd_comp runs on the
+        # caller's; each onnxruntime session gets a bounded share of the cores
+        # so the two forward passes do not oversubscribe the CPU (torch
+        # threads are process-wide, see limit_torch_threads).
+        n_models = 2 if ic_model_path else 1
+        self.intra_op_threads = intra_op_threads or max(1, (os.cpu_count() or 1) // n_models)
+        self.backend = backend
+
+        self.comp_detector = ComponentDetector(
+            comp_model_path, comp_conf,
+            backend=backend, intra_op_threads=self.intra_op_threads,
+            registry=registry, preprocess_order=preprocess_order,
+        )
+        self.ic_detector = ComponentDetector(
+            ic_model_path, ic_conf,
+            backend=backend, intra_op_threads=self.intra_op_threads,
+            registry=registry, preprocess_order=preprocess_order,
+        ) if ic_model_path else None
+
+        # Worker thread running ic_detect, started on first use and shut
+        # down by close()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def close(self) -> None:
+        """Stop the ic_detect worker thread (restarted if detect() is called again)."""
+        executor, self._executor = getattr(self, '_executor', None), None
+        if executor is not None:
+            executor.shutdown(wait=False)
 
     # ------------------------------------------------------------------
     # IoU helpers
@@ -329,10 +1196,19 @@ class DualModelDetector:
         class_filter: Optional[List[str]] = None,
         apply_clahe: bool = False,
         apply_sharpen: bool = False,
+        image: Optional[np.ndarray] = None,
+        tile_size: Optional[int] = None,
+        tile_overlap: float = 0.2,
+        tile_batch_size: int = 4,
+        timer: Optional[StageTimer] = None,
+        image_hash: Optional[str] = None,
     ) -> List[dict]:
         """
         Run dual-model inference and return a unified detection list.
 
+        The image is decoded and preprocessed once; smd_comp and ic_detect
+        then run concurrently on the same preprocessed buffer.
+
         Each detection dict contains:
             class_name        (str)  – component type from COMP_DETECT_CLASSES
             ic_subtype        (str|None)  – 'four_side', 'two_side', 'without_side' or None
@@ -349,29 +1225,123 @@ class DualModelDetector:
                            If None or empty, all 13 classes are returned.
             apply_clahe:   Whether to apply CLAHE contrast enhancement
             apply_sharpen: Whether to apply mild sharpening
-        """
-        # --- 1. comp_detect (always run) ---
-        comp_dets = self.comp_detector.detect_components(
-            image_path, save_visualization=False,
-            apply_clahe=apply_clahe, apply_sharpen=apply_sharpen,
-        )
+            image:         Optional pre-loaded BGR image (skips file I/O if provided)
+            tile_size:     Enable tiled high-resolution inference with tiles of
+                           this size (see ComponentDetector.detect_tiled)
+            tile_overlap:  Fraction of overlap between neighbouring tiles
+            tile_batch_size: Tiles per model call
+            timer:         Optional StageTimer; a fresh one is used otherwise
+            image_hash:    Cache identity of the image (e.g. hash_file of the
+                           upload ``image`` was decoded from); hashed from the
+                           pixels / file when omitted
 
-        # --- 2. ic_detect (optional) ---
-        ic_dets: List[dict] = []
+        Per-tile timings of the last tiled run are kept in
+        ``self.last_tile_timings`` ({'smd_comp': [...], 'ic_detect': [...]}),
+        the per-stage durations of the last call in ``self.last_timings``
+        (ic_detect stages are prefixed ``ic_``; they overlap smd_comp's),
+        and which models were served from the inference cache in
+        ``self.last_cache_hits`` ({'smd_comp': bool, 'ic_detect': bool}).
+        """
+        timer = timer if timer is not None else StageTimer()
+        detectors = {'smd_comp': self.comp_detector}
         if self.ic_detector is not None:
-            ic_dets = self.ic_detector.detect_components(
-                image_path, save_visualization=False,
-                apply_clahe=apply_clahe, apply_sharpen=apply_sharpen,
-            )
+            detectors['ic_detect'] = self.ic_detector
+
+        # --- 0. Cached raw detections (per model) ---
+        raw: dict = {}
+        cache_keys: dict = {}
+        if self.cache is not None:
+            with timer.stage('cache_lookup'):
+                if image_hash is None:
+                    image_hash = hash_array(image) if image is not None else hash_file(str(image_path))
+                if tile_size:
+                    flags = dict(mode='tiled', tile_size=tile_size, tile_overlap=tile_overlap)
+                else:
+                    flags = dict(mode='single', decode_reduction=1)
+                for name, detector in detectors.items():
+                    cache_keys[name] = detector.cache_key(
+                        image_hash, preprocess=True, apply_clahe=apply_clahe,
+                        apply_sharpen=apply_sharpen, **flags,
+                    )
+                    cached = self.cache.get(cache_keys[name], min_conf=detector.conf_threshold)
+                    if cached is not None:
+                        raw[name] = cached
+        self.last_cache_hits = {name: name in raw for name in detectors}
+        pending = [name for name in detectors if name not in raw]
+
+        if pending:
+            # --- 1. Shared decode + preprocessing ---
+            if image is None:
+                image = load_image_with_exif(str(image_path), timer=timer)
+            # With the 'letterbox' order each detector filters its own
+            # (model-input sized) letterbox instead
+            per_model = self.comp_detector.preprocess_order == 'letterbox'
+            if per_model:
+                preprocessed = image
+            else:
+                with timer.stage('preprocess'):
+                    preprocessed, _ = self.comp_detector.preprocess_image(
+                        image, apply_clahe=apply_clahe, apply_sharpen=apply_sharpen,
+                    )
+
+            def _run(detector: ComponentDetector, run_timer: StageTimer) -> List[dict]:
+                # Cached results are stored down to the cache's confidence floor
+                conf = detector.conf_threshold
+                if self.cache is not None:
+                    conf = min(conf, CACHE_CONF_FLOOR)
+                if tile_size:
+                    return detector.detect_tiled(
+                        image_path, tile_size=tile_size, overlap=tile_overlap,
+                        batch_size=tile_batch_size, preprocess=per_model,
+                        apply_clahe=apply_clahe, apply_sharpen=apply_sharpen,
+                        image=preprocessed, timer=run_timer, conf=conf,
+                    )
+                return detector.detect_components(
+                    image_path, preprocess=per_model, save_visualization=False,
+                    apply_clahe=apply_clahe, apply_sharpen=apply_sharpen,
+                    image=preprocessed, timer=run_timer, conf=conf,
+                )
+
+            # --- 2. comp_detect + ic_detect (optional), concurrently ---
+            ic_timer = StageTimer()
+            ic_future = None
+            if 'ic_detect' in pending:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ic_detect")
+                ic_future = self._executor.submit(_run, self.ic_detector, ic_timer)
+            if 'smd_comp' in pending:
+                raw['smd_comp'] = _run(self.comp_detector, timer)
+            if ic_future is not None:
+                raw['ic_detect'] = ic_future.result()
+                timer.merge(ic_timer, prefix='ic_')
+
+            if self.cache is not None:
+                for name in pending:
+                    conf_floor = min(detectors[name].conf_threshold, CACHE_CONF_FLOOR)
+                    self.cache.put(cache_keys[name], raw[name], conf_floor=conf_floor)
+
+        self.last_tile_timings = {
+            'smd_comp': getattr(raw.get('smd_comp'), 'tile_timings', None),
+            'ic_detect': getattr(raw.get('ic_detect'), 'tile_timings', None),
+        } if tile_size else None
+
+        comp_dets = raw['smd_comp']
+        ic_dets = raw.get('ic_detect', [])
+        if self.cache is not None:
+            comp_dets = filter_detections(comp_dets, self.comp_detector.conf_threshold)
+            if self.ic_detector is not None:
+                ic_dets = filter_detections(ic_dets, self.ic_detector.conf_threshold)
 
         # --- 3. Cross-reference ICs ---
-        unified = self._cross_reference(comp_dets, ic_dets)
+        with timer.stage('cross_reference'):
+            unified = self._cross_reference(comp_dets, ic_dets)
 
-        # --- 4. Apply class filter ---
-        if class_filter:
-            filter_set = {c.lower() for c in class_filter}
-            unified = [d for d in unified if d['class_name'].lower() in filter_set]
+            # --- 4. Apply class filter ---
+            if class_filter:
+                filter_set = {c.lower() for c in class_filter}
+                unified = [d for d in unified if d['class_name'].lower() in filter_set]
 
+        self.last_timings = timer.as_dict()
         return unified
 
     # ------------------------------------------------------------------
@@ -384,11 +1354,21 @@ class DualModelDetector:
         ic_dets: List[dict]
     ) -> List[dict]:
         """Merge comp_detect and ic_detect detections."""
-        matched_ic_indices: set = set()  # indices into ic_dets already consumed
+        # One-to-one IC matching on a vectorized IoU matrix
+        ic_rows = [i for i, cd in enumerate(comp_dets) if cd['class_name'].upper() == 'IC']
+        ic_match: dict = {}  # index into comp_dets -> index into ic_dets
+        if ic_rows and ic_dets:
+            iou = iou_matrix(
+                [comp_dets[i]['bbox'] for i in ic_rows],
+                [icd['bbox'] for icd in ic_dets],
+            )
+            for r, c in match_boxes(iou, self.IOU_THRESHOLD, self.matching):
+                ic_match[ic_rows[r]] = c
+        matched_ic_indices = set(ic_match.values())  # indices into ic_dets already consumed
 
         result: List[dict] = []
 
-        for cd in comp_dets:
+        for i, cd in enumerate(comp_dets):
             entry = {
                 'class_id':      cd['class_id'],
                 'class_name':    cd['class_name'],
@@ -400,26 +1380,14 @@ class DualModelDetector:
                 'bbox_center':   cd['bbox_center'],
             }
 
-            if cd['class_name'].upper() == 'IC' and ic_dets:
-                best_iou = 0.0
-                best_idx = -1
-                for idx, icd in enumerate(ic_dets):
-                    iou = self._compute_iou(cd['bbox'], icd['bbox'])
-                    if iou > best_iou:
-                        best_iou = iou
-                        best_idx = idx
-
-                if best_iou >= self.IOU_THRESHOLD:
-                    matched_ic = ic_dets[best_idx]
-                    matched_ic_indices.add(best_idx)
-                    entry['ic_subtype']    = matched_ic['class_name']
-                    entry['ic_confidence'] = matched_ic['confidence']
-                    entry['ic_confirmed']  = True
-                    # Keep the best confidence from either model
-                    entry['confidence']    = max(cd['confidence'], matched_ic['confidence'])
-                else:
-                    # IC detected by comp_detect but not confirmed by ic_detect
-                    entry['ic_confirmed'] = False
+            # ICs without a match stay unconfirmed (ic_confirmed = False)
+            if i in ic_match:
+                matched_ic = ic_dets[ic_match[i]]
+                entry['ic_subtype']    = matched_ic['class_name']
+                entry['ic_confidence'] = matched_ic['confidence']
+                entry['ic_confirmed']  = True
+                # Keep the best confidence from either model
+                entry['confidence']    = max(cd['confidence'], matched_ic['confidence'])
 
             result.append(entry)
 
@@ -450,8 +1418,7 @@ def main():
     parser.add_argument(
         "--model",
         type=str,
-        required=True,
-        help="Path to trained YOLO model"
+        help="Path to trained YOLO model (required unless --list-models)"
     )
     parser.add_argument(
         "--image",
@@ -480,27 +1447,125 @@ def main():
         action="store_true",
         help="Disable image preprocessing"
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Images per model call for --image-dir (default: 1, no batching)"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="ultralytics",
+        help="Inference backend: ultralytics (default) or onnxruntime (.onnx models only)"
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        help="Intra-op threads: per session for onnxruntime, process-wide torch "
+             "threads for ultralytics (default: runtime default)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for --image-dir, each loading its own model (default: 1)"
+    )
+    parser.add_argument(
+        "--tile-size",
+        type=int,
+        help="Enable tiled high-resolution inference with tiles of this size (pixels)"
+    )
+    parser.add_argument(
+        "--tile-overlap",
+        type=float,
+        default=0.2,
+        help="Overlap between neighbouring tiles, as a fraction of --tile-size (default: 0.2)"
+    )
+    parser.add_argument(
+        "--preprocess-order",
+        choices=PREPROCESS_ORDERS,
+        default="full",
+        help="Preprocess the full-resolution image (full, default) or the letterboxed model input (letterbox)"
+    )
+    parser.add_argument(
+        "--decode-reduction",
+        type=int,
+        choices=sorted(DECODE_REDUCTIONS),
+        default=1,
+        help="Decode --image at 1/N resolution for faster low-res inference (default: 1)"
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse raw detections cached in outputs/cache/inference for --image "
+             "(re-runs with another --conf skip the model)"
+    )
+    parser.add_argument(
+        "--list-models",
+        action="store_true",
+        help="List available models (incl. INT8 variants) and exit"
+    )
     
     args = parser.parse_args()
     
+    if args.list_models:
+        print_models(".")
+        return
+    
+    if not args.model:
+        parser.error("--model is required")
+    
     if not args.image and not args.image_dir:
         parser.error("Either --image or --image-dir must be specified")
     
+    if args.threads and args.backend == 'ultralytics':
+        limit_torch_threads(args.threads)
+
     # Initialize detector
-    detector = ComponentDetector(args.model, conf_threshold=args.conf)
+    detector = ComponentDetector(
+        args.model,
+        conf_threshold=args.conf,
+        batch_size=args.batch_size,
+        backend=args.backend,
+        intra_op_threads=args.threads,
+        preprocess_order=args.preprocess_order,
+        cache=get_inference_cache() if args.cache else None,
+    )
     
     # Process images
-    if args.image:
+    if args.image and args.tile_size:
+        detections = detector.detect_tiled(
+            args.image,
+            tile_size=args.tile_size,
+            overlap=args.tile_overlap,
+            batch_size=max(1, args.batch_size),
+            preprocess=not args.no_preprocess,
+        )
+        for t in detections.tile_timings:
+            print(f"  tile {t['tile']:3d} {t['window']}: prepare {t['prepare_ms']:.1f} ms, "
+                  f"inference {t['inference_ms']:.1f} ms, {t['detections']} raw detections")
+        output_path = Path(args.output_dir) / f"{Path(args.image).stem}_detected.jpg"
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        cv2.imwrite(str(output_path), detections.plot())
+        print(f"Saved visualization to: {output_path}")
+        print(f"\nDetected {len(detections)} components:")
+        for det in detections:
+            print(f"  - {det['class_name']}: {det['confidence']:.2f}")
+    elif args.image:
         detections = detector.detect_components(
             args.image,
             preprocess=not args.no_preprocess,
-            output_dir=args.output_dir
+            output_dir=args.output_dir,
+            decode_reduction=args.decode_reduction,
         )
         print(f"\nDetected {len(detections)} components:")
         for det in detections:
             print(f"  - {det['class_name']}: {det['confidence']:.2f}")
     else:
-        detector.batch_detect(args.image_dir, args.output_dir)
+        detector.batch_detect(args.image_dir, args.output_dir, workers=args.workers)
+        stats = detector.last_run_stats
+        print_throughput(stats['images'], stats['seconds'], stats['workers'], stats['failed'])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Image Geometry Helpers
+Letterboxing to the model input size, mapping boxes back to the original
+image, EXIF orientation and reduced-decode scaling, tiling of large
+images, and a lightweight OpenCV renderer for detection results.
+"""
+
+import cv2
+import numpy as np
+from typing import List, Tuple
+
+
+def letterbox(
+    image: np.ndarray,
+    new_size: int = 640,
+    color: Tuple[int, int, int] = (114, 114, 114),
+) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """
+    Resize an image to fit a square ``new_size`` canvas, keeping its aspect
+    ratio and padding the borders (same layout as the YOLO letterbox).
+
+    Args:
+        image: Input image (BGR format)
+        new_size: Side of the square model input, in pixels
+        color: Padding colour
+
+    Returns:
+        Tuple of (letterboxed_image, ratio, (pad_x, pad_y))
+    """
+    h, w = image.shape[:2]
+    ratio = min(new_size / h, new_size / w)
+    new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+
+    if (new_w, new_h) != (w, h):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    pad_x = (new_size - new_w) / 2
+    pad_y = (new_size - new_h) / 2
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    boxed = cv2.copyMakeBorder(
+        image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=color
+    )
+    return boxed, ratio, (float(left), float(top))
+
+
+def unletterbox_boxes(
+    boxes: np.ndarray,
+    ratio: float,
+    pad: Tuple[float, float],
+    orig_shape: Tuple[int, int],
+) -> np.ndarray:
+    """
+    Map [x1, y1, x2, y2] boxes from letterboxed coordinates back to the
+    original image and clip them to its borders.
+
+    Args:
+        boxes: Array of shape (N, 4) in letterboxed coordinates
+        ratio: Resize ratio returned by :func:`letterbox`
+        pad: (pad_x, pad_y) returned by :func:`letterbox`
+        orig_shape: (height, width) of the original image
+
+    Returns:
+        Array of shape (N, 4) in original image coordinates
+    """
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4).copy()
+    boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad[0]) / ratio
+    boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad[1]) / ratio
+    h, w = orig_shape[:2]
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h)
+    return boxes
+
+
+def apply_exif_orientation(image: np.ndarray, orientation: int) -> np.ndarray:
+    """
+    Rotate / flip a decoded image according to its EXIF orientation tag
+    (same result as ``PIL.ImageOps.exif_transpose``).
+
+    Args:
+        image: Image exactly as stored in the file
+        orientation: EXIF orientation value (1-8; anything else is ignored)
+
+    Returns:
+        Image in its visual orientation (``image`` itself for orientation 1)
+    """
+    if orientation == 2:
+        return cv2.flip(image, 1)
+    if orientation == 3:
+        return cv2.rotate(image, cv2.ROTATE_180)
+    if orientation == 4:
+        return cv2.flip(image, 0)
+    if orientation == 5:
+        return cv2.transpose(image)
+    if orientation == 6:
+        return cv2.rotate(image, cv2.ROTATE_90_CLOCKWISE)
+    if orientation == 7:
+        return cv2.flip(cv2.transpose(image), -1)
+    if orientation == 8:
+        return cv2.rotate(image, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    return image
+
+
+def scale_boxes(boxes: np.ndarray, scale: Tuple[float, float]) -> np.ndarray:
+    """
+    Scale [x1, y1, x2, y2] boxes by per-axis factors, e.g. from a reduced
+    decode back to full-resolution coordinates.
+
+    Args:
+        boxes: Array of shape (N, 4)
+        scale: (scale_x, scale_y)
+
+    Returns:
+        Scaled copy of the boxes, shape (N, 4)
+    """
+    sx, sy = scale
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    return boxes * np.array([sx, sy, sx, sy], dtype=np.float32)
+
+
+def boxes_to_detections(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    class_ids: np.ndarray,
+    names: dict,
+) -> List[dict]:
+    """
+    Build detection dictionaries from parallel box / score / class arrays.
+
+    Args:
+        boxes: Array of shape (N, 4), [x1, y1, x2, y2]
+        scores: Array of shape (N,)
+        class_ids: Array of shape (N,)
+        names: Mapping of class id to class name
+
+    Returns:
+        List of detection dictionaries
+    """
+    detections = []
+    for box, score, cls in zip(boxes.tolist(), scores.tolist(), class_ids.tolist()):
+        cls = int(cls)
+        x1, y1, x2, y2 = box
+        detections.append({
+            'class_id': cls,
+            'class_name': names[cls],
+            'confidence': float(score),
+            'bbox': [x1, y1, x2, y2],
+            'bbox_center': [(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1],
+        })
+    return detections
+
+
+def draw_detections(image: np.ndarray, detections: List[dict]) -> np.ndarray:
+    """
+    Draw bounding boxes and labels on a copy of an image.
+
+    Args:
+        image: Source image (BGR format)
+        detections: List of detection dictionaries
+
+    Returns:
+        Annotated copy of the image
+    """
+    annotated = image.copy()
+    thickness = max(2, int(round(sum(annotated.shape[:2]) / 1000)))
+    for det in detections:
+        x1, y1, x2, y2 = map(int, det['bbox'])
+        # Stable per-class colour derived from the class name
+        seed = sum(ord(c) for c in det['class_name'])
+        color = (seed * 67 % 256, seed * 131 % 256, seed * 199 % 256)
+        cv2.rectangle(annotated, (x1, y1), (x2, y2), color, thickness)
+        label = f"{det['class_name']} {det['confidence']:.2f}"
+        cv2.putText(annotated, label, (x1, max(0, y1 - 5)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5 * thickness / 2, color, thickness)
+    return annotated
+
+
+def tile_windows(
+    height: int,
+    width: int,
+    tile_size: int = 1024,
+    overlap: float = 0.2,
+) -> List[Tuple[int, int, int, int]]:
+    """
+    Split an image into overlapping square tiles covering every pixel.
+
+    The last row / column of tiles is aligned with the image border, so
+    every tile is ``tile_size`` wide unless the image itself is smaller.
+
+    Args:
+        height: Image height in pixels
+        width: Image width in pixels
+        tile_size: Tile side in pixels
+        overlap: Fraction of ``tile_size`` shared by neighbouring tiles
+
+    Returns:
+        List of (x1, y1, x2, y2) windows
+    """
+    if not 0 <= overlap < 1:
+        raise ValueError(f"overlap must be in [0, 1), got {overlap}")
+    step = max(1, int(tile_size * (1 - overlap)))
+
+    def _starts(length: int) -> List[int]:
+        if length <= tile_size:
+            return [0]
+        starts = list(range(0, length - tile_size, step))
+        starts.append(length - tile_size)
+        return starts
+
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in _starts(height)
+        for x in _starts(width)
+    ]
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Inference Cache
+On-disk cache of raw detections keyed by (image content hash, model file
+hash, preprocessing / inference flags). Entries are stored at a low
+confidence floor, so re-running the same image with a different
+confidence threshold or class filter only filters the cached boxes
+instead of running the model again. Least recently used entries are
+evicted once the cache exceeds its size budget.
+"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from imaging import boxes_to_detections
+except ImportError:  # imported as part of the ``src`` package
+    from .imaging import boxes_to_detections
+
+
+# Detections are cached down to this confidence, so any threshold at or
+# above it (the app's sliders start at 0.1) is served from the cache
+CACHE_CONF_FLOOR = 0.1
+
+DEFAULT_CACHE_DIR = os.environ.get("NUTS_INFERENCE_CACHE_DIR", "outputs/cache/inference")
+
+# Default disk budget, in megabytes
+DEFAULT_MAX_MB = 256
+
+_CHUNK = 1024 * 1024
+
+
+def hash_file(path: str) -> str:
+    """
+    Content hash of a file (full SHA-256 hex digest, hardware accelerated on
+    current CPUs). The content store keys uploads by the same digest, so a
+    stored upload's hash can be passed straight in as a cache ``image_hash``.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_array(image: np.ndarray) -> str:
+    """Content hash of a decoded image, including its shape and dtype (hex)."""
+    digest = hashlib.sha256()
+    digest.update(f"{image.shape}{image.dtype}".encode())
+    digest.update(np.ascontiguousarray(image).data)
+    return digest.hexdigest()[:32]
+
+
+_model_hashes: Dict[Tuple[str, int, int], str] = {}
+_model_hashes_lock = threading.Lock()
+
+
+def hash_model(model_path: str) -> str:
+    """Content hash of a model file, memoized by (path, mtime, size)."""
+    path = Path(model_path).resolve()
+    st = path.stat()
+    key = (str(path), st.st_mtime_ns, st.st_size)
+    with _model_hashes_lock:
+        if key in _model_hashes:
+            return _model_hashes[key]
+    digest = hash_file(str(path))
+    with _model_hashes_lock:
+        _model_hashes[key] = digest
+    return digest
+
+
+def filter_detections(
+    detections: List[dict],
+    conf: float,
+    class_filter: Optional[List[str]] = None,
+) -> List[dict]:
+    """
+    Keep detections at or above ``conf`` (and in ``class_filter`` if given).
+
+    Valid on cached results because NMS only ever suppresses a box in
+    favour of a higher-scoring one: thresholding after NMS keeps exactly
+    the boxes that thresholding before NMS would have kept.
+    """
+    wanted = set(class_filter) if class_filter else None
+    return [
+        d for d in detections
+        if d['confidence'] >= conf and (wanted is None or d['class_name'] in wanted)
+    ]
+
+
+class InferenceCache:
+    """
+    Size-bounded LRU cache of raw detections, one ``.npz`` file per entry.
+
+    Recency is the file modification time (touched on every hit), so the
+    LRU order survives restarts and is shared by processes using the same
+    directory.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_mb: float = DEFAULT_MAX_MB):
+        """
+        Args:
+            cache_dir: Directory holding the entries (created if needed)
+            max_mb: Disk budget in megabytes; least recently used entries
+                    are deleted once the total exceeds it
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._scan()
+
+    def _scan(self) -> None:
+        """Index the existing entries, least recently used first."""
+        if not self.cache_dir.exists():
+            return
+        entries = []
+        for path in self.cache_dir.glob("*/*.npz"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, path.stem, st.st_size))
+        for _, key, size in sorted(entries):
+            self._sizes[key] = size
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.npz"
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def make_key(image_hash: str, model_path: str, **flags) -> str:
+        """
+        Build the cache key of one (image, model, flags) combination.
+
+        Args:
+            image_hash: :func:`hash_file` or :func:`hash_array` of the source image
+            model_path: Model file (its content hash is part of the key)
+            **flags: Everything else that changes the raw detections
+                     (backend, input size, preprocessing, tiling, ...)
+
+        Returns:
+            Hex key
+        """
+        payload = json.dumps(
+            {'image': image_hash, 'model': hash_model(model_path), **flags},
+            sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def get(self, key: str, min_conf: float = CACHE_CONF_FLOOR) -> Optional[List[dict]]:
+        """
+        Return the cached raw detections of ``key``, or None on a miss.
+
+        Entries stored at a confidence floor above ``min_conf`` cannot
+        serve the request and count as misses.
+        """
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                conf_floor = float(data['conf_floor'])
+                # The floor is stored as float32
+                if conf_floor > min_conf + 1e-6:
+                    raise LookupError(key)
+                names = {int(k): v for k, v in json.loads(str(data['names'])).items()}
+                detections = boxes_to_detections(data['xyxy'], data['conf'], data['cls'], names)
+            os.utime(path)
+        except (OSError, KeyError, ValueError, LookupError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            if key in self._sizes:
+                self._sizes.move_to_end(key)
+        return detections
+
+    def put(self, key: str, detections: List[dict], conf_floor: float = CACHE_CONF_FLOOR) -> None:
+        """
+        Store raw detections for ``key``.
+
+        Args:
+            key: Key from :meth:`make_key`
+            detections: Detection dictionaries, thresholded at ``conf_floor``
+            conf_floor: Confidence the detections were produced with
+        """
+        xyxy = np.asarray([d['bbox'] for d in detections], dtype=np.float32).reshape(-1, 4)
+        conf = np.asarray([d['confidence'] for d in detections], dtype=np.float32)
+        cls = np.asarray([d['class_id'] for d in detections], dtype=np.int32)
+        names = {int(d['class_id']): d['class_name'] for d in detections}
+
+        buffer = io.BytesIO()
+        np.savez(buffer, xyxy=xyxy, conf=conf, cls=cls,
+                 names=np.array(json.dumps(names)), conf_floor=np.float32(conf_floor))
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so readers never see a partial entry
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(buffer.getvalue())
+        os.replace(tmp, path)
+
+        with self._lock:
+            self._sizes[key] = len(buffer.getvalue())
+            self._sizes.move_to_end(key)
+            self._evict_over_budget()
+
+    def _evict_over_budget(self) -> None:
+        """Delete least recently used entries until under budget (lock held)."""
+        total = sum(self._sizes.values())
+        while total > self.max_bytes and len(self._sizes) > 1:
+            key, size = self._sizes.popitem(last=False)
+            total -= size
+            self.evictions += 1
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        with self._lock:
+            for key in list(self._sizes):
+                try:
+                    self._path(key).unlink()
+                except OSError:
+                    pass
+            self._sizes.clear()
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def stats(self) -> dict:
+        """Return hit / miss / eviction counters and the cache size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._sizes),
+                'size_mb': round(sum(self._sizes.values()) / (1024 * 1024), 2),
+                'max_mb': round(self.max_bytes / (1024 * 1024), 1),
+                'cache_dir': str(self.cache_dir),
+            }
+
+
+_cache: Optional[InferenceCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_inference_cache() -> InferenceCache:
+    """Return the process-wide inference cache, creating it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = InferenceCache()
+        return _cache
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Model Registry
+Process-wide cache of loaded detection models, keyed by (path, mtime,
+backend), with a warm-up inference at load time and LRU eviction under a
+memory cap — so the weights are read from disk once, not on every
+detector construction.
+"""
+
+import json
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+try:
+    from onnx_backend import OnnxYoloModel, BACKENDS
+except ImportError:  # imported as part of the ``src`` package
+    from .onnx_backend import OnnxYoloModel, BACKENDS
+
+
+# Default memory budget for cached models, in megabytes
+DEFAULT_MAX_MB = 2048
+
+# Loaded models take more memory than their weights file (runtime buffers,
+# fused layers, graph optimizations); the estimate is file size x factor.
+MEMORY_FACTOR = 3
+
+
+class _Entry:
+    """A cached model plus the bookkeeping the registry needs."""
+
+    def __init__(self, key: tuple):
+        self.key = key
+        self.model = None
+        self.size_bytes = 0
+        self.load_ms = 0.0
+        self.warmup_ms = 0.0
+        self.hits = 0
+        # Held while loading so concurrent callers wait for one load
+        # instead of reading the same weights twice.
+        self.lock = threading.Lock()
+        # The ultralytics predictor keeps per-call state and must not run
+        # from several threads at once; every detector sharing this model
+        # takes this lock around its calls. ONNX Runtime sessions need none.
+        self.predict_lock = threading.Lock() if key[2] == 'ultralytics' else None
+
+
+class ModelRegistry:
+    """
+    Cache of loaded models shared by every detector in the process.
+
+    A model is identified by its resolved path, the file's modification
+    time and the backend (plus the session thread counts for the
+    onnxruntime backend, which are fixed at session creation). Replacing
+    the weights file on disk therefore loads the new model on next use.
+    """
+
+    def __init__(self, max_mb: float = DEFAULT_MAX_MB, warmup: bool = True):
+        """
+        Args:
+            max_mb: Memory budget in megabytes; least recently used models
+                    are evicted once the estimated total exceeds it
+            warmup: Run one inference on a blank image right after loading
+        """
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.warmup = warmup
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _key(
+        model_path: str,
+        backend: str,
+        intra_op_threads: Optional[int],
+        inter_op_threads: Optional[int],
+    ) -> Tuple[tuple, int]:
+        """Return (cache key, file size in bytes) for a model."""
+        path = Path(model_path)
+        if path.exists():
+            stat = path.stat()
+            ident, mtime, size = str(path.resolve()), stat.st_mtime_ns, stat.st_size
+        else:
+            # e.g. an ultralytics hub name such as "yolov8n.pt"
+            ident, mtime, size = str(model_path), None, 0
+        threads = (intra_op_threads, inter_op_threads) if backend == 'onnxruntime' else None
+        return (ident, mtime, backend, threads), size
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _load(
+        model_path: str,
+        backend: str,
+        intra_op_threads: Optional[int],
+        inter_op_threads: Optional[int],
+    ):
+        """Build a model object for the given backend."""
+        if backend == 'onnxruntime':
+            return OnnxYoloModel(
+                model_path,
+                intra_op_threads=intra_op_threads,
+                inter_op_threads=inter_op_threads,
+            )
+        from ultralytics import YOLO
+        return YOLO(model_path)
+
+    @staticmethod
+    def _warm_up(model, imgsz: int) -> None:
+        """Run one inference on a blank image so the first real call is not slow."""
+        blank = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+        try:
+            model(blank, conf=0.25, verbose=False)
+        except Exception as e:
+            print(f"Warning: model warm-up failed: {e}")
+
+    def get(
+        self,
+        model_path: str,
+        backend: str = 'ultralytics',
+        intra_op_threads: Optional[int] = None,
+        inter_op_threads: Optional[int] = None,
+        imgsz: int = 640,
+    ):
+        """
+        Return the loaded model for ``model_path``, loading it on first use.
+
+        Args:
+            model_path: Path to the model file (.pt or .onnx)
+            backend: 'ultralytics' or 'onnxruntime'
+            intra_op_threads: onnxruntime intra-op threads (onnxruntime backend)
+            inter_op_threads: onnxruntime inter-op threads (onnxruntime backend)
+            imgsz: Warm-up image size (the export size is used for onnxruntime)
+
+        Returns:
+            The shared model object
+        """
+        return self.get_with_lock(model_path, backend, intra_op_threads,
+                                  inter_op_threads, imgsz)[0]
+
+    def get_with_lock(
+        self,
+        model_path: str,
+        backend: str = 'ultralytics',
+        intra_op_threads: Optional[int] = None,
+        inter_op_threads: Optional[int] = None,
+        imgsz: int = 640,
+    ) -> Tuple[object, Optional[threading.Lock]]:
+        """
+        Like :meth:`get`, plus the lock serializing calls to the shared model.
+
+        Returns:
+            (model, lock), where lock is None when the model can be called
+            from several threads at once (onnxruntime backend)
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, got '{backend}'")
+        key, file_size = self._key(model_path, backend, intra_op_threads, inter_op_threads)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                # A new mtime means the file changed: drop the stale copies
+                for old_key in [k for k in self._entries
+                                if k[0] == key[0] and k[2] == key[2] and k[1] != key[1]]:
+                    del self._entries[old_key]
+                entry = _Entry(key)
+                self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+        with entry.lock:
+            if entry.model is not None:
+                entry.hits += 1
+                with self._lock:
+                    self.hits += 1
+                return entry.model, entry.predict_lock
+
+            start = time.perf_counter()
+            try:
+                model = self._load(model_path, backend, intra_op_threads, inter_op_threads)
+            except Exception:
+                with self._lock:
+                    if self._entries.get(key) is entry:
+                        del self._entries[key]
+                raise
+            entry.load_ms = (time.perf_counter() - start) * 1000
+
+            if self.warmup:
+                start = time.perf_counter()
+                self._warm_up(model, getattr(model, 'imgsz', imgsz))
+                entry.warmup_ms = (time.perf_counter() - start) * 1000
+
+            entry.size_bytes = file_size * MEMORY_FACTOR
+            entry.model = model
+
+        with self._lock:
+            self.loads += 1
+            self._evict_over_budget(keep=key)
+        return model, entry.predict_lock
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def _evict_over_budget(self, keep: tuple) -> None:
+        """Drop least recently used models until the budget is met (lock held)."""
+        total = sum(e.size_bytes for e in self._entries.values())
+        for key in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            entry = self._entries[key]
+            if key == keep or entry.model is None:
+                continue
+            total -= entry.size_bytes
+            del self._entries[key]
+            self.evictions += 1
+
+    def evict(self, model_path: Optional[str] = None) -> int:
+        """
+        Remove cached models.
+
+        Args:
+            model_path: Only remove models loaded from this path (None = all)
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            if model_path is None:
+                keys = list(self._entries)
+            else:
+                ident = str(Path(model_path).resolve()) if Path(model_path).exists() else str(model_path)
+                keys = [k for k in self._entries if k[0] == ident]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        """Remove every cached model."""
+        self.evict()
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return sum(1 for e in self._entries.values() if e.model is not None)
+
+    def stats(self) -> dict:
+        """Return cache counters and one row per loaded model, most recent last."""
+        with self._lock:
+            models = [
+                {
+                    'path': e.key[0],
+                    'backend': e.key[2],
+                    'size_mb': round(e.size_bytes / (1024 * 1024), 1),
+                    'load_ms': round(e.load_ms, 1),
+                    'warmup_ms': round(e.warmup_ms, 1),
+                    'hits': e.hits,
+                }
+                for e in self._entries.values() if e.model is not None
+            ]
+            return {
+                'loads': self.loads,
+                'hits': self.hits,
+                'evictions': self.evictions,
+                'size_mb': round(sum(m['size_mb'] for m in models), 1),
+                'max_mb': round(self.max_bytes / (1024 * 1024), 1),
+                'models': models,
+            }
+
+
+# ----------------------------------------------------------------------
+# Model files on disk
+# ----------------------------------------------------------------------
+
+INT8_SUFFIX = ".int8.onnx"
+
+
+def quantized_model_path(model_path: str) -> Path:
+    """Return the INT8 variant path of an .onnx model (smd_comp.onnx -> smd_comp.int8.onnx)."""
+    path = Path(model_path)
+    return path.with_name(path.name[: -len(path.suffix)] + INT8_SUFFIX)
+
+
+def quantization_report_path(int8_path: str) -> Path:
+    """Return the report path written next to an INT8 model."""
+    path = Path(int8_path)
+    return path.with_name(path.name[: -len(".onnx")] + ".report.json")
+
+
+def discover_models(root: str = ".") -> List[dict]:
+    """
+    List the model files (.pt, .onnx and INT8 .int8.onnx) in a directory.
+
+    Args:
+        root: Directory to scan
+
+    Returns:
+        One dict per file with name, path, format, size_mb and — for INT8
+        variants — the agreement / speedup / passed fields of its
+        quantization report (None when no report exists)
+    """
+    models = []
+    for path in sorted(Path(root).iterdir()):
+        if path.suffix not in (".pt", ".onnx") or not path.is_file():
+            continue
+        row = {
+            'name': path.name,
+            'path': str(path),
+            'format': 'PT' if path.suffix == ".pt" else 'ONNX',
+            'size_mb': round(path.stat().st_size / (1024 * 1024), 1),
+        }
+        if path.name.endswith(INT8_SUFFIX):
+            row['format'] = 'ONNX INT8'
+            row['report'] = None
+            report_path = quantization_report_path(path)
+            if report_path.exists():
+                try:
+                    report = json.loads(report_path.read_text())
+                    row['report'] = {k: report.get(k) for k in ('agreement', 'speedup', 'passed')}
+                except (OSError, ValueError):
+                    pass
+        models.append(row)
+    return models
+
+
+def print_models(root: str = ".") -> None:
+    """Print the model files found in ``root`` (used by the ``--list-models`` CLI flags)."""
+    models = discover_models(root)
+    if not models:
+        print(f"No model files found in {Path(root).resolve()}")
+        return
+    print(f"Models in {Path(root).resolve()}:")
+    for m in models:
+        line = f"  {m['name']:32s} {m['format']:10s} {m['size_mb']:8.1f} MB"
+        report = m.get('report')
+        if report:
+            status = "passed" if report['passed'] else "FAILED"
+            line += (f"  agreement {report['agreement']:.3f}, "
+                     f"speedup {report['speedup']:.2f}x ({status})")
+        elif m['format'] == 'ONNX INT8':
+            line += "  (no quantization report)"
+        print(line)
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    """Return the process-wide model registry, creating it on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
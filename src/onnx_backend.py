@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Native ONNX Runtime Backend
+Runs YOLOv8 ONNX exports (smd_comp.onnx, ic_detect_best.onnx) directly in
+an onnxruntime InferenceSession — no torch import, NumPy letterbox
+preprocessing, vectorized NMS and explicit control over session threading.
+"""
+
+import ast
+import numpy as np
+from pathlib import Path
+from typing import List, Optional, Union
+
+try:
+    from imaging import letterbox, unletterbox_boxes, boxes_to_detections, draw_detections
+    from boxes import batched_nms
+except ImportError:  # imported as part of the ``src`` package
+    from .imaging import letterbox, unletterbox_boxes, boxes_to_detections, draw_detections
+    from .boxes import batched_nms
+
+
+BACKENDS = ('ultralytics', 'onnxruntime')
+
+
+def onnxruntime_available() -> bool:
+    """Return True if the onnxruntime package can be imported."""
+    try:
+        import onnxruntime  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class OnnxResult:
+    """
+    Detections for one image, in original image coordinates.
+
+    Mirrors the parts of the ultralytics ``Results`` object the detectors
+    use: ``names``, ``orig_img`` and ``plot()``, plus plain NumPy arrays
+    ``xyxy`` (N, 4), ``conf`` (N,) and ``cls`` (N,).
+    """
+
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray,
+                 names: dict, orig_img: np.ndarray):
+        self.xyxy = xyxy
+        self.conf = conf
+        self.cls = cls
+        self.names = names
+        self.orig_img = orig_img
+
+    def __len__(self) -> int:
+        return len(self.conf)
+
+    def to_detections(self) -> List[dict]:
+        """Return the detections as the usual list of dictionaries."""
+        return boxes_to_detections(self.xyxy, self.conf, self.cls, self.names)
+
+    def plot(self, img: Optional[np.ndarray] = None) -> np.ndarray:
+        """Render the detections on ``img`` (defaults to the input image)."""
+        return draw_detections(img if img is not None else self.orig_img, self.to_detections())
+
+
+class OnnxYoloModel:
+    """
+    YOLOv8 detector running on onnxruntime.
+
+    Calling the model follows the ultralytics convention —
+    ``model(image_or_list, conf=0.25)`` returns one result per image — so it
+    can stand in for ``ultralytics.YOLO`` inside ``ComponentDetector``.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        intra_op_threads: Optional[int] = None,
+        inter_op_threads: Optional[int] = None,
+        iou_threshold: float = 0.7,
+        max_det: int = 300,
+    ):
+        """
+        Args:
+            model_path: Path to a YOLOv8 .onnx export
+            intra_op_threads: Threads used inside a single operator (None = ORT default)
+            inter_op_threads: Threads used to run independent operators (None = ORT default)
+            iou_threshold: NMS IoU threshold (ultralytics default: 0.7)
+            max_det: Maximum detections kept per image
+        """
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError(
+                "The onnxruntime backend requires onnxruntime (pip install onnxruntime)"
+            ) from e
+
+        if Path(model_path).suffix.lower() != ".onnx":
+            raise ValueError(f"The onnxruntime backend needs an .onnx model, got: {model_path}")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = int(intra_op_threads)
+        if inter_op_threads:
+            options.inter_op_num_threads = int(inter_op_threads)
+            options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+
+        self.session = ort.InferenceSession(
+            str(model_path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.model_path = str(model_path)
+        self.iou_threshold = iou_threshold
+        self.max_det = max_det
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch_dim, _, height, _ = model_input.shape
+        self.dynamic_batch = not isinstance(batch_dim, int)
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.imgsz = self._parse_imgsz(metadata.get("imgsz"), height)
+        self.names = self._parse_names(metadata.get("names"))
+
+    @staticmethod
+    def _parse_imgsz(value: Optional[str], height) -> int:
+        """Read the export image size from metadata or the input shape."""
+        if value:
+            try:
+                parsed = ast.literal_eval(value)
+                return int(parsed[0] if isinstance(parsed, (list, tuple)) else parsed)
+            except (ValueError, SyntaxError, TypeError):
+                pass
+        return int(height) if isinstance(height, int) else 640
+
+    @staticmethod
+    def _parse_names(value: Optional[str]) -> dict:
+        """Read the class-name mapping stored by the ultralytics exporter."""
+        if value:
+            try:
+                return {int(k): v for k, v in ast.literal_eval(value).items()}
+            except (ValueError, SyntaxError, AttributeError):
+                pass
+        return {}
+
+    # ------------------------------------------------------------------
+    # Inference
+    # ------------------------------------------------------------------
+
+    def _preprocess(self, image: np.ndarray):
+        """Letterbox a BGR image and convert it to a normalized CHW RGB tensor."""
+        boxed, ratio, pad = letterbox(image, self.imgsz)
+        tensor = boxed[:, :, ::-1].transpose(2, 0, 1)
+        return np.ascontiguousarray(tensor, dtype=np.float32) / 255.0, ratio, pad
+
+    def _postprocess(self, output: np.ndarray, conf: float):
+        """
+        Decode one (4 + nc, N) YOLOv8 output into filtered, NMS-merged arrays
+        in letterboxed coordinates.
+        """
+        preds = output.T  # (N, 4 + nc)
+        class_scores = preds[:, 4:]
+        cls = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(cls)), cls]
+        mask = scores >= conf
+        if not mask.any():
+            empty = np.zeros((0, 4), dtype=np.float32)
+            return empty, np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+
+        xywh, scores, cls = preds[mask, :4], scores[mask], cls[mask]
+        xyxy = np.empty_like(xywh)
+        xyxy[:, :2] = xywh[:, :2] - xywh[:, 2:] / 2
+        xyxy[:, 2:] = xywh[:, :2] + xywh[:, 2:] / 2
+
+        keep = batched_nms(xyxy, scores, cls, self.iou_threshold)[: self.max_det]
+        return xyxy[keep], scores[keep], cls[keep]
+
+    def __call__(
+        self,
+        source: Union[np.ndarray, List[np.ndarray]],
+        conf: float = 0.25,
+        **kwargs,
+    ) -> List[OnnxResult]:
+        """
+        Run detection on one BGR image or a list of BGR images.
+
+        Extra keyword arguments accepted by ``ultralytics.YOLO`` (``verbose``,
+        ``imgsz``...) are ignored; the session's export size is used.
+
+        Returns:
+            One OnnxResult per image, in input order
+        """
+        images = source if isinstance(source, list) else [source]
+        prepared = [self._preprocess(img) for img in images]
+        batch = np.stack([p[0] for p in prepared])
+
+        if self.dynamic_batch or len(images) == 1:
+            outputs = self.session.run(None, {self.input_name: batch})[0]
+        else:
+            # Static batch-1 export: run the images one by one
+            outputs = np.concatenate([
+                self.session.run(None, {self.input_name: batch[i:i + 1]})[0]
+                for i in range(len(images))
+            ])
+
+        results = []
+        for img, (_, ratio, pad), output in zip(images, prepared, outputs):
+            xyxy, scores, cls = self._postprocess(output, conf)
+            xyxy = unletterbox_boxes(xyxy, ratio, pad, img.shape[:2])
+            names = self.names or {int(c): str(int(c)) for c in np.unique(cls)}
+            results.append(OnnxResult(xyxy, scores, cls, names, img))
+        return results
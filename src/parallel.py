@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Multi-Process Workers
+Spreads the images of ``run_pipeline`` / ``batch_detect`` over a pool of
+worker processes. Each worker builds its own pipeline (or detector) once,
+so the model is loaded once per process, and gets an equal share of the
+cores for intra-op threads so the workers do not oversubscribe the CPU.
+
+Images are handed out a few at a time as workers become free (dynamic
+distribution — a slow 48 MP board does not hold up a queue of small
+ones), and results come back in input order. An exception while
+processing an image is returned as that image's error; a worker process
+that dies (e.g. out of memory) is replaced and its in-flight images are
+retried once, one at a time, so a second crash is charged to the image
+that caused it rather than to the images that shared the pool with it.
+
+Usage:
+    python src/pipeline.py --model smd_comp.onnx --image-dir images/ --workers 8
+    python src/detect.py --model smd_comp.onnx --image-dir images/ --workers 8
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Attempts per image when its worker process dies
+MAX_ATTEMPTS = 2
+
+# Object built by the worker initializer (a pipeline or detector)
+_worker_state = None
+
+
+def threads_per_worker(workers: int) -> int:
+    """Fair share of the cores for each of ``workers`` processes."""
+    return max(1, (os.cpu_count() or 1) // max(1, int(workers)))
+
+
+def _limit_threads(n_threads: int) -> None:
+    """Cap the OpenCV and torch thread pools of this process."""
+    try:
+        import cv2
+        cv2.setNumThreads(n_threads)
+    except Exception:
+        pass
+    try:
+        import torch
+        torch.set_num_threads(n_threads)
+    except Exception:
+        pass
+
+
+def _init_worker(factory: Callable, kwargs: dict, n_threads: int) -> None:
+    """Worker initializer: limit threads, then build the worker's object once."""
+    global _worker_state
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(n_threads)
+    _limit_threads(n_threads)
+    _worker_state = factory(**kwargs)
+
+
+def _run_task(task: Callable, index: int, args: tuple) -> Tuple[int, bool, Any]:
+    """Run ``task(worker_state, *args)``; exceptions become the image's error."""
+    try:
+        return index, True, task(_worker_state, *args)
+    except Exception as e:
+        return index, False, f"{type(e).__name__}: {e}"
+
+
+class WorkerPool:
+    """
+    Pool of worker processes, each holding one object built by ``factory``.
+
+    Example:
+        with WorkerPool(ComponentDetector, {"model_path": "smd_comp.onnx",
+                                            "backend": "onnxruntime"}, workers=8) as pool:
+            for ok, value in pool.map(detect_task, [(path,) for path in paths]):
+                ...
+    """
+
+    def __init__(
+        self,
+        factory: Callable,
+        kwargs: Optional[dict] = None,
+        workers: Optional[int] = None,
+        threads: Optional[int] = None,
+        max_in_flight: Optional[int] = None
+    ):
+        """
+        Args:
+            factory: Picklable callable (e.g. a class) building the worker's
+                     object; called once per process as ``factory(**kwargs)``
+            kwargs: Keyword arguments for ``factory``
+            workers: Number of processes (default: CPU count)
+            threads: Intra-op threads per process (default: fair share)
+            max_in_flight: Tasks handed to the pool at once (default: 2 per
+                     worker); the rest wait until a worker is free
+        """
+        self.factory = factory
+        self.kwargs = dict(kwargs or {})
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.threads = threads or threads_per_worker(self.workers)
+        self.max_in_flight = max_in_flight or 2 * self.workers
+        self.last_stats: Optional[dict] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: a fresh interpreter per worker (forking a process that
+            # already runs model / OpenCV threads can deadlock)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.factory, self.kwargs, self.threads),
+            )
+        return self._executor
+
+    def close(self) -> None:
+        """Shut the worker processes down."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def imap(self, task: Callable, items: Sequence[tuple]) -> Iterator[Tuple[bool, Any]]:
+        """
+        Run ``task(worker_object, *item)`` for every item.
+
+        Yields:
+            ``(True, result)`` or ``(False, error message)`` per item, in
+            input order
+        """
+        start = time.perf_counter()
+        attempts = [0] * len(items)
+        finished: Dict[int, Tuple[bool, Any]] = {}
+        in_flight: Dict[Any, int] = {}
+        next_submit = next_yield = 0
+        retry: List[int] = []
+        failed = 0
+
+        while next_yield < len(items):
+            # Top up the pool (retries first)
+            while len(in_flight) < self.max_in_flight and (retry or next_submit < len(items)):
+                isolated = bool(retry)
+                if isolated:
+                    # Retries run alone: if the pool dies again, this image did it
+                    if in_flight:
+                        break
+                    index = retry.pop(0)
+                else:
+                    index, next_submit = next_submit, next_submit + 1
+                attempts[index] += 1
+                in_flight[self._pool().submit(_run_task, task, index, tuple(items[index]))] = index
+                if isolated:
+                    break
+
+            if in_flight:
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    index = in_flight.pop(future)
+                    try:
+                        _, ok, value = future.result()
+                        finished[index] = (ok, value)
+                    except BrokenProcessPool:
+                        broken = True
+                        retry.append(index)
+                if broken:
+                    # Every task still queued on the dead pool is lost as well
+                    retry.extend(in_flight.values())
+                    in_flight.clear()
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                    self._executor = None
+                    for index in sorted(set(retry)):
+                        if attempts[index] >= MAX_ATTEMPTS:
+                            finished[index] = (False, "worker process died while processing this image")
+                    retry = sorted(set(i for i in retry if i not in finished))
+
+            while next_yield in finished:
+                ok, value = finished.pop(next_yield)
+                failed += not ok
+                next_yield += 1
+                yield ok, value
+
+        seconds = time.perf_counter() - start
+        self.last_stats = {
+            'images': len(items),
+            'failed': failed,
+            'workers': self.workers,
+            'threads_per_worker': self.threads,
+            'seconds': round(seconds, 3),
+            'images_per_sec': round(len(items) / seconds, 3) if seconds > 0 else None,
+        }
+
+    def map(self, task: Callable, items: Sequence[tuple]) -> List[Tuple[bool, Any]]:
+        """List form of :meth:`imap`."""
+        return list(self.imap(task, items))
+
+
+def print_throughput(images: int, seconds: float, workers: int = 1, failed: int = 0) -> None:
+    """Print the aggregate throughput of a run."""
+    rate = images / seconds if seconds > 0 else 0.0
+    failed_note = f", {failed} failed" if failed else ""
+    print(f"\nProcessed {images} images in {seconds:.1f} s with {workers} worker"
+          f"{'s' if workers != 1 else ''}{failed_note}: {rate:.2f} images/s")
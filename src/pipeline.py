@@ -8,18 +8,31 @@ the annotated result photo, all cropped components, and a JSON metadata file.
 
 import argparse
 import json
+import time
 from datetime import datetime
 from pathlib import Path
 import sys
 import cv2
 
 # Import our modules
-from detect import ComponentDetector, load_image_with_exif
-from crop import ComponentCropper
+from detect import ComponentDetector, DetectionResult, load_image_with_exif, PREPROCESS_ORDERS
+from onnx_backend import BACKENDS
+from model_registry import print_models
+from timing import StageTimer
+from content_store import ContentStore, STORE_DIRNAME, sha256_file
+from crop import ComponentCropper, CROP_FORMATS, CROP_STORAGES, DEFAULT_CROP_QUALITY
+from crop_archive import PACK_NAME, resolve_crop_file
+from virtual_crops import METADATA_NAME
+from tile_pyramid import build_pyramid
+from watch import (HotFolderWatcher, IMAGE_EXTENSIONS, DEFAULT_WORKERS as DEFAULT_WATCH_WORKERS,
+                   DEFAULT_QUEUE_SIZE, DEFAULT_POLL_INTERVAL, DEFAULT_SETTLE_TIME,
+                   DEFAULT_REPORT_INTERVAL)
+from parallel import WorkerPool, print_throughput, threads_per_worker
 
 # Import database module if available
 try:
     from database import DatabaseManager, get_db_manager_from_env
+    from db_writer import JOURNAL_NAME, close_db_writers, get_db_writer
     DB_AVAILABLE = True
 except ImportError:
     DB_AVAILABLE = False
@@ -34,7 +47,21 @@ class ComponentAnalysisPipeline:
         model_path: str,
         conf_threshold: float = 0.25,
         padding: int = 10,
-        use_database: bool = False
+        use_database: bool = False,
+        batch_size: int = 1,
+        tile_size: int = None,
+        tile_overlap: float = 0.2,
+        backend: str = "ultralytics",
+        registry=None,
+        preprocess_order: str = "full",
+        dedupe: bool = True,
+        crop_format: str = "jpg",
+        crop_quality: int = DEFAULT_CROP_QUALITY,
+        crop_workers: int = None,
+        crop_storage: str = "files",
+        pyramids: bool = False,
+        intra_op_threads: int = None,
+        async_db: bool = True
     ):
         """
         Initialize the pipeline.
@@ -44,26 +71,120 @@ class ComponentAnalysisPipeline:
             conf_threshold: Confidence threshold for detections
             padding: Padding for cropped components
             use_database: Whether to log to database
+            batch_size: Images per model call in :meth:`run_pipeline`
+            tile_size: Enable tiled high-resolution inference with tiles of
+                       this size (pixels); None = whole-image inference
+            tile_overlap: Overlap between neighbouring tiles (fraction)
+            backend: Inference backend, 'ultralytics' or 'onnxruntime'
+            registry: Model cache to load from (default: the process-wide
+                      registry)
+            preprocess_order: 'full' or 'letterbox' (filter the model-input
+                      sized letterbox instead of the full-resolution image)
+            dedupe: Reuse the existing job folder when an identical image
+                    was already processed with the same model and settings
+            crop_format: Crop file format, 'jpg', 'png' or 'webp'
+            crop_quality: JPEG / WebP quality of the crops (1-100)
+            crop_workers: Crop encoding threads (default: CPU count, at most 8)
+            crop_storage: 'files' (one image per crop under crops/),
+                    'pack' (a single crops.pack archive per job) or
+                    'virtual' (no crop files; crops are rendered on
+                    request from input.* and the stored boxes)
+            pyramids: Build the deep-zoom tile pyramids of input.* and
+                    result.jpg while writing the job (otherwise the Job
+                    Viewer builds them on first view)
+            intra_op_threads: onnxruntime intra-op threads (onnxruntime
+                    backend; None = runtime default)
+            async_db: Hand job logs to a background writer (see
+                    ``db_writer``) instead of waiting for PostgreSQL; while
+                    the database is unreachable they are journaled under
+                    the jobs folder and replayed later
         """
-        self.detector = ComponentDetector(model_path, conf_threshold)
-        self.cropper = ComponentCropper(padding)
+        # Constructor arguments, to build identical pipelines in the
+        # worker processes of run_pipeline(workers=N)
+        self.config = dict(
+            model_path=model_path, conf_threshold=conf_threshold, padding=padding,
+            use_database=use_database, batch_size=batch_size, tile_size=tile_size,
+            tile_overlap=tile_overlap, backend=backend, preprocess_order=preprocess_order,
+            dedupe=dedupe, crop_format=crop_format, crop_quality=crop_quality,
+            crop_workers=crop_workers, crop_storage=crop_storage, pyramids=pyramids,
+            intra_op_threads=intra_op_threads, async_db=async_db,
+        )
+        # Weights come from the process-wide model registry, so building
+        # another pipeline for the same model does not reload them.
+        self.detector = ComponentDetector(
+            model_path, conf_threshold, batch_size=batch_size, backend=backend,
+            registry=registry, preprocess_order=preprocess_order,
+            intra_op_threads=intra_op_threads
+        )
+        self.cropper = ComponentCropper(padding, crop_format, crop_quality, crop_workers)
         self.use_database = use_database and DB_AVAILABLE
         self.model_path = model_path
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.dedupe = dedupe
+        if crop_storage not in CROP_STORAGES:
+            raise ValueError(f"Unknown crop storage {crop_storage!r}; expected one of {CROP_STORAGES}")
+        self.crop_storage = crop_storage
+        self.pyramids = pyramids
+        self.last_run_stats = None
+        self.async_db = async_db
         
         if self.use_database:
             try:
                 self.db = get_db_manager_from_env()
                 if not self.db.test_connection():
-                    print("Warning: Database connection failed. Continuing without database logging.")
-                    self.use_database = False
+                    if self.async_db:
+                        print("Warning: Database connection failed. Job logs are journaled until it is reachable.")
+                    else:
+                        print("Warning: Database connection failed. Continuing without database logging.")
+                        self.use_database = False
             except Exception as e:
                 print(f"Warning: Could not initialize database: {e}")
                 self.use_database = False
 
+    def job_key(self, content_hash: str) -> str:
+        """Dedupe key of this pipeline's job for an image with ``content_hash``."""
+        return ContentStore.job_key(
+            content_hash, self.model_path,
+            backend=self.detector.backend,
+            imgsz=self.detector.imgsz,
+            conf=self.detector.conf_threshold,
+            padding=self.cropper.padding,
+            crop_format=self.cropper.engine.image_format,
+            crop_quality=self.cropper.engine.quality,
+            crop_storage=self.crop_storage,
+            preprocess_order=self.detector.preprocess_order,
+            tile_size=self.tile_size,
+            tile_overlap=self.tile_overlap if self.tile_size else None,
+        )
+
+    @staticmethod
+    def _reused_result(job_dir: Path) -> dict:
+        """Result dictionary of an existing job folder."""
+        with open(job_dir / "metadata.json") as f:
+            metadata = json.load(f)
+        inputs = sorted(job_dir.glob("input.*"))
+        return {
+            "job_name": metadata.get("job_name", job_dir.name),
+            "job_folder": str(job_dir),
+            "input_photo": str(inputs[0]) if inputs else None,
+            "result_photo": str(job_dir / "result.jpg"),
+            "crop_photos": [
+                resolve_crop_file(str(job_dir), d["crop_file"])
+                for d in metadata.get("detections", []) if d.get("crop_file")
+            ],
+            "metadata": metadata,
+            "reused": True
+        }
+
     def process_image(
         self,
         image_path: str,
-        jobs_base_dir: str = "jobs"
+        jobs_base_dir: str = "jobs",
+        image=None,
+        detections: list = None,
+        content_hash: str = None,
+        original_name: str = None
     ) -> dict:
         """
         Process a single image: detect components, crop them, save results.
@@ -75,22 +196,62 @@ class ComponentAnalysisPipeline:
             input{ext}      — copy of the original photo
             result.jpg      — annotated photo with bounding boxes
             crops/          — one cropped image per detected component
-            metadata.json   — detection data and job info
+                              (or crops.pack, a single archive of all crops,
+                              with ``crop_storage='pack'``; nothing with
+                              ``crop_storage='virtual'``)
+            metadata.json   — detection data, job info and per-stage timings
+            tiles/          — deep-zoom tiles of input / result (``pyramids``)
+
+        With ``dedupe`` enabled, an image whose content was already
+        processed with the same model and settings returns the existing
+        job (``"reused": True``) without running detection again.
 
         Args:
             image_path: Path to the input PCB image
             jobs_base_dir: Base directory where job folders are created
+            image: Optional pre-decoded BGR image (skips decoding)
+            detections: Optional precomputed detections for ``image``
+                        (e.g. from batched inference); skips the model
+            content_hash: SHA-256 of the file, if already known
+            original_name: File name to name the job after and log
+                           (default: the name of ``image_path``, e.g. for
+                           uploads stored under their content hash)
 
         Returns:
             Dictionary with job_folder, job_name, detections, crop_paths
         """
+        timer = StageTimer()
         img_path = Path(image_path)
+        source_name = Path(original_name or img_path.name)
+
+        with timer.stage("dedupe"):
+            content_hash = content_hash or sha256_file(str(img_path))
+            store = ContentStore(Path(jobs_base_dir) / STORE_DIRNAME) if self.dedupe else None
+            job_key = self.job_key(content_hash) if store else None
+            existing = store.find_job(job_key) if store else None
+        if existing is not None:
+            print(f"\n♻️  {source_name} was already processed with this model and settings: {existing}")
+            return self._reused_result(existing)
+
         now = datetime.now()
-        job_name = f"{img_path.stem}_{now.strftime('%Y%m%d_%H%M%S')}"
+        job_name = f"{source_name.stem}_{now.strftime('%Y%m%d_%H%M%S')}"
         job_dir = Path(jobs_base_dir) / job_name
+        # Never overwrite another job started within the same second, since
+        # the dedupe index may point at it (mkdir is atomic, so concurrent
+        # workers each get their own folder)
+        Path(jobs_base_dir).mkdir(parents=True, exist_ok=True)
+        suffix = 1
+        while True:
+            try:
+                job_dir.mkdir()
+                break
+            except FileExistsError:
+                suffix += 1
+                job_dir = Path(jobs_base_dir) / f"{job_name}_{suffix}"
+        job_name = job_dir.name
         crops_dir = job_dir / "crops"
-        job_dir.mkdir(parents=True, exist_ok=True)
-        crops_dir.mkdir(exist_ok=True)
+        if self.crop_storage == "files":
+            crops_dir.mkdir(exist_ok=True)
 
         print(f"\n{'='*60}")
         print(f"JOB: {job_name}")
@@ -102,42 +263,88 @@ class ComponentAnalysisPipeline:
 
         # --- Detection ---
         print("\n[STEP 1/2] Detecting components...")
-        image = load_image_with_exif(str(img_path))
+        if image is None:
+            image = load_image_with_exif(str(img_path), timer=timer)
 
         # Save the EXIF-corrected input copy for consistency with the viewer
-        cv2.imwrite(str(input_copy), image)
+        with timer.stage("encode"):
+            cv2.imwrite(str(input_copy), image)
 
-        detections = self.detector.detect_components(
-            str(img_path),
-            save_visualization=False,
-            image=image,
-        )
+        if detections is None and self.tile_size:
+            detections = self.detector.detect_tiled(
+                str(img_path),
+                tile_size=self.tile_size,
+                overlap=self.tile_overlap,
+                batch_size=self.detector.batch_size,
+                image=image,
+                timer=timer,
+            )
+            print(f"  Tiled inference: {len(detections.tile_timings)} tiles")
+        elif detections is None:
+            detections = self.detector.detect_components(
+                str(img_path),
+                save_visualization=False,
+                image=image,
+                timer=timer,
+            )
+        elif not isinstance(detections, DetectionResult):
+            detections = DetectionResult(detections, image=image)
         print(f"  Detected {len(detections)} components")
 
-        # --- Save annotated result image ---
-        results = self.detector.model(image, conf=self.detector.conf_threshold, verbose=False)
-        annotated = results[0].plot()
+        # --- Save annotated result image (reuses the detection forward pass) ---
+        with timer.stage("annotate"):
+            annotated = detections.plot(image)
         result_path = job_dir / "result.jpg"
-        cv2.imwrite(str(result_path), annotated)
+        with timer.stage("encode"):
+            cv2.imwrite(str(result_path), annotated)
         print(f"  Saved result image: {result_path}")
 
+        if self.pyramids:
+            with timer.stage("pyramid"):
+                build_pyramid(str(input_copy), image=image)
+                build_pyramid(str(result_path), image=annotated)
+
         # --- Crop all detected components ---
         print("\n[STEP 2/2] Cropping components...")
-        crop_paths = []
-        for i, detection in enumerate(detections):
-            cropped = self.cropper.crop_component(image, detection['bbox'])
-            crop_filename = f"{i:03d}_{detection['class_name']}.jpg"
-            crop_path = crops_dir / crop_filename
-            cv2.imwrite(str(crop_path), cropped)
-            crop_paths.append(str(crop_path))
-        print(f"  Saved {len(crop_paths)} cropped components to {crops_dir}")
+        engine = self.cropper.engine
+        crop_names = [engine.filename(f"{i:03d}_{detection['class_name']}")
+                      for i, detection in enumerate(detections)]
+        boxes = [detection['bbox'] for detection in detections]
+        if self.crop_storage == "virtual":
+            # Nothing written: <job>/metadata.json#N is rendered on request
+            crop_paths = [str(job_dir / f"{METADATA_NAME}#{i}") for i in range(len(detections))]
+            print(f"  {len(crop_paths)} crops available on demand (virtual crop storage)")
+        elif self.crop_storage == "pack":
+            # Paths of the form <job>/crops.pack#N address crops in the archive
+            refs = engine.pack_crops(
+                image, boxes, job_dir / PACK_NAME, crop_names,
+                fields=[{"class_name": d["class_name"], "confidence": round(d["confidence"], 4),
+                         "bbox": d["bbox"]} for d in detections],
+                timer=timer,
+            )
+            crop_paths = [str(job_dir / ref) for ref in refs]
+            print(f"  Packed {len(crop_paths)} cropped components into {job_dir / PACK_NAME}")
+        else:
+            crop_paths = engine.save_crops(
+                image, boxes, [crops_dir / name for name in crop_names], timer=timer
+            )
+            print(f"  Saved {len(crop_paths)} cropped components to {crops_dir}")
 
         # --- Save metadata JSON ---
         metadata = {
             "job_name": job_name,
             "input_file": str(img_path.resolve()),
+            "original_name": source_name.name,
+            "content_hash": content_hash,
             "date": now.isoformat(),
             "model": str(self.model_path),
+            "backend": self.detector.backend,
+            "preprocess_order": self.detector.preprocess_order,
+            "crop_storage": self.crop_storage,
+            "crop_padding": self.cropper.padding,
+            "crop_format": engine.image_format,
+            "crop_quality": engine.quality,
+            "inference_calls": round(detections.inference_calls, 3),
             "total_detections": len(detections),
             "detections": [
                 {
@@ -150,31 +357,59 @@ class ComponentAnalysisPipeline:
                 for i, d in enumerate(detections)
             ]
         }
+        if getattr(detections, "tile_timings", None):
+            metadata["tile_timings"] = detections.tile_timings
+
+        # --- Database logging ---
+        # Runs before metadata.json is written so its duration is recorded there
+        if self.use_database:
+            db_job = dict(
+                file_name=source_name.name,
+                file_path=str(img_path.resolve()),
+                model=str(self.model_path),
+                detections=[
+                    {"class_name": d["class_name"], "confidence": float(d["confidence"]),
+                     "bbox": [float(v) for v in d["bbox"]]}
+                    for d in detections
+                ],
+                crop_paths=[str(Path(p).resolve()) for p in crop_paths],
+                format=img_path.suffix.lstrip("."),
+                job_name=job_name,
+                job_folder_path=str(job_dir.resolve()),
+                content_hash=content_hash,
+                started_at=now.isoformat()
+            )
+        if self.use_database and self.async_db:
+            # Queued for the background writer: returns without waiting for
+            # the database (the db_log timing is the hand-off only)
+            with timer.stage("db_log"):
+                writer = get_db_writer(self.db, str(Path(jobs_base_dir) / JOURNAL_NAME))
+            writer.submit({**db_job, "ended_at": datetime.now().isoformat(),
+                           "timings": timer.as_dict()})
+        elif self.use_database:
+            job_id = None
+            with timer.stage("db_log"):
+                try:
+                    # Image, job, detections and crop links in one transaction
+                    logged = self.db.log_job_bulk(**db_job)
+                    job_id = logged["job_id"]
+                except Exception as e:
+                    print(f"Warning: Database logging failed: {e}")
+                    job_id = None
+            if job_id is not None:
+                try:
+                    self.db.end_job(job_id, timings=timer.as_dict())
+                except Exception as e:
+                    print(f"Warning: Database logging failed: {e}")
+
+        metadata["timings"] = timer.as_dict()
         metadata_path = job_dir / "metadata.json"
         with open(metadata_path, "w") as f:
             json.dump(metadata, f, indent=2)
         print(f"  Saved metadata: {metadata_path}")
-
-        # --- Database logging ---
-        if self.use_database:
-            try:
-                file_fmt = img_path.suffix.lstrip(".")
-                image_id = self.db.log_image_upload(img_path.name, str(img_path.resolve()), file_fmt)
-                job_id = self.db.start_job(
-                    image_id, self.model_path,
-                    job_name=job_name,
-                    job_folder_path=str(job_dir.resolve())
-                )
-                detection_ids = {}
-                for i, d in enumerate(detections):
-                    det_id = self.db.log_detection(job_id, d["class_name"], d["confidence"], d["bbox"])
-                    detection_ids[i] = det_id
-                for i, crop_path in enumerate(crop_paths):
-                    if i in detection_ids:
-                        self.db.log_cropped_component(job_id, detection_ids[i], str(Path(crop_path).resolve()))
-                self.db.end_job(job_id)
-            except Exception as e:
-                print(f"Warning: Database logging failed: {e}")
+        print("  Timings (ms): " + ", ".join(f"{k} {v:.1f}" for k, v in metadata["timings"].items()))
+        if store:
+            store.link_job(job_key, str(job_dir), content_hash)
 
         print(f"\n✅ Job complete: {job_dir}")
         return {
@@ -183,14 +418,38 @@ class ComponentAnalysisPipeline:
             "input_photo": str(input_copy),
             "result_photo": str(result_path),
             "crop_photos": crop_paths,
-            "metadata": metadata
+            "metadata": metadata,
+            "reused": False
         }
 
+    def close(self) -> None:
+        """Wait for queued database logs to be written (or journaled)."""
+        if self.use_database and self.async_db:
+            close_db_writers()
+
+    def watch(self, folder: str, output_base_dir: str = "jobs", duration: float = None, **kwargs) -> dict:
+        """
+        Process images dropped into ``folder`` until interrupted.
+
+        Args:
+            folder: Hot folder to watch
+            output_base_dir: Base directory for job folders
+            duration: Stop after this many seconds (default: run until Ctrl+C)
+            **kwargs: :class:`watch.HotFolderWatcher` options (workers,
+                      queue_size, poll_interval, settle_time, report_interval)
+
+        Returns:
+            Final watcher statistics
+        """
+        return HotFolderWatcher(self, folder, output_base_dir, **kwargs).run(duration)
+
     def run_pipeline(
         self,
         image_path: str = None,
         image_dir: str = None,
         output_base_dir: str = "jobs",
+        batch_size: int = None,
+        workers: int = None,
         **kwargs
     ):
         """
@@ -200,17 +459,100 @@ class ComponentAnalysisPipeline:
             image_path: Path to single image (optional)
             image_dir: Directory of images (optional)
             output_base_dir: Base directory for job folders
+            batch_size: Images per model call (defaults to the detector's
+                        ``batch_size``). Values above 1 enable batched inference.
+            workers: Worker processes (see ``parallel.WorkerPool``); each
+                     loads its own model and processes whole images. Values
+                     above 1 replace in-process batching.
+
+        Returns:
+            Results of the successfully processed images, in input order
+            (throughput in ``self.last_run_stats``)
         """
         images_to_process = []
         if image_path:
             images_to_process = [image_path]
         elif image_dir:
             image_dir = Path(image_dir)
-            for ext in ['.jpg', '.jpeg', '.png', '.bmp']:
+            for ext in IMAGE_EXTENSIONS:
                 images_to_process.extend(image_dir.glob(f"*{ext}"))
                 images_to_process.extend(image_dir.glob(f"*{ext.upper()}"))
             images_to_process = [str(p) for p in images_to_process]
 
+        start = time.perf_counter()
+        results = self._run_images(images_to_process, output_base_dir, batch_size, workers)
+        seconds = time.perf_counter() - start
+        self.last_run_stats = {
+            'images': len(images_to_process),
+            'failed': len(images_to_process) - len(results),
+            'workers': max(1, int(workers or 1)),
+            'seconds': round(seconds, 3),
+            'images_per_sec': round(len(images_to_process) / seconds, 3) if seconds > 0 else None,
+        }
+        return results
+
+    def _run_parallel(self, images_to_process: list, output_base_dir: str, workers: int) -> list:
+        """Process images on a pool of worker processes (results in input order)."""
+        kwargs = dict(self.config)
+        kwargs['intra_op_threads'] = kwargs['intra_op_threads'] or threads_per_worker(workers)
+        print(f"Processing {len(images_to_process)} images on {workers} worker processes "
+              f"({kwargs['intra_op_threads']} threads each)")
+        results = []
+        with WorkerPool(ComponentAnalysisPipeline, kwargs, workers,
+                        threads=kwargs['intra_op_threads']) as pool:
+            tasks = [(str(img), output_base_dir) for img in images_to_process]
+            for img, (ok, value) in zip(images_to_process, pool.imap(_process_task, tasks)):
+                if ok:
+                    results.append(value)
+                else:
+                    print(f"Error processing {img}: {value}")
+        return results
+
+    def _run_images(self, images_to_process: list, output_base_dir: str,
+                    batch_size: int = None, workers: int = None) -> list:
+        if workers and workers > 1 and len(images_to_process) > 1:
+            return self._run_parallel(images_to_process, output_base_dir, workers)
+
+        batch_size = max(1, int(batch_size or self.detector.batch_size))
+        # Tiled mode already batches tiles within each image
+        if batch_size > 1 and len(images_to_process) > 1 and not self.tile_size:
+            # Hash up front so already-processed images never reach the model;
+            # results are collected by input index to keep input order
+            results_by_index = {}
+            hashes = {}
+            pending = []
+            store = ContentStore(Path(output_base_dir) / STORE_DIRNAME)
+            for index, img in enumerate(images_to_process):
+                try:
+                    hashes[index] = sha256_file(img)
+                except OSError as e:
+                    print(f"Error processing {img}: {e}")
+                    continue
+                existing = store.find_job(self.job_key(hashes[index])) if self.dedupe else None
+                if existing is not None:
+                    print(f"♻️  {Path(img).name} was already processed with this model and settings: {existing}")
+                    results_by_index[index] = self._reused_result(existing)
+                else:
+                    pending.append(index)
+
+            batches = self.detector.iter_batches([images_to_process[i] for i in pending], batch_size)
+            indexes = iter(pending)
+            for paths, images, batch_dets, errors in batches:
+                for img, image, detections, err in zip(paths, images, batch_dets, errors):
+                    index = next(indexes)
+                    if err is not None:
+                        print(f"Error processing {img}: {err}")
+                        continue
+                    try:
+                        results_by_index[index] = self.process_image(
+                            str(img), jobs_base_dir=output_base_dir,
+                            image=image, detections=detections,
+                            content_hash=hashes[index],
+                        )
+                    except Exception as e:
+                        print(f"Error processing {img}: {e}")
+            return [results_by_index[index] for index in sorted(results_by_index)]
+
         results = []
         for img in images_to_process:
             try:
@@ -221,6 +563,11 @@ class ComponentAnalysisPipeline:
         return results
 
 
+def _process_task(pipeline: ComponentAnalysisPipeline, image_path: str, output_base_dir: str) -> dict:
+    """Worker-process task of run_pipeline(workers=N)."""
+    return pipeline.process_image(image_path, jobs_base_dir=output_base_dir)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Component detection pipeline — detects and crops electronic components",
@@ -230,20 +577,59 @@ Examples:
   python pipeline.py --model smd_comp.pt --image board.jpg
   python pipeline.py --model smd_comp.pt --image-dir images/
   python pipeline.py --model smd_comp.pt --image board.jpg --conf 0.5
+  python pipeline.py --model smd_comp.pt --image-dir images/ --batch-size 8
+  python pipeline.py --model smd_comp.pt --image board_48mp.jpg --tile-size 1280 --batch-size 4
+  python pipeline.py --model smd_comp.onnx --image board.jpg --backend onnxruntime
+  python pipeline.py --model smd_comp.pt --image board.jpg --preprocess-order letterbox
+  python pipeline.py --model smd_comp.int8.onnx --image board.jpg --backend onnxruntime
+  python pipeline.py --model smd_comp.pt --image board.jpg --no-dedupe
+  python pipeline.py --model smd_comp.pt --image board.jpg --crop-format webp --crop-quality 85
+  python pipeline.py --model smd_comp.pt --image-dir images/ --crop-storage pack
+  python pipeline.py --model smd_comp.pt --image-dir images/ --crop-storage virtual
+  python pipeline.py --model smd_comp.onnx --image-dir images/ --workers 8 --backend onnxruntime
+  python pipeline.py --model smd_comp.pt --watch /srv/camera/inbox --watch-workers 2
+  python pipeline.py --list-models
         """
     )
-    parser.add_argument("--model", type=str, required=True, help="Path to trained YOLO model")
+    parser.add_argument("--model", type=str, help="Path to trained YOLO model (required unless --list-models)")
     parser.add_argument("--image", type=str, help="Path to single image to process")
     parser.add_argument("--image-dir", type=str, help="Directory of images to process")
+    parser.add_argument("--watch", type=str, metavar="DIR", help="Watch a hot folder and process new images as they arrive (until Ctrl+C)")
     parser.add_argument("--output-dir", type=str, default="jobs", help="Base directory for job folders (default: jobs)")
     parser.add_argument("--conf", type=float, default=0.25, help="Confidence threshold (default: 0.25)")
     parser.add_argument("--padding", type=int, default=10, help="Padding around crops in pixels (default: 10)")
     parser.add_argument("--use-database", action="store_true", help="Enable database logging (requires PostgreSQL)")
+    parser.add_argument("--batch-size", type=int, default=1, help="Images (or tiles with --tile-size) per model call (default: 1)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for --image-dir, each loading its own model (default: 1)")
+    parser.add_argument("--backend", choices=BACKENDS, default="ultralytics", help="Inference backend: ultralytics (default) or onnxruntime (.onnx models only)")
+    parser.add_argument("--tile-size", type=int, help="Enable tiled high-resolution inference with tiles of this size (pixels)")
+    parser.add_argument("--tile-overlap", type=float, default=0.2, help="Overlap between neighbouring tiles as a fraction of --tile-size (default: 0.2)")
+    parser.add_argument("--preprocess-order", choices=PREPROCESS_ORDERS, default="full", help="Preprocess the full-resolution image (full, default) or the letterboxed model input (letterbox, faster)")
+    parser.add_argument("--crop-format", choices=sorted(CROP_FORMATS), default="jpg", help="Crop file format (default: jpg)")
+    parser.add_argument("--crop-quality", type=int, default=DEFAULT_CROP_QUALITY, help=f"JPEG / WebP quality of the crops, 1-100 (default: {DEFAULT_CROP_QUALITY})")
+    parser.add_argument("--crop-workers", type=int, help="Threads encoding crops (default: CPU count, at most 8)")
+    parser.add_argument("--crop-storage", choices=CROP_STORAGES, default="files", help="Write one file per crop (files, default), a single crops.pack archive per job (pack), or no crops at all, rendering them on request (virtual)")
+    parser.add_argument("--pyramids", action="store_true", help="Build deep-zoom tile pyramids of the input and result photos while writing each job (default: on first view in the Job Viewer)")
+    parser.add_argument("--no-dedupe", action="store_true", help="Always run a new job, even for images already processed with the same model and settings")
+    parser.add_argument("--watch-workers", type=int, default=DEFAULT_WATCH_WORKERS, help=f"Worker threads sharing the model in --watch mode (default: {DEFAULT_WATCH_WORKERS})")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help=f"Maximum files waiting for a worker in --watch mode (default: {DEFAULT_QUEUE_SIZE})")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL, help=f"Seconds between hot-folder scans (default: {DEFAULT_POLL_INTERVAL:g})")
+    parser.add_argument("--settle-time", type=float, default=DEFAULT_SETTLE_TIME, help=f"Seconds a new file must stay unchanged before it is processed (default: {DEFAULT_SETTLE_TIME:g})")
+    parser.add_argument("--report-interval", type=float, default=DEFAULT_REPORT_INTERVAL, help=f"Seconds between --watch status lines (default: {DEFAULT_REPORT_INTERVAL:g})")
+    parser.add_argument("--sync-db", action="store_true", help="With --use-database, wait for each job's database log instead of writing it in the background")
+    parser.add_argument("--list-models", action="store_true", help="List available models (incl. INT8 variants and their quantization reports) and exit")
 
     args = parser.parse_args()
 
-    if not args.image and not args.image_dir:
-        parser.error("Either --image or --image-dir must be specified")
+    if args.list_models:
+        print_models(".")
+        return
+
+    if not args.model:
+        parser.error("--model is required")
+
+    if not args.image and not args.image_dir and not args.watch:
+        parser.error("One of --image, --image-dir or --watch must be specified")
 
     if not Path(args.model).exists():
         print(f"Error: Model file not found: {args.model}")
@@ -253,14 +639,43 @@ Examples:
         model_path=args.model,
         conf_threshold=args.conf,
         padding=args.padding,
-        use_database=args.use_database
+        use_database=args.use_database,
+        batch_size=args.batch_size,
+        tile_size=args.tile_size,
+        tile_overlap=args.tile_overlap,
+        backend=args.backend,
+        preprocess_order=args.preprocess_order,
+        dedupe=not args.no_dedupe,
+        crop_format=args.crop_format,
+        crop_quality=args.crop_quality,
+        crop_workers=args.crop_workers,
+        crop_storage=args.crop_storage,
+        pyramids=args.pyramids,
+        async_db=not args.sync_db
     )
 
+    if args.watch:
+        pipeline.watch(
+            args.watch,
+            output_base_dir=args.output_dir,
+            workers=args.watch_workers,
+            queue_size=args.queue_size,
+            poll_interval=args.poll_interval,
+            settle_time=args.settle_time,
+            report_interval=args.report_interval
+        )
+        pipeline.close()
+        return
+
     pipeline.run_pipeline(
         image_path=args.image,
         image_dir=args.image_dir,
-        output_base_dir=args.output_dir
+        output_base_dir=args.output_dir,
+        workers=args.workers
     )
+    pipeline.close()
+    stats = pipeline.last_run_stats
+    print_throughput(stats['images'], stats['seconds'], stats['workers'], stats['failed'])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+INT8 Model Quantization
+Produces INT8 variants of the ONNX detection models (smd_comp.int8.onnx,
+ic_detect_best.int8.onnx) with ONNX Runtime static quantization,
+calibrated on the input photos already stored under jobs/, and writes a
+report comparing latency and detection agreement against the FP32 model.
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import numpy as np
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    from onnxruntime.quantization import CalibrationDataReader
+except ImportError:
+    CalibrationDataReader = object
+
+try:
+    from onnx_backend import OnnxYoloModel
+    from boxes import iou_matrix, match_greedy
+    from detect import load_image_with_exif
+    from model_registry import quantized_model_path, quantization_report_path, print_models
+except ImportError:  # imported as part of the ``src`` package
+    from .onnx_backend import OnnxYoloModel
+    from .boxes import iou_matrix, match_greedy
+    from .detect import load_image_with_exif
+    from .model_registry import quantized_model_path, quantization_report_path, print_models
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+CALIBRATION_METHODS = ('minmax', 'entropy', 'percentile')
+
+
+def find_job_inputs(jobs_dir: str = "jobs") -> List[Path]:
+    """
+    Return the original input photos of past jobs (``jobs/*/input.*``).
+
+    Args:
+        jobs_dir: Base directory of the job folders
+
+    Returns:
+        Sorted list of image paths
+    """
+    return sorted(
+        p for p in Path(jobs_dir).glob("*/input.*")
+        if p.suffix.lower() in IMAGE_EXTENSIONS
+    )
+
+
+class JobCalibrationReader(CalibrationDataReader):
+    """
+    Feeds letterboxed job photos to the ONNX Runtime calibrator, one image
+    per call, preprocessed exactly as at inference time.
+    """
+
+    def __init__(self, model: OnnxYoloModel, image_paths: List[Path]):
+        self.model = model
+        self.image_paths = list(image_paths)
+        self._index = 0
+
+    def get_next(self) -> Optional[dict]:
+        while self._index < len(self.image_paths):
+            path = self.image_paths[self._index]
+            self._index += 1
+            try:
+                image = load_image_with_exif(str(path))
+            except Exception as e:
+                print(f"  Skipping {path}: {e}")
+                continue
+            tensor, _, _ = self.model._preprocess(image)
+            return {self.model.input_name: tensor[None]}
+        return None
+
+    def rewind(self) -> None:
+        self._index = 0
+
+
+def quantize_model(
+    model_path: str,
+    calibration_images: List[Path],
+    output_path: Optional[str] = None,
+    method: str = 'minmax',
+    per_channel: bool = False,
+) -> Path:
+    """
+    Quantize an ONNX model to INT8 (QDQ format, UINT8 activations, INT8
+    weights) using static calibration.
+
+    Args:
+        model_path: FP32 .onnx model
+        calibration_images: Photos used to collect activation ranges
+        output_path: Destination (default: <name>.int8.onnx next to the model)
+        method: Calibration method, 'minmax', 'entropy' or 'percentile'
+        per_channel: Quantize weights per output channel
+
+    Returns:
+        Path of the quantized model
+    """
+    try:
+        from onnxruntime.quantization import (quantize_static, QuantFormat,
+                                              QuantType, CalibrationMethod)
+        from onnxruntime.quantization.shape_inference import quant_pre_process
+    except ImportError as e:
+        raise ImportError(
+            "Quantization requires onnxruntime and onnx (pip install onnxruntime onnx)"
+        ) from e
+
+    if method not in CALIBRATION_METHODS:
+        raise ValueError(f"method must be one of {CALIBRATION_METHODS}, got '{method}'")
+    if not calibration_images:
+        raise ValueError("No calibration images found")
+
+    output_path = Path(output_path) if output_path else quantized_model_path(model_path)
+    reader = JobCalibrationReader(OnnxYoloModel(model_path), calibration_images)
+    calibrate_method = {
+        'minmax': CalibrationMethod.MinMax,
+        'entropy': CalibrationMethod.Entropy,
+        'percentile': CalibrationMethod.Percentile,
+    }[method]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Shape inference + graph cleanup makes more nodes quantizable
+        prepared = Path(tmp) / "prepared.onnx"
+        try:
+            quant_pre_process(str(model_path), str(prepared), skip_symbolic_shape=True)
+        except Exception as e:
+            print(f"  Warning: pre-processing failed ({e}); quantizing the model as is")
+            prepared = Path(model_path)
+
+        quantize_static(
+            str(prepared),
+            str(output_path),
+            reader,
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=per_channel,
+            calibrate_method=calibrate_method,
+        )
+
+    _copy_metadata(model_path, output_path)
+    return output_path
+
+
+def _copy_metadata(source: str, target: Path) -> None:
+    """Carry the exporter metadata (class names, imgsz) over to the INT8 model."""
+    import onnx
+
+    src = onnx.load(str(source), load_external_data=False)
+    dst = onnx.load(str(target))
+    present = {p.key for p in dst.metadata_props}
+    for prop in src.metadata_props:
+        if prop.key not in present:
+            dst.metadata_props.add(key=prop.key, value=prop.value)
+    onnx.save(dst, str(target))
+
+
+def detection_agreement(reference: List[dict], candidate: List[dict], threshold: float = 0.5) -> int:
+    """
+    Count one-to-one matches between two detection lists (same class,
+    IoU >= ``threshold``).
+    """
+    matched = 0
+    for cls in {d['class_name'] for d in reference} & {d['class_name'] for d in candidate}:
+        a = [d['bbox'] for d in reference if d['class_name'] == cls]
+        b = [d['bbox'] for d in candidate if d['class_name'] == cls]
+        matched += len(match_greedy(iou_matrix(a, b), threshold))
+    return matched
+
+
+def _latency_summary(latencies: List[float]) -> dict:
+    values = np.asarray(latencies)
+    return {
+        'mean_ms': round(float(values.mean()), 2),
+        'p50_ms': round(float(np.percentile(values, 50)), 2),
+        'p95_ms': round(float(np.percentile(values, 95)), 2),
+    }
+
+
+def compare_models(
+    fp32_path: str,
+    int8_path: str,
+    images: List[Path],
+    conf: float = 0.25,
+    threads: Optional[int] = None,
+) -> dict:
+    """
+    Run the FP32 and INT8 models on the same images and compare them.
+
+    Agreement is ``2 * matched / (fp32 detections + int8 detections)``,
+    so it drops both for missed and for extra detections.
+
+    Args:
+        fp32_path: Reference model
+        int8_path: Quantized model
+        images: Evaluation photos
+        conf: Confidence threshold for both models
+        threads: Intra-op threads for both sessions (None = ORT default)
+
+    Returns:
+        Dict with per-model latency and detection counts, matched and agreement
+    """
+    models = {
+        'fp32': OnnxYoloModel(fp32_path, intra_op_threads=threads),
+        'int8': OnnxYoloModel(str(int8_path), intra_op_threads=threads),
+    }
+    latencies = {name: [] for name in models}
+    counts = {name: 0 for name in models}
+    matched = 0
+
+    for path in images:
+        image = load_image_with_exif(str(path))
+        detections = {}
+        for name, model in models.items():
+            model(image, conf=conf)  # warm caches so both are timed alike
+            start = time.perf_counter()
+            result = model(image, conf=conf)[0]
+            latencies[name].append((time.perf_counter() - start) * 1000)
+            detections[name] = result.to_detections()
+            counts[name] += len(detections[name])
+        matched += detection_agreement(detections['fp32'], detections['int8'])
+
+    total = counts['fp32'] + counts['int8']
+    return {
+        'fp32': dict(_latency_summary(latencies['fp32']), detections=counts['fp32']),
+        'int8': dict(_latency_summary(latencies['int8']), detections=counts['int8']),
+        'matched': matched,
+        'agreement': round(2 * matched / total, 4) if total else 1.0,
+    }
+
+
+def quantize_and_report(
+    model_path: str,
+    jobs_dir: str = "jobs",
+    max_calibration: int = 200,
+    eval_images: int = 20,
+    method: str = 'minmax',
+    per_channel: bool = False,
+    conf: float = 0.25,
+    min_agreement: float = 0.95,
+    threads: Optional[int] = None,
+    seed: int = 0,
+) -> dict:
+    """
+    Quantize one model and write ``<name>.int8.report.json`` next to it.
+
+    Calibration and evaluation use disjoint samples of the job photos when
+    there are enough of them.
+
+    Returns:
+        The report dictionary
+    """
+    inputs = find_job_inputs(jobs_dir)
+    if not inputs:
+        raise ValueError(f"No job input photos found under {jobs_dir}/*/input.*")
+    rng = random.Random(seed)
+    shuffled = inputs[:]
+    rng.shuffle(shuffled)
+    calibration = shuffled[:max_calibration]
+    held_out = shuffled[max_calibration:]
+    evaluation = (held_out or calibration)[:eval_images]
+
+    print(f"Quantizing {model_path} ({len(calibration)} calibration images, method={method})...")
+    start = time.perf_counter()
+    int8_path = quantize_model(model_path, calibration, method=method, per_channel=per_channel)
+    quantize_s = time.perf_counter() - start
+    print(f"  Wrote {int8_path} in {quantize_s:.1f} s")
+
+    print(f"  Comparing against FP32 on {len(evaluation)} images...")
+    comparison = compare_models(model_path, int8_path, evaluation, conf=conf, threads=threads)
+    speedup = comparison['fp32']['mean_ms'] / max(comparison['int8']['mean_ms'], 1e-9)
+
+    report = {
+        'model': str(model_path),
+        'quantized_model': str(int8_path),
+        'created_at': datetime.now().isoformat(),
+        'calibration_images': len(calibration),
+        'eval_images': len(evaluation),
+        'eval_held_out': bool(held_out),
+        'settings': {
+            'method': method,
+            'per_channel': per_channel,
+            'conf': conf,
+            'threads': threads,
+        },
+        'fp32_size_mb': round(Path(model_path).stat().st_size / (1024 * 1024), 2),
+        'int8_size_mb': round(Path(int8_path).stat().st_size / (1024 * 1024), 2),
+        **comparison,
+        'speedup': round(speedup, 3),
+        'min_agreement': min_agreement,
+        'passed': comparison['agreement'] >= min_agreement,
+    }
+
+    report_path = quantization_report_path(int8_path)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    status = "PASSED" if report['passed'] else "FAILED"
+    print(f"  FP32 {comparison['fp32']['mean_ms']:.1f} ms | INT8 {comparison['int8']['mean_ms']:.1f} ms "
+          f"| speedup {speedup:.2f}x | agreement {comparison['agreement']:.3f} "
+          f"(min {min_agreement}) -> {status}")
+    print(f"  Report: {report_path}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Create INT8 variants of the ONNX detection models, calibrated on past job photos",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python quantize.py
+  python quantize.py --model smd_comp.onnx --jobs-dir jobs --max-calibration 300
+  python quantize.py --method percentile --per-channel --min-agreement 0.97
+  python quantize.py --list-models
+        """
+    )
+    parser.add_argument("--model", type=str, nargs="+",
+                        help="FP32 .onnx model(s) to quantize (default: smd_comp.onnx and ic_detect_best.onnx when present)")
+    parser.add_argument("--jobs-dir", type=str, default="jobs", help="Job folders holding the calibration photos (default: jobs)")
+    parser.add_argument("--max-calibration", type=int, default=200, help="Maximum calibration images (default: 200)")
+    parser.add_argument("--eval-images", type=int, default=20, help="Images used for the FP32/INT8 comparison (default: 20)")
+    parser.add_argument("--method", choices=CALIBRATION_METHODS, default="minmax", help="Calibration method (default: minmax)")
+    parser.add_argument("--per-channel", action="store_true", help="Quantize weights per output channel")
+    parser.add_argument("--conf", type=float, default=0.25, help="Confidence threshold for the comparison (default: 0.25)")
+    parser.add_argument("--min-agreement", type=float, default=0.95, help="Agreement needed to pass (default: 0.95)")
+    parser.add_argument("--threads", type=int, help="Intra-op threads used for timing (default: runtime default)")
+    parser.add_argument("--list-models", action="store_true", help="List available models (incl. INT8 variants) and exit")
+
+    args = parser.parse_args()
+
+    if args.list_models:
+        print_models(".")
+        return
+
+    model_paths = args.model or [m for m in ("smd_comp.onnx", "ic_detect_best.onnx") if Path(m).exists()]
+    if not model_paths:
+        parser.error("No .onnx model found; pass --model")
+
+    failed = False
+    for model_path in model_paths:
+        if not Path(model_path).exists():
+            print(f"Error: Model file not found: {model_path}")
+            failed = True
+            continue
+        report = quantize_and_report(
+            model_path,
+            jobs_dir=args.jobs_dir,
+            max_calibration=args.max_calibration,
+            eval_images=args.eval_images,
+            method=args.method,
+            per_channel=args.per_channel,
+            conf=args.conf,
+            min_agreement=args.min_agreement,
+            threads=args.threads,
+        )
+        failed = failed or not report['passed']
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
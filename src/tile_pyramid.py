@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Tile Pyramid
+Multi-resolution (deep-zoom) tiles of a job's input and result photos.
+Level 0 is the full-resolution image; each further level halves both
+sides until the whole image fits in one tile. Viewing an image then only
+decodes a downscaled overview, or the few tiles of the region being
+zoomed into, instead of the full-resolution photo on every rerun.
+
+Layout (``<job>/tiles/<image stem>/``):
+    pyramid.json              — size, tile size, per-level grid
+    <level>/<col>_<row>.jpg   — tile_size x tile_size tiles (smaller at the edges)
+
+Usage:
+    python src/tile_pyramid.py jobs/<job>/input.jpg jobs/<job>/result.jpg
+"""
+
+import argparse
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+try:
+    from crop import CropEngine
+    from detect import load_image_with_exif
+except ImportError:  # imported as part of the ``src`` package
+    from .crop import CropEngine
+    from .detect import load_image_with_exif
+
+
+PYRAMID_DIRNAME = "tiles"
+MANIFEST_NAME = "pyramid.json"
+
+DEFAULT_TILE_SIZE = 512
+DEFAULT_TILE_QUALITY = 85
+
+
+def pyramid_dir(image_path: str) -> Path:
+    """Pyramid folder of a job image: ``<job>/tiles/<image stem>``."""
+    image_path = Path(image_path)
+    return image_path.parent / PYRAMID_DIRNAME / image_path.stem
+
+
+def build_pyramid(
+    image_path: str,
+    output_dir: Optional[str] = None,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    quality: int = DEFAULT_TILE_QUALITY,
+    image: Optional[np.ndarray] = None
+) -> "TilePyramid":
+    """
+    Build the tile pyramid of an image.
+
+    Args:
+        image_path: Source image
+        output_dir: Pyramid folder (default: :func:`pyramid_dir`)
+        tile_size: Tile side in pixels
+        quality: JPEG quality of the tiles
+        image: The decoded image, if already in memory (skips decoding)
+
+    Returns:
+        The built pyramid
+    """
+    output_dir = Path(output_dir) if output_dir else pyramid_dir(image_path)
+    if image is None:
+        image = load_image_with_exif(str(image_path))
+    height, width = image.shape[:2]
+    n_levels = max(0, math.ceil(math.log2(max(width, height) / tile_size))) + 1
+    engine = CropEngine(padding=0, image_format="jpg", quality=quality)
+
+    levels = []
+    level_image = image
+    for level in range(n_levels):
+        if level:
+            h, w = level_image.shape[:2]
+            level_image = cv2.resize(level_image, ((w + 1) // 2, (h + 1) // 2),
+                                     interpolation=cv2.INTER_AREA)
+        h, w = level_image.shape[:2]
+        cols, rows = math.ceil(w / tile_size), math.ceil(h / tile_size)
+        level_dir = output_dir / str(level)
+        level_dir.mkdir(parents=True, exist_ok=True)
+        boxes, paths = [], []
+        for row in range(rows):
+            for col in range(cols):
+                x, y = col * tile_size, row * tile_size
+                boxes.append([x, y, min(w, x + tile_size), min(h, y + tile_size)])
+                paths.append(level_dir / f"{col}_{row}.jpg")
+        engine.save_crops(level_image, boxes, paths)
+        levels.append({'level': level, 'width': w, 'height': h, 'cols': cols, 'rows': rows})
+
+    manifest = {'width': width, 'height': height, 'tile_size': tile_size, 'levels': levels}
+    # Written last: a folder without a manifest is an interrupted build
+    tmp = output_dir / f"{MANIFEST_NAME}.{os.getpid()}.{threading.get_ident()}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp, output_dir / MANIFEST_NAME)
+    return TilePyramid(str(output_dir))
+
+
+def ensure_pyramid(image_path: str, **kwargs) -> "TilePyramid":
+    """Open the pyramid of ``image_path``, building it on first use."""
+    directory = pyramid_dir(image_path)
+    if (directory / MANIFEST_NAME).exists():
+        return TilePyramid(str(directory))
+    return build_pyramid(image_path, str(directory), **kwargs)
+
+
+class TilePyramid:
+    """
+    Read access to a tile pyramid.
+
+    Example:
+        pyramid = ensure_pyramid("jobs/board_20250101_120000/result.jpg")
+        overview = pyramid.overview(1600)                    # whole image, <= 1600 px
+        detail = pyramid.region(1000, 800, 1500, 1100, 1600)  # full-res coordinates
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Pyramid folder (contains pyramid.json)
+        """
+        self.directory = Path(directory)
+        with open(self.directory / MANIFEST_NAME) as f:
+            manifest = json.load(f)
+        self.width: int = manifest['width']
+        self.height: int = manifest['height']
+        self.tile_size: int = manifest['tile_size']
+        self.levels: List[dict] = manifest['levels']
+
+    def _tile(self, level: int, col: int, row: int) -> np.ndarray:
+        path = self.directory / str(level) / f"{col}_{row}.jpg"
+        tile = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if tile is None:
+            raise ValueError(f"Missing pyramid tile: {path}")
+        return tile
+
+    def region(self, x0: float, y0: float, x1: float, y1: float, max_size: int = 1600) -> np.ndarray:
+        """
+        Render a region of the image from the coarsest sufficient level.
+
+        Args:
+            x0, y0, x1, y1: Region in full-resolution pixel coordinates
+            max_size: Longest side of the returned image
+
+        Returns:
+            BGR image of the region, at most ``max_size`` on its longest side
+        """
+        x0, y0 = max(0.0, x0), max(0.0, y0)
+        x1, y1 = min(float(self.width), x1), min(float(self.height), y1)
+        if x1 <= x0 or y1 <= y0:
+            raise ValueError(f"Empty region ({x0}, {y0}, {x1}, {y1})")
+        # Coarsest level that still has at least max_size pixels across the region
+        factor = max(x1 - x0, y1 - y0) / max_size
+        level = min(len(self.levels) - 1, max(0, int(math.floor(math.log2(factor))) if factor > 1 else 0))
+        info = self.levels[level]
+        scale = 2 ** level
+
+        lx0, ly0 = int(x0 / scale), int(y0 / scale)
+        lx1 = min(info['width'], max(lx0 + 1, math.ceil(x1 / scale)))
+        ly1 = min(info['height'], max(ly0 + 1, math.ceil(y1 / scale)))
+        ts = self.tile_size
+        c0, c1 = lx0 // ts, (lx1 - 1) // ts
+        r0, r1 = ly0 // ts, (ly1 - 1) // ts
+
+        canvas = np.empty(((r1 - r0 + 1) * ts, (c1 - c0 + 1) * ts, 3), dtype=np.uint8)
+        for row in range(r0, r1 + 1):
+            for col in range(c0, c1 + 1):
+                tile = self._tile(level, col, row)
+                y, x = (row - r0) * ts, (col - c0) * ts
+                canvas[y:y + tile.shape[0], x:x + tile.shape[1]] = tile
+        out = canvas[ly0 - r0 * ts:ly1 - r0 * ts, lx0 - c0 * ts:lx1 - c0 * ts]
+
+        longest = max(out.shape[:2])
+        if longest > max_size:
+            k = max_size / longest
+            out = cv2.resize(out, (max(1, round(out.shape[1] * k)), max(1, round(out.shape[0] * k))),
+                             interpolation=cv2.INTER_AREA)
+        return np.ascontiguousarray(out)
+
+    def overview(self, max_size: int = 1600) -> np.ndarray:
+        """The whole image, at most ``max_size`` on its longest side."""
+        return self.region(0, 0, self.width, self.height, max_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build deep-zoom tile pyramids of job images")
+    parser.add_argument("images", nargs="+", help="Images to tile (e.g. jobs/<job>/input.jpg)")
+    parser.add_argument("--tile-size", type=int, default=DEFAULT_TILE_SIZE,
+                        help=f"Tile side in pixels (default: {DEFAULT_TILE_SIZE})")
+    parser.add_argument("--quality", type=int, default=DEFAULT_TILE_QUALITY,
+                        help=f"JPEG quality of the tiles (default: {DEFAULT_TILE_QUALITY})")
+    args = parser.parse_args()
+
+    for image_path in args.images:
+        pyramid = build_pyramid(image_path, tile_size=args.tile_size, quality=args.quality)
+        tiles = sum(level['cols'] * level['rows'] for level in pyramid.levels)
+        print(f"{image_path}: {len(pyramid.levels)} levels, {tiles} tiles -> {pyramid.directory}")
+
+
+if __name__ == "__main__":
+    main()
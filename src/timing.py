@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Stage Timing
+Lightweight per-stage wall-clock instrumentation (time.perf_counter) for
+the detection pipeline and the Photo Booth flow. Durations are recorded
+in milliseconds and end up in the ``timings`` block of metadata.json and
+in the timing columns of log_jobs.
+"""
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Optional
+
+
+# Canonical stage order (other names are kept, listed after these)
+STAGES = (
+    'dedupe', 'cache_lookup', 'decode', 'exif_transpose', 'preprocess', 'inference', 'parse',
+    'ic_inference', 'ic_parse', 'cross_reference',
+    'annotate', 'crop', 'encode', 'pyramid', 'metadata', 'db_log',
+)
+
+
+class StageTimer:
+    """
+    Accumulates durations per named stage.
+
+    Time spent in the same stage several times (e.g. one ``encode`` per
+    crop) is summed. ``total`` is the wall time since the timer was
+    created, so it also covers untimed gaps between stages.
+
+    Example:
+        timer = StageTimer()
+        with timer.stage('decode'):
+            image = load(...)
+        timer.as_dict()  # {'decode': 12.3, 'total': 12.4}
+    """
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._durations: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Context manager timing the enclosed block as stage ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def add(self, name: str, ms: float) -> None:
+        """Add ``ms`` milliseconds to stage ``name`` (thread-safe)."""
+        with self._lock:
+            self._durations[name] = self._durations.get(name, 0.0) + ms
+
+    def merge(self, other: "StageTimer", prefix: str = '') -> None:
+        """Add every stage of ``other`` to this timer, optionally prefixed."""
+        for name, ms in other._durations.items():
+            self.add(prefix + name, ms)
+
+    def get(self, name: str) -> float:
+        """Return the accumulated milliseconds of stage ``name`` (0 if never timed)."""
+        return self._durations.get(name, 0.0)
+
+    def as_dict(self, total: bool = True) -> Dict[str, float]:
+        """
+        Return the stages in canonical order, rounded to 0.01 ms.
+
+        Args:
+            total: Append the wall time since creation as ``total``
+        """
+        with self._lock:
+            durations = dict(self._durations)
+        ordered = [s for s in STAGES if s in durations]
+        ordered += [s for s in durations if s not in STAGES]
+        result = {name: round(durations[name], 2) for name in ordered}
+        if total:
+            result['total'] = round((time.perf_counter() - self._start) * 1000, 2)
+        return result
+
+
+def timed(timer: Optional[StageTimer], name: str):
+    """Return ``timer.stage(name)``, or a no-op context when ``timer`` is None."""
+    return timer.stage(name) if timer is not None else nullcontext()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Virtual Crops
+Crops rendered on request from a job's ``input.*`` photo and the boxes in
+its metadata.json, for jobs processed with ``crop_storage='virtual'``.
+Such jobs write no crop files at all; a crop is cut and encoded only when
+someone looks at it, and written to disk only when exported.
+
+Decoded input photos are kept in a small process-wide LRU (bounded in
+megabytes), so browsing the crops of a job decodes its photo once.
+
+A virtual crop is addressed as ``<job>/metadata.json#<index>`` (the
+``crop_file`` of each detection is ``metadata.json#<index>``), alongside
+``crops.pack#N`` archive references and plain image paths; :func:`load_crop`
+reads all three.
+
+Usage:
+    python src/virtual_crops.py export jobs/<job> [--output-dir DIR] [--pack]
+"""
+
+import argparse
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+try:
+    from crop import CropEngine, DEFAULT_CROP_QUALITY, crop_view
+    from crop_archive import PACK_NAME, read_crop, split_ref
+    from detect import load_image_with_exif
+except ImportError:  # imported as part of the ``src`` package
+    from .crop import CropEngine, DEFAULT_CROP_QUALITY, crop_view
+    from .crop_archive import PACK_NAME, read_crop, split_ref
+    from .detect import load_image_with_exif
+
+
+METADATA_NAME = "metadata.json"
+
+# Memory budget of the decoded-input LRU, in megabytes (a 12 MP photo
+# takes 36 MB decoded)
+DEFAULT_MAX_MB = 256
+
+
+class DecodedImageCache:
+    """LRU of decoded images keyed by (path, mtime, size), bounded in bytes."""
+
+    def __init__(self, max_mb: float = DEFAULT_MAX_MB):
+        """
+        Args:
+            max_mb: Memory budget in megabytes; least recently used images
+                    are dropped once the total exceeds it
+        """
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._images: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, image_path: str) -> np.ndarray:
+        """Decoded (EXIF-corrected) BGR image; read-only, shared between callers."""
+        path = Path(image_path).resolve()
+        st = path.stat()
+        key = (str(path), st.st_mtime_ns, st.st_size)
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+        image = load_image_with_exif(str(path))
+        image.flags.writeable = False
+        with self._lock:
+            self._images[key] = image
+            self._images.move_to_end(key)
+            total = sum(img.nbytes for img in self._images.values())
+            while total > self.max_bytes and len(self._images) > 1:
+                _, dropped = self._images.popitem(last=False)
+                total -= dropped.nbytes
+        return image
+
+    def clear(self) -> None:
+        with self._lock:
+            self._images.clear()
+
+    def stats(self) -> dict:
+        """Return hit / miss counters and the memory in use."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'images': len(self._images),
+                'size_mb': round(sum(img.nbytes for img in self._images.values()) / (1024 * 1024), 1),
+                'max_mb': round(self.max_bytes / (1024 * 1024), 1),
+            }
+
+
+_input_cache: Optional[DecodedImageCache] = None
+_input_cache_lock = threading.Lock()
+
+
+def get_input_cache() -> DecodedImageCache:
+    """Return the process-wide decoded-input cache, creating it on first use."""
+    global _input_cache
+    with _input_cache_lock:
+        if _input_cache is None:
+            _input_cache = DecodedImageCache()
+        return _input_cache
+
+
+def _read_metadata(job_dir: Path) -> dict:
+    with open(job_dir / METADATA_NAME) as f:
+        return json.load(f)
+
+
+def _input_path(job_dir: Path) -> Path:
+    """The job's input.* photo."""
+    inputs = sorted(job_dir.glob("input.*"))
+    if not inputs:
+        raise FileNotFoundError(f"No input photo in {job_dir}")
+    return inputs[0]
+
+
+def _engine_for(metadata: dict, image_format: Optional[str] = None,
+                quality: Optional[int] = None) -> CropEngine:
+    """Crop engine reproducing the job's padding / format / quality."""
+    return CropEngine(
+        padding=int(metadata.get("crop_padding", 10)),
+        image_format=image_format or metadata.get("crop_format", "jpg"),
+        quality=quality or metadata.get("crop_quality", DEFAULT_CROP_QUALITY),
+    )
+
+
+def render_crop(job_dir: str, index: int, metadata: Optional[dict] = None) -> bytes:
+    """
+    Cut and encode crop ``index`` of a job from its input photo.
+
+    Args:
+        job_dir: Job folder
+        index: Detection index (position in metadata.json "detections")
+        metadata: The job's metadata, if already loaded
+
+    Returns:
+        Encoded image bytes in the job's crop format
+    """
+    job_dir = Path(job_dir)
+    metadata = metadata or _read_metadata(job_dir)
+    bbox = metadata["detections"][index]["bbox"]
+    engine = _engine_for(metadata)
+    image = get_input_cache().get(str(_input_path(job_dir)))
+    return engine.encode(crop_view(image, bbox, engine.padding))
+
+
+def load_crop(ref: str) -> bytes:
+    """
+    Encoded bytes of any crop reference: an image file, an archive entry
+    (``.../crops.pack#N``) or a virtual crop (``.../metadata.json#N``).
+    """
+    path, index = split_ref(ref)
+    if index is not None and Path(path).name == METADATA_NAME:
+        return render_crop(str(Path(path).parent), index)
+    return read_crop(ref)
+
+
+def export_crops(
+    job_dir: str,
+    output_dir: Optional[str] = None,
+    pack: bool = False,
+    image_format: Optional[str] = None,
+    quality: Optional[int] = None
+) -> List[str]:
+    """
+    Write the crops of a job to disk.
+
+    Exporting into the job folder itself (the default) also records the
+    written crops in its metadata.json, so the job then behaves like one
+    processed with ``crop_storage='files'`` (or ``'pack'``).
+
+    Args:
+        job_dir: Job folder
+        output_dir: Destination for the crop files (default: <job>/crops);
+                    ignored with ``pack``, which writes <job>/crops.pack
+        pack: Write a single crops.pack archive instead of files
+        image_format: 'jpg', 'png' or 'webp' (default: the job's format)
+        quality: JPEG / WebP quality (default: the job's quality)
+
+    Returns:
+        Paths (or archive references) of the written crops
+    """
+    job_dir = Path(job_dir)
+    metadata = _read_metadata(job_dir)
+    detections = metadata.get("detections", [])
+    engine = _engine_for(metadata, image_format, quality)
+    image = get_input_cache().get(str(_input_path(job_dir)))
+    names = [engine.filename(f"{d.get('index', i):03d}_{d['class_name']}")
+             for i, d in enumerate(detections)]
+    boxes = [d["bbox"] for d in detections]
+
+    if pack:
+        fields = [{"class_name": d["class_name"], "confidence": d.get("confidence"),
+                   "bbox": d["bbox"]} for d in detections]
+        refs = engine.pack_crops(image, boxes, job_dir / PACK_NAME, names, fields)
+        written, crop_files, storage = [str(job_dir / ref) for ref in refs], refs, "pack"
+    else:
+        crops_dir = Path(output_dir) if output_dir else job_dir / "crops"
+        crops_dir.mkdir(parents=True, exist_ok=True)
+        written = engine.save_crops(image, boxes, [crops_dir / name for name in names])
+        crop_files, storage = names, "files"
+
+    if pack or output_dir is None or Path(output_dir).resolve() == (job_dir / "crops").resolve():
+        for d, crop_file in zip(detections, crop_files):
+            d["crop_file"] = crop_file
+        metadata["crop_storage"] = storage
+        with open(job_dir / METADATA_NAME, "w") as f:
+            json.dump(metadata, f, indent=2)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the on-demand crops of a job to disk")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_export = sub.add_parser("export", help="Write every crop of a job")
+    p_export.add_argument("job_dir", type=str, help="Job folder (contains metadata.json)")
+    p_export.add_argument("--output-dir", type=str, help="Destination (default: <job>/crops)")
+    p_export.add_argument("--pack", action="store_true", help=f"Write a single {PACK_NAME} instead")
+    p_export.add_argument("--format", choices=["jpg", "png", "webp"], help="Crop format (default: the job's)")
+    p_export.add_argument("--quality", type=int, help="JPEG / WebP quality (default: the job's)")
+    args = parser.parse_args()
+
+    written = export_crops(args.job_dir, args.output_dir, args.pack, args.format, args.quality)
+    print(f"Exported {len(written)} crops from {args.job_dir}")
+
+
+if __name__ == "__main__":
+    main()
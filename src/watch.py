@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Hot Folder
+Continuous ingestion of photos dropped into a folder (e.g. by a camera
+station). The folder is polled with one ``os.scandir`` per interval; a
+new or replaced file is queued once its size and modification time have
+stayed unchanged for a settle period, so files still being copied are
+never read half-written. Queued files are processed by worker threads
+sharing a single pipeline (one model instance); the queue is bounded, so
+a burst of files waits on disk instead of in memory.
+
+Images already processed with the same model and settings are recognised
+by the pipeline's content-addressed dedupe and reuse their existing job,
+so restarting the watcher does not reprocess the folder.
+
+Usage:
+    python src/pipeline.py --model smd_comp.pt --watch /srv/camera/inbox
+"""
+
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_POLL_INTERVAL = 1.0    # seconds between folder scans
+DEFAULT_SETTLE_TIME = 2.0      # seconds a file must stay unchanged
+DEFAULT_REPORT_INTERVAL = 60.0  # seconds between status lines
+
+
+class HotFolderWatcher:
+    """
+    Watch a folder and feed new images to a pipeline.
+
+    Example:
+        pipeline = ComponentAnalysisPipeline("smd_comp.pt")
+        HotFolderWatcher(pipeline, "/srv/camera/inbox").run()   # until Ctrl+C
+    """
+
+    def __init__(
+        self,
+        pipeline,
+        folder: str,
+        output_base_dir: str = "jobs",
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        settle_time: float = DEFAULT_SETTLE_TIME,
+        report_interval: float = DEFAULT_REPORT_INTERVAL,
+        on_result: Optional[Callable[[str, dict], None]] = None
+    ):
+        """
+        Args:
+            pipeline: A ComponentAnalysisPipeline (its process_image is
+                      called from every worker thread)
+            folder: Folder to watch (not recursive)
+            output_base_dir: Base directory for job folders
+            workers: Worker threads; model calls are serialized by the
+                     detector where the backend requires it, so extra
+                     workers overlap decoding, cropping and I/O
+            queue_size: Maximum number of files waiting for a worker
+            poll_interval: Seconds between folder scans
+            settle_time: Seconds a file's size and mtime must stay unchanged
+                         before it is considered completely written
+            report_interval: Seconds between status lines (0 = never)
+            on_result: Called as ``on_result(path, result)`` after each file
+        """
+        self.pipeline = pipeline
+        self.folder = Path(folder)
+        self.output_base_dir = output_base_dir
+        self.workers = max(1, int(workers))
+        self.queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=max(1, int(queue_size)))
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self.report_interval = report_interval
+        self.on_result = on_result
+
+        # path -> (size, mtime_ns, monotonic time the signature was first seen)
+        self._pending: Dict[str, Tuple[int, int, float]] = {}
+        # path -> (size, mtime_ns) of the version already queued
+        self._queued: Dict[str, Tuple[int, int]] = {}
+        self._threads = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.reused = 0
+        self.failed = 0
+        self.busy = 0
+        self._busy_seconds = 0.0
+        self._last_report = (time.monotonic(), 0)
+
+    # ------------------------------------------------------------------
+    # Folder scanning
+    # ------------------------------------------------------------------
+
+    def scan(self) -> int:
+        """
+        Scan the folder once and queue files that have settled.
+
+        Returns:
+            Number of files queued by this scan
+        """
+        now = time.monotonic()
+        seen = set()
+        queued = 0
+        full = False
+        try:
+            entries = list(os.scandir(self.folder))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            if entry.name.startswith('.') or not entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+            except OSError:  # removed between listing and stat
+                continue
+            path = entry.path
+            seen.add(path)
+            signature = (st.st_size, st.st_mtime_ns)
+            if self._queued.get(path) == signature:
+                continue
+            pending = self._pending.get(path)
+            if pending is None or pending[:2] != signature:
+                # New file, or still growing: restart its settle clock
+                self._pending[path] = (*signature, now)
+                if self.settle_time > 0 or st.st_size == 0:
+                    continue
+            elif now - pending[2] < self.settle_time or st.st_size == 0:
+                continue
+            if full:
+                continue
+            try:
+                self.queue.put_nowait(path)
+            except queue.Full:
+                # Left pending; retried on the next scan once workers catch up
+                full = True
+                continue
+            self._queued[path] = signature
+            del self._pending[path]
+            queued += 1
+
+        # Forget files that were moved away or deleted
+        for path in list(self._pending):
+            if path not in seen:
+                del self._pending[path]
+        for path in list(self._queued):
+            if path not in seen:
+                del self._queued[path]
+        return queued
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _worker(self) -> None:
+        while True:
+            path = self.queue.get()
+            if path is None:
+                self.queue.task_done()
+                return
+            with self._lock:
+                self.busy += 1
+            start = time.perf_counter()
+            result, ok = None, False
+            try:
+                result = self.pipeline.process_image(path, jobs_base_dir=self.output_base_dir)
+                ok = True
+            except Exception as e:
+                print(f"Error processing {path}: {e}")
+            finally:
+                with self._lock:
+                    self.busy -= 1
+                    self._busy_seconds += time.perf_counter() - start
+                    if not ok:
+                        self.failed += 1
+                    else:
+                        self.processed += 1
+                        if result.get("reused"):
+                            self.reused += 1
+                self.queue.task_done()
+            if ok and self.on_result is not None:
+                self.on_result(path, result)
+
+    def start(self) -> None:
+        """Start the worker threads."""
+        if self._threads:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"watch-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """Finish the queued files and stop the worker threads."""
+        self._stop.set()
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        """Counters, queue depth and throughput since the last report."""
+        with self._lock:
+            done = self.processed + self.failed
+            busy_seconds = self._busy_seconds
+            stats = {
+                'processed': self.processed,
+                'reused': self.reused,
+                'failed': self.failed,
+                'busy': self.busy,
+                'queued': self.queue.qsize(),
+                'queue_size': self.queue.maxsize,
+                'pending': len(self._pending),
+            }
+        since, done_before = self._last_report
+        elapsed = max(time.monotonic() - since, 1e-9)
+        stats['images_per_min'] = round((done - done_before) * 60.0 / elapsed, 2)
+        stats['avg_seconds'] = round(busy_seconds / done, 2) if done else None
+        return stats
+
+    def report(self) -> dict:
+        """Print a status line and restart the throughput window."""
+        stats = self.stats()
+        print(f"[watch] {self.folder}: queue {stats['queued']}/{stats['queue_size']}, "
+              f"{stats['pending']} settling, {stats['busy']} busy | "
+              f"{stats['processed']} done ({stats['reused']} reused), {stats['failed']} failed | "
+              f"{stats['images_per_min']} images/min")
+        with self._lock:
+            self._last_report = (time.monotonic(), self.processed + self.failed)
+        return stats
+
+    # ------------------------------------------------------------------
+    # Main loop
+    # ------------------------------------------------------------------
+
+    def run(self, duration: Optional[float] = None) -> dict:
+        """
+        Watch until interrupted (Ctrl+C) or ``duration`` seconds have passed.
+
+        Returns:
+            Final statistics
+        """
+        print(f"Watching {self.folder} ({self.workers} workers, queue {self.queue.maxsize}, "
+              f"settle {self.settle_time:g}s) — Ctrl+C to stop")
+        self.start()
+        started = last_report = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                self.scan()
+                now = time.monotonic()
+                if self.report_interval and now - last_report >= self.report_interval:
+                    self.report()
+                    last_report = now
+                if duration is not None and now - started >= duration:
+                    break
+                self._stop.wait(self.poll_interval)
+        except KeyboardInterrupt:
+            print("\nStopping watcher (finishing queued files)...")
+        finally:
+            self.stop()
+        return self.report()
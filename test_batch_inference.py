@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test script for batched inference with a model that fails on some
+images: the failing image is reported and skipped, the rest of the
+batch and of the run still complete.
+
+Usage:
+    python test_batch_inference.py
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from detect import ComponentDetector
+from model_registry import ModelRegistry
+from onnx_backend import OnnxResult
+from pipeline import ComponentAnalysisPipeline
+
+
+class _PickyModel:
+    """One box per image; raises for (nearly) black inputs, like a corrupt frame."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, inputs, verbose=False, conf=0.25, imgsz=640):
+        batch = inputs if isinstance(inputs, list) else [inputs]
+        self.calls.append(len(batch))
+        if any(image.mean() < 10 for image in batch):
+            raise RuntimeError("bad input")
+        return [OnnxResult(np.array([[10.0, 10.0, 60.0, 50.0]], dtype=np.float32),
+                           np.array([0.9], dtype=np.float32), np.array([0]),
+                           {0: 'IC'}, image)
+                for image in batch]
+
+
+class _PickyRegistry(ModelRegistry):
+    def __init__(self, model):
+        super().__init__(warmup=False)
+        self.model = model
+
+    def _load(self, model_path, backend, intra_op_threads, inter_op_threads):
+        return self.model
+
+
+def _images(folder, names=("a", "b", "c", "d")):
+    rng = np.random.default_rng(0)
+    for name in names:
+        image = (rng.random((640, 640, 3)) * 255).astype(np.uint8)
+        if name == "b":
+            image[:] = 0
+        cv2.imwrite(str(Path(folder) / f"{name}.png"), image)
+
+
+def _weights(tmp):
+    weights = Path(tmp) / "model.pt"
+    weights.write_bytes(b"\0")
+    return str(weights)
+
+
+def test_batch_detect_skips_only_the_failing_image():
+    with tempfile.TemporaryDirectory() as tmp:
+        images = Path(tmp) / "images"
+        images.mkdir()
+        _images(images)
+        model = _PickyModel()
+        detector = ComponentDetector(_weights(tmp), registry=_PickyRegistry(model))
+        out = Path(tmp) / "out"
+        detections = detector.batch_detect(str(images), output_dir=str(out), batch_size=2)
+        assert sorted(Path(p).stem for p in detections) == ["a", "c", "d"]
+        assert detector.last_run_stats['failed'] == 1
+        assert len(json.loads((out / "detections.json").read_text())) == 3
+        # The failing pair was retried per image; batching stays enabled
+        assert 1 in model.calls and detector._batch_supported
+
+
+def test_iter_batches_reports_model_errors_per_image():
+    with tempfile.TemporaryDirectory() as tmp:
+        _images(tmp, names=("a", "b"))
+        detector = ComponentDetector(_weights(tmp), registry=_PickyRegistry(_PickyModel()))
+        (paths, images, dets, errors), = detector.iter_batches(
+            [Path(tmp) / "a.png", Path(tmp) / "b.png"], batch_size=2)
+        assert errors[0] is None and len(dets[0]) == 1
+        assert isinstance(errors[1], RuntimeError) and dets[1] == [] and images[1] is not None
+
+
+def test_pipeline_keeps_running_after_a_model_error():
+    with tempfile.TemporaryDirectory() as tmp:
+        images = Path(tmp) / "images"
+        images.mkdir()
+        _images(images)
+        pipeline = ComponentAnalysisPipeline(_weights(tmp), registry=_PickyRegistry(_PickyModel()))
+        results = pipeline.run_pipeline(image_dir=str(images), output_base_dir=str(Path(tmp) / "jobs"),
+                                        batch_size=2)
+        assert sorted(Path(r["metadata"]["original_name"]).stem for r in results) == ["a", "c", "d"]
+        assert pipeline.last_run_stats['failed'] == 1
+
+
+def test_jobs_record_their_share_of_batched_calls():
+    with tempfile.TemporaryDirectory() as tmp:
+        images = Path(tmp) / "images"
+        images.mkdir()
+        _images(images, names=("a", "c", "d", "e"))
+        pipeline = ComponentAnalysisPipeline(_weights(tmp), registry=_PickyRegistry(_PickyModel()))
+        jobs = Path(tmp) / "jobs"
+        results = pipeline.run_pipeline(image_dir=str(images), output_base_dir=str(jobs), batch_size=2)
+        assert [r["metadata"]["inference_calls"] for r in results] == [0.5] * 4
+        single = pipeline.process_image(str(images / "a.png"), jobs_base_dir=str(Path(tmp) / "single"))
+        assert single["metadata"]["inference_calls"] == 1
+
+
+if __name__ == "__main__":
+    print("Testing batched inference error isolation...")
+    print("=" * 60)
+    for test in (test_batch_detect_skips_only_the_failing_image,
+                 test_iter_batches_reports_model_errors_per_image,
+                 test_pipeline_keeps_running_after_a_model_error,
+                 test_jobs_record_their_share_of_batched_calls):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
+    print("✅ All batch inference tests passed!")
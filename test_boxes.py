@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounding-box utilities used by DualModelDetector
+(vectorized IoU matrix and one-to-one matching).
+
+Usage:
+    python test_boxes.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from boxes import iou_matrix, match_greedy, match_hungarian, batched_nms
+
+
+def test_iou_matrix():
+    a = [[0, 0, 10, 10], [20, 20, 30, 30]]
+    b = [[0, 0, 10, 10], [5, 0, 15, 10], [100, 100, 110, 110]]
+    iou = iou_matrix(a, b)
+    assert iou.shape == (2, 3)
+    assert abs(iou[0, 0] - 1.0) < 1e-9
+    assert abs(iou[0, 1] - 50 / 150) < 1e-9
+    assert iou[1].max() == 0.0
+    assert iou_matrix([], b).shape == (0, 3)
+
+
+def test_greedy_is_one_to_one():
+    # Two comp ICs overlap the same ic_detect box — only one may claim it
+    a = [[0, 0, 10, 10], [1, 0, 11, 10]]
+    b = [[0, 0, 10, 10]]
+    matches = match_greedy(iou_matrix(a, b), 0.5)
+    assert matches == [(0, 0)]
+
+
+def test_hungarian_maximises_total_iou():
+    # Every row has a partner above the threshold — all must be matched
+    a = [[0, 0, 10, 10], [0, 0, 10, 12]]
+    b = [[0, 0, 10, 11], [0, 0, 10, 8]]
+    iou = iou_matrix(a, b)
+    assert len(match_hungarian(iou, 0.5)) == 2
+    assert all(iou[r, c] >= 0.5 for r, c in match_hungarian(iou, 0.5))
+
+
+def test_batched_nms_is_class_aware():
+    boxes = [[0, 0, 10, 10], [1, 0, 11, 10], [0, 0, 10, 10]]
+    scores = [0.9, 0.8, 0.7]
+    classes = [0, 0, 1]
+    # Box 1 is suppressed by box 0 (same class); box 2 survives (other class)
+    assert batched_nms(boxes, scores, classes, 0.5).tolist() == [0, 2]
+
+
+if __name__ == "__main__":
+    print("Testing bounding-box utilities...")
+    print("=" * 60)
+    for test in (test_iou_matrix, test_greedy_is_one_to_one,
+                 test_hungarian_maximises_total_iou, test_batched_nms_is_class_aware):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
+    print("✅ All box utility tests passed!")
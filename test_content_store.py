@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the content-addressed upload store (store-once objects,
+job keys, job links that survive only while the job folder exists).
+
+Usage:
+    python test_content_store.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from content_store import ContentStore, sha256_bytes, sha256_file
+from inference_cache import hash_file
+
+
+def test_objects_are_stored_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ContentStore(Path(tmp) / "_store")
+        h1, p1 = store.add_bytes(b"pcb photo", ".JPG")
+        h2, p2 = store.add_bytes(memoryview(b"pcb photo"), ".jpg")
+        assert h1 == h2 == sha256_bytes(b"pcb photo")
+        assert p1 == p2 and p1.suffix == ".jpg"
+        assert sha256_file(str(p1)) == h1
+        assert hash_file(str(p1)) == h1  # usable as the inference cache's image_hash
+        assert len(list((Path(tmp) / "_store" / "objects").rglob("*.jpg"))) == 1
+        h3, _ = store.add_bytes(b"another photo", ".jpg")
+        assert h3 != h1
+
+
+def test_job_key_depends_on_image_models_and_config():
+    with tempfile.TemporaryDirectory() as tmp:
+        model_a = Path(tmp) / "a.onnx"
+        model_b = Path(tmp) / "b.onnx"
+        model_a.write_bytes(b"weights")
+        model_b.write_bytes(b"weights")
+        key = ContentStore.job_key("h" * 64, str(model_a), conf=0.25)
+        # Identical model bytes under another name -> same key
+        assert ContentStore.job_key("h" * 64, str(model_b), conf=0.25) == key
+        assert ContentStore.job_key("g" * 64, str(model_a), conf=0.25) != key
+        assert ContentStore.job_key("h" * 64, str(model_a), conf=0.3) != key
+        assert ContentStore.job_key("h" * 64, str(model_a), None, conf=0.25) == key
+        assert ContentStore.job_key("h" * 64, str(model_a), str(model_b), conf=0.25) != key
+
+
+def test_link_and_find_job():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ContentStore(Path(tmp) / "_store")
+        job_dir = Path(tmp) / "board_20250101_120000"
+        job_dir.mkdir()
+        assert store.find_job("k" * 64) is None
+        store.link_job("k" * 64, str(job_dir), "h" * 64)
+        # Not a finished job until its metadata.json exists
+        assert store.find_job("k" * 64) is None
+        store.link_job("k" * 64, str(job_dir), "h" * 64)
+        (job_dir / "metadata.json").write_text("{}")
+        assert store.find_job("k" * 64) == job_dir.resolve()
+        # Deleting the job folder drops the link
+        (job_dir / "metadata.json").unlink()
+        job_dir.rmdir()
+        assert store.find_job("k" * 64) is None
+        assert not list((Path(tmp) / "_store" / "jobs").glob("*.json"))
+
+
+if __name__ == "__main__":
+    print("Testing content store...")
+    print("=" * 60)
+    for test in (test_objects_are_stored_once, test_job_key_depends_on_image_models_and_config,
+                 test_link_and_find_job):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
+    print("✅ All content store tests passed!")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for the packed crop archive (round trip, crops.pack#N
+references, unpack, CropEngine.pack_crops).
+
+Usage:
+    python test_crop_archive.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from crop import CropEngine
+from crop_archive import (PACK_NAME, CropArchive, read_crop, resolve_crop_file,
+                          split_ref, write_archive)
+
+
+def test_round_trip_and_references():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / PACK_NAME
+        blobs = [b"first", b"", b"third crop"]
+        refs = write_archive(str(path), [
+            (f"{i:03d}_IC.jpg", blob, {"class_name": "IC", "bbox": [i, i, i + 1, i + 1]})
+            for i, blob in enumerate(blobs)
+        ])
+        assert refs == [f"{PACK_NAME}#0", f"{PACK_NAME}#1", f"{PACK_NAME}#2"]
+        with CropArchive(str(path)) as archive:
+            assert len(archive) == 3
+            assert [archive.read(i) for i in range(3)] == blobs
+            assert archive.entries[2]["bbox"] == [2, 2, 3, 3]
+            assert archive.index_of("002_IC.jpg") == 2
+        assert read_crop(str(Path(tmp) / refs[2])) == b"third crop"
+        assert resolve_crop_file(tmp, refs[0]) == str(Path(tmp) / refs[0])
+        assert resolve_crop_file(tmp, "000_IC.jpg") == str(Path(tmp) / "crops" / "000_IC.jpg")
+        assert split_ref("jobs/a#b/000_IC.jpg") == ("jobs/a#b/000_IC.jpg", None)
+
+
+def test_unpack_and_rejects_other_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / PACK_NAME
+        write_archive(str(path), [("000_Led.png", b"png bytes", {})])
+        with CropArchive(str(path)) as archive:
+            written = archive.unpack(str(Path(tmp) / "crops"))
+        assert Path(written[0]).read_bytes() == b"png bytes"
+        other = Path(tmp) / "input.jpg"
+        other.write_bytes(b"\xff\xd8 not an archive at all")
+        try:
+            CropArchive(str(other))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("non-archive accepted")
+
+
+def test_engine_packs_same_bytes_as_files():
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 255, size=(200, 300, 3), dtype=np.uint8)
+    boxes = [[10, 10, 60, 40], [100, 50, 180, 120], [250, 150, 300, 200]]
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = CropEngine(padding=5, workers=2)
+        names = [engine.filename(f"{i:03d}_Resistor") for i in range(len(boxes))]
+        files = engine.save_crops(image, boxes, [Path(tmp) / n for n in names])
+        refs = engine.pack_crops(image, boxes, Path(tmp) / PACK_NAME, names)
+        for ref, file in zip(refs, files):
+            assert read_crop(str(Path(tmp) / ref)) == Path(file).read_bytes()
+        decoded = cv2.imdecode(np.frombuffer(read_crop(str(Path(tmp) / refs[0])), np.uint8),
+                               cv2.IMREAD_COLOR)
+        assert decoded.shape == (40, 60, 3)
+
+
+if __name__ == "__main__":
+    print("Testing crop archive...")
+    print("=" * 60)
+    for test in (test_round_trip_and_references, test_unpack_and_rejects_other_files,
+                 test_engine_packs_same_bytes_as_files):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
+    print("✅ All crop archive tests passed!")
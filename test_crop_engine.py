@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared crop engine (zero-copy crop views, parallel
+encoding identical to one-by-one writing, formats, EXIF-corrected
+re-reads in ComponentCropper).
+
+Usage:
+    python test_crop_engine.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from crop import ComponentCropper, CropEngine, crop_view
+
+
+def _board(h=240, w=320):
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 255, size=(h, w, 3), dtype=np.uint8)
+
+
+def test_crops_are_padded_views():
+    image = _board()
+    crop = crop_view(image, [100.7, 50.2, 140.0, 80.9], padding=10)
+    assert crop.shape == (50, 60, 3)
+    assert np.shares_memory(crop, image)
+    # Padding is clipped to the image
+    assert crop_view(image, [0, 0, 5, 5], padding=10).shape == (15, 15, 3)
+
+
+def test_parallel_output_matches_sequential_imwrite():
+    image = _board()
+    boxes = [[x, y, x + 30, y + 20] for x in range(0, 280, 40) for y in range(0, 200, 50)]
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = CropEngine(padding=10, workers=4)
+        paths = engine.save_crops(image, boxes, [Path(tmp) / engine.filename(f"{i:03d}")
+                                                 for i in range(len(boxes))])
+        assert [Path(p).name for p in paths] == [f"{i:03d}.jpg" for i in range(len(boxes))]
+        for i, bbox in enumerate(boxes):
+            reference = Path(tmp) / f"ref_{i:03d}.jpg"
+            cv2.imwrite(str(reference), crop_view(image, bbox, 10))
+            assert Path(paths[i]).read_bytes() == reference.read_bytes()
+
+
+def test_formats_and_quality():
+    image = _board()
+    with tempfile.TemporaryDirectory() as tmp:
+        png = CropEngine(0, "png").save_crops(image, [[0, 0, 64, 48]], [Path(tmp) / "c.png"])[0]
+        assert np.array_equal(cv2.imread(png), image[:48, :64])
+        small = CropEngine(0, "webp", quality=20).encode(image)
+        large = CropEngine(0, "webp", quality=95).encode(image)
+        assert len(small) < len(large)
+    try:
+        CropEngine(image_format="gif")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown format accepted")
+
+
+def test_cropper_reads_exif_orientation():
+    # Stored 320x240 with orientation 6: displayed (and detected) as 240x320
+    stored = _board()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "board.jpg"
+        pil = Image.fromarray(stored[:, :, ::-1])
+        exif = pil.getexif()
+        exif[0x0112] = 6
+        pil.save(path, exif=exif, quality=95)
+        detections = [{'class_name': 'IC', 'confidence': 0.9, 'bbox': [200, 280, 240, 320]}]
+        cropper = ComponentCropper(padding=0)
+        saved = cropper.crop_from_detections(str(path), detections, tmp, save_metadata=False)
+        # Only valid within the rotated frame (x up to 240, y up to 320)
+        assert cv2.imread(saved[0]).shape[:2] == (40, 40)
+
+
+class _ReducedDetections(list):
+    """Detections whose ``image`` is a half-resolution decode (like DetectionResult)."""
+
+    def __init__(self, detections, image):
+        super().__init__(detections)
+        self.image = image
+        self.image_scale = (2.0, 2.0)
+
+
+def test_cropper_ignores_reduced_decode():
+    full = _board()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "board.png"
+        cv2.imwrite(str(path), full)
+        detections = _ReducedDetections(
+            [{'class_name': 'IC', 'confidence': 0.9, 'bbox': [200, 160, 260, 200]}],
+            image=cv2.resize(full, (160, 120)),
+        )
+        saved = ComponentCropper(padding=0, image_format="png").crop_from_detections(
+            str(path), detections, tmp, save_metadata=False)
+        # Cut from the full-resolution file, not the half-size image
+        assert np.array_equal(cv2.imread(saved[0]), full[160:200, 200:260])
+
+
+if __name__ == "__main__":
+    print("Testing crop engine...")
+    print("=" * 60)
+    for test in (test_crops_are_padded_views, test_parallel_output_matches_sequential_imwrite,
+                 test_formats_and_quality, test_cropper_reads_exif_orientation,
+                 test_cropper_ignores_reduced_decode):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
+    print("✅ All crop engine tests passed!")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Test script for the one-transaction job logging (log_job_bulk /
+log_jobs_bulk): statement parameters, ids drawn from the sequences in
+input order, crop ids aligned with crop_paths, and the fallbacks for
+databases without migrations 002 / 003.
+
+Runs against a recording cursor, no database server needed.
+
+Usage:
+    python test_database_bulk.py
+"""
+
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import psycopg2.errors
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import database
+from database import IMAGE_BY_HASH_SQL, DatabaseManager
+
+
+class _Cursor:
+    """Records statements and answers them like the nuts_vision schema would."""
+
+    def __init__(self, logged_folders=(), has_content_hash=True, has_timings=True):
+        self.logged_folders = set(logged_folders)
+        self.has_content_hash = has_content_hash
+        self.has_timings = has_timings
+        self.statements = []
+        self.rows = {}  # execute_values: table -> inserted rows
+        self.sequences = {'detections': 100, 'ics_cropped': 500}
+        self.next_job_id = 41
+        self._result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        sql = " ".join(sql.split())
+        self.statements.append((sql, params))
+        if sql == " ".join(IMAGE_BY_HASH_SQL.split()):
+            if not self.has_content_hash:
+                raise psycopg2.errors.UndefinedColumn('column "content_hash" does not exist')
+            self._result = [(7,)]
+        elif sql.startswith("INSERT INTO images_input"):
+            self._result = [(8,)]
+        elif sql.startswith("INSERT INTO log_jobs"):
+            self.next_job_id += 1
+            self._result = [(self.next_job_id,)]
+        elif sql.startswith("SELECT nextval"):
+            table, _, count = params
+            start = self.sequences[table]
+            self.sequences[table] += count
+            self._result = [(start + i,) for i in range(count)]
+        elif sql.startswith("SELECT 1 FROM log_jobs"):
+            self._result = [(1,)] if params[0] in self.logged_folders else []
+        elif sql.startswith("UPDATE log_jobs") and "_ms" in sql and not self.has_timings:
+            raise psycopg2.errors.UndefinedColumn('column "decode_ms" does not exist')
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+    def fetchall(self):
+        return list(self._result)
+
+    def executed(self, prefix):
+        return [(sql, params) for sql, params in self.statements if sql.startswith(prefix)]
+
+
+class _Connection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self, **kwargs):
+        return self._cursor
+
+
+class _StubManager(DatabaseManager):
+    """DatabaseManager whose connection hands out one recording cursor."""
+
+    def __init__(self, cursor):
+        super().__init__()
+        self.stub = cursor
+
+    @contextmanager
+    def get_connection(self):
+        execute_values = database.execute_values
+        database.execute_values = _record_execute_values
+        try:
+            yield _Connection(self.stub)
+        finally:
+            database.execute_values = execute_values
+
+
+def _record_execute_values(cursor, sql, argslist, page_size=100):
+    table = sql.split()[2]
+    cursor.rows.setdefault(table, []).extend(argslist)
+
+
+DETECTIONS = [
+    {'class_name': 'IC', 'confidence': 0.91, 'bbox': [10, 20, 30, 40]},
+    {'class_name': 'resistor', 'confidence': 0.55, 'bbox': [1, 2, 3, 4]},
+    {'class_name': 'IC', 'confidence': 0.73, 'bbox': [5, 6, 7, 8]},
+]
+
+
+def test_ids_follow_input_order_and_crop_gaps():
+    cursor = _Cursor()
+    db = _StubManager(cursor)
+    result = db.log_job_bulk(
+        "board.jpg", "/in/board.jpg", "yolov8n.pt", DETECTIONS,
+        crop_paths=["/out/0.jpg", None, "/out/2.jpg"], format="jpg",
+        job_folder_path="/out", content_hash="h" * 64,
+    )
+    assert result == {'image_id': 7, 'job_id': 42, 'detection_ids': [100, 101, 102],
+                      'cropped_ids': [500, None, 501]}
+
+    (_, params), = cursor.executed(" ".join(IMAGE_BY_HASH_SQL.split()))
+    assert params == ("board.jpg", "/in/board.jpg", "jpg", "h" * 64)
+    assert not cursor.executed("INSERT INTO images_input (file_name, file_path, format) VALUES")
+    assert [params for _, params in cursor.executed("SELECT nextval")] == [
+        ('detections', 'detection_id', 3), ('ics_cropped', 'cropped_id', 2)]
+    assert cursor.rows['detections'] == [
+        (100, 42, 'IC', 0.91, 10.0, 20.0, 30.0, 40.0),
+        (101, 42, 'resistor', 0.55, 1.0, 2.0, 3.0, 4.0),
+        (102, 42, 'IC', 0.73, 5.0, 6.0, 7.0, 8.0),
+    ]
+    # Crop links point at the detection of the same index, skipping the gap
+    assert cursor.rows['ics_cropped'] == [(500, 42, 100, "/out/0.jpg"), (501, 42, 102, "/out/2.jpg")]
+    assert not cursor.executed("UPDATE log_jobs")
+
+
+def test_missing_timing_columns_still_end_the_job():
+    cursor = _Cursor(has_timings=False)
+    db = _StubManager(cursor)
+    db.log_job_bulk("board.jpg", "/in/board.jpg", "yolov8n.pt", DETECTIONS[:1],
+                    ended_at="2025-01-01T12:00:00", timings={'decode': 4.5, 'total': 20})
+    updates = cursor.executed("UPDATE log_jobs")
+    assert updates[0][1] == ["2025-01-01T12:00:00", 4.5, 20.0, 42]
+    assert "decode_ms = %s, total_ms = %s" in updates[0][0]
+    # Migration 002 fallback: rolled back, then ended without the timings
+    assert ("ROLLBACK TO SAVEPOINT end_job", None) in cursor.statements
+    assert updates[1][1] == ("2025-01-01T12:00:00", 42)
+    assert "_ms" not in updates[1][0]
+
+
+def test_missing_content_hash_column_inserts_plain_row():
+    cursor = _Cursor(has_content_hash=False)
+    db = _StubManager(cursor)
+    result = db.log_job_bulk("board.jpg", "/in/board.jpg", "yolov8n.pt", [],
+                             content_hash="h" * 64)
+    assert result == {'image_id': 8, 'job_id': 42, 'detection_ids': [], 'cropped_ids': []}
+    assert ("ROLLBACK TO SAVEPOINT image_by_hash", None) in cursor.statements
+    # No detections or crops: no sequence round trip
+    assert not cursor.executed("SELECT nextval")
+
+
+def test_jobs_bulk_skips_logged_folders():
+    cursor = _Cursor(logged_folders={"/out/a"})
+    db = _StubManager(cursor)
+    jobs = [
+        {'file_name': "a.jpg", 'file_path': "/in/a.jpg", 'model': "m", 'detections': DETECTIONS[:1],
+         'crop_paths': ["/out/a/0.jpg"], 'job_folder_path': "/out/a"},
+        {'file_name': "b.jpg", 'file_path': "/in/b.jpg", 'model': "m", 'detections': DETECTIONS[:2],
+         'crop_paths': [None, "/out/b/1.jpg"], 'job_folder_path': "/out/b"},
+    ]
+    results = db.log_jobs_bulk(jobs, skip_logged=True)
+    assert results[0] is None
+    assert results[1] == {'image_id': 8, 'job_id': 42, 'detection_ids': [100, 101],
+                          'cropped_ids': [None, 500]}
+    assert [params for _, params in cursor.executed("SELECT 1 FROM log_jobs")] == [
+        ("/out/a",), ("/out/b",)]
+    assert [params for _, params in cursor.executed("INSERT INTO log_jobs")] == [
+        (8, "m", None, "/out/b", None)]
+    # Without skip_logged both are written
+    cursor = _Cursor(logged_folders={"/out/a"})
+    assert None not in _StubManager(cursor).log_jobs_bulk(jobs)
+    assert not cursor.executed("SELECT 1 FROM log_jobs")
+
+
+if __name__ == "__main__":
+    print("Testing bulk job logging...")
+    print("=" * 60)
+    for test in (test_ids_follow_input_order_and_crop_gaps,
+                 test_missing_timing_columns_still_end_the_job,
+                 test_missing_content_hash_column_inserts_plain_row,
+                 test_jobs_bulk_skips_logged_folders):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
+    print("✅ All bulk logging tests passed!")
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test script for the asynchronous database writer (batching, spill to the
+journal while the database is down, ordered idempotent replay, rejected
+records).
+
+Usage:
+    python test_db_writer.py
+"""
+
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import psycopg2
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from db_writer import DBWriter, journal_backlog
+
+
+class _FlakyDatabase:
+    """Stands in for DatabaseManager.log_jobs_bulk; can be switched off."""
+
+    def __init__(self):
+        self.up = True
+        self.delay = 0.0  # between the skip_logged check and the insert
+        self.jobs = []
+        self.transactions = 0
+        self.lock = threading.Lock()
+
+    def log_jobs_bulk(self, jobs, skip_logged=False):
+        if not self.up:
+            raise psycopg2.OperationalError("could not connect to server")
+        if any(job["file_name"] == "bad.jpg" for job in jobs):
+            raise psycopg2.DataError("value too long")
+        with self.lock:
+            logged = {job["job_folder_path"] for job in self.jobs}
+        time.sleep(self.delay)
+        with self.lock:
+            self.transactions += 1
+            for job in jobs:
+                if not (skip_logged and job["job_folder_path"] in logged):
+                    self.jobs.append(job)
+        return [{"job_id": i} for i in range(len(jobs))]
+
+
+def _job(i, name=None):
+    return {"file_name": name or f"board{i}.jpg", "file_path": f"/in/board{i}.jpg", "model": "m.pt",
+            "detections": [], "job_folder_path": f"/jobs/board{i}"}
+
+
+def test_batches_jobs():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _FlakyDatabase()
+        writer = DBWriter(db, str(Path(tmp) / "journal.jsonl"), batch_size=8)
+        for i in range(20):
+            writer.submit(_job(i))
+        assert writer.flush(5)
+        writer.close()
+        assert [job["file_name"] for job in db.jobs] == [f"board{i}.jpg" for i in range(20)]
+        assert db.transactions < 20
+        assert "queued_at" not in db.jobs[0]
+        assert writer.stats()["written"] == 20
+
+
+def test_spills_while_down_and_replays_in_order():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = Path(tmp) / "journal.jsonl"
+        db = _FlakyDatabase()
+        db.up = False
+        writer = DBWriter(db, str(journal), retry_interval=0.05)
+        for i in range(5):
+            writer.submit(_job(i))
+        assert writer.flush(5)
+        stats = writer.stats()
+        assert (stats["journal_pending"], stats["db_available"]) == (5, False)
+        assert stats["replay_lag_s"] >= 0 and journal_backlog(str(journal))[0] == 5
+
+        db.up = True
+        writer.submit(_job(5))  # queued behind the journal
+        writer.close()
+        assert [job["file_name"] for job in db.jobs] == [f"board{i}.jpg" for i in range(6)]
+        assert writer.stats()["journal_pending"] == 0
+        assert not journal.exists()
+
+
+def test_replay_after_restart_is_idempotent():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = Path(tmp) / "journal.jsonl"
+        records = [dict(_job(i), queued_at=1.0) for i in range(3)]
+        journal.write_text("".join(json.dumps(r) + "\n" for r in records) + '{"torn')
+        db = _FlakyDatabase()
+        db.jobs.append(_job(0))  # logged before a crash mid-replay
+        writer = DBWriter(db, str(journal), retry_interval=0.05)
+        assert writer.stats()["journal_pending"] == 3
+        writer.close()
+        assert [job["file_name"] for job in db.jobs] == ["board0.jpg", "board1.jpg", "board2.jpg"]
+
+
+def test_concurrent_replays_do_not_duplicate():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = Path(tmp) / "journal.jsonl"
+        records = [dict(_job(i), queued_at=1.0) for i in range(4)]
+        journal.write_text("".join(json.dumps(r) + "\n" for r in records))
+        db = _FlakyDatabase()
+        db.delay = 0.05  # widen the check-then-insert window
+        # Two writers (e.g. two processes) sharing one journal replay at once
+        writers = [DBWriter(db, str(journal), batch_size=2) for _ in range(2)]
+        closers = [threading.Thread(target=w.close) for w in writers]
+        for t in closers:
+            t.start()
+        for t in closers:
+            t.join()
+        assert sorted(job["file_name"] for job in db.jobs) == [f"board{i}.jpg" for i in range(4)]
+
+
+def test_rejected_record_does_not_block_others():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _FlakyDatabase()
+        writer = DBWriter(db, str(Path(tmp) / "journal.jsonl"))
+        for job in (_job(0), _job(1, "bad.jpg"), _job(2)):
+            writer.submit(job)
+        writer.close()
+        assert [job["file_name"] for job in db.jobs] == ["board0.jpg", "board2.jpg"]
+        rejected = (Path(tmp) / "journal.rejected.jsonl").read_text().splitlines()
+        assert json.loads(rejected[0])["error"] == "value too long"
+        assert writer.stats()["rejected"] == 1
+
+
+if __name__ == "__main__":
+    print("Testing database writer...")
+    print("=" * 60)
+    for test in (test_batches_jobs, test_spills_while_down_and_replays_in_order,
+                 test_replay_after_restart_is_idempotent, test_concurrent_replays_do_not_duplicate,
+                 test_rejected_record_does_not_block_others):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
+    print("✅ All database writer tests passed!")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for the EXIF-aware decoder (orientation handling matches
+PIL's exif_transpose, reduced decodes report the right scale).
+
+Usage:
+    python test_decode.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from detect import decode_image
+from imaging import scale_boxes
+
+
+def _board(width=400, height=300):
+    rng = np.random.default_rng(0)
+    image = (rng.random((height, width, 3)) * 255).astype(np.uint8)
+    return cv2.GaussianBlur(image, (9, 9), 3)
+
+
+def _save_with_orientation(path, rgb, orientation):
+    pil_img = Image.fromarray(rgb)
+    exif = pil_img.getexif()
+    exif[0x0112] = orientation
+    pil_img.save(path, exif=exif, quality=95)
+
+
+def test_orientations_match_pil_exif_transpose():
+    rgb = _board()
+    with tempfile.TemporaryDirectory() as tmp:
+        for orientation in range(1, 9):
+            path = str(Path(tmp) / f"o{orientation}.jpg")
+            _save_with_orientation(path, rgb, orientation)
+            expected = np.asarray(ImageOps.exif_transpose(Image.open(path)).convert("RGB"))
+            image, scale = decode_image(path)
+            assert image.shape == expected.shape, orientation
+            assert np.abs(image[:, :, ::-1].astype(int) - expected).max() <= 1, orientation
+            assert scale == (1.0, 1.0)
+
+
+def test_reduced_decode_scale_maps_to_full_resolution():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "odd.jpg")
+        cv2.imwrite(path, _board(1001, 757))
+        for reduction in (2, 4, 8):
+            image, (sx, sy) = decode_image(path, reduction=reduction)
+            assert image.shape[1] * sx == 1001 and image.shape[0] * sy == 757
+            full = scale_boxes(np.array([[0, 0, image.shape[1], image.shape[0]]]), (sx, sy))
+            assert np.allclose(full, [[0, 0, 1001, 757]])
+
+
+def test_reduced_decode_of_rotated_image():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "rot.jpg")
+        _save_with_orientation(path, _board(400, 300), 6)
+        image, (sx, sy) = decode_image(path, reduction=4)
+        assert image.shape[:2] == (100, 75)
+        assert (sx, sy) == (4.0, 4.0)
+
+
+if __name__ == "__main__":
+    print("Testing image decoding...")
+    print("=" * 60)
+    for test in (test_orientations_match_pil_exif_transpose,
+                 test_reduced_decode_scale_maps_to_full_resolution,
+                 test_reduced_decode_of_rotated_image):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
+    print("✅ All decoding tests passed!")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-disk inference cache (keys, confidence floor,
+hit/miss counters, LRU eviction by size).
+
+Usage:
+    python test_inference_cache.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from inference_cache import InferenceCache, filter_detections, hash_array
+
+
+def _detections(n, seed=0):
+    rng = np.random.default_rng(seed)
+    dets = []
+    for i in range(n):
+        x, y = rng.uniform(0, 1000, 2)
+        dets.append({
+            'class_id': i % 3,
+            'class_name': ['IC', 'Resistor', 'Capacitor'][i % 3],
+            'confidence': float(np.float32(0.1 + 0.8 * i / max(1, n - 1))),
+            'bbox': [float(x), float(y), float(x + 20), float(y + 10)],
+        })
+    return dets
+
+
+def _model(tmp, content=b"weights"):
+    path = Path(tmp) / "model.onnx"
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_keys_depend_on_image_model_and_flags():
+    with tempfile.TemporaryDirectory() as tmp:
+        model = _model(tmp)
+        a = hash_array(np.zeros((4, 4, 3), np.uint8))
+        b = hash_array(np.ones((4, 4, 3), np.uint8))
+        key = InferenceCache.make_key(a, model, apply_clahe=True)
+        assert key == InferenceCache.make_key(a, model, apply_clahe=True)
+        assert key != InferenceCache.make_key(b, model, apply_clahe=True)
+        assert key != InferenceCache.make_key(a, model, apply_clahe=False)
+        _model(tmp, b"other weights")
+        assert key != InferenceCache.make_key(a, model, apply_clahe=True)
+
+
+def test_hit_miss_and_confidence_floor():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = InferenceCache(Path(tmp) / "cache")
+        dets = _detections(10)
+        assert cache.get("k" * 32) is None
+        cache.put("k" * 32, dets, conf_floor=0.1)
+        cached = cache.get("k" * 32, min_conf=0.5)
+        assert np.allclose([d['bbox'] for d in filter_detections(cached, 0.5)],
+                           [d['bbox'] for d in filter_detections(dets, 0.5)])
+        # Stored at 0.1: cannot answer a 0.05 threshold
+        assert cache.get("k" * 32, min_conf=0.05) is None
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 1)
+
+
+def test_lru_eviction_by_size():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = InferenceCache(Path(tmp) / "cache")
+        cache.put("a" * 32, _detections(200))
+        entry_bytes = sum(cache._sizes.values())
+        cache.max_bytes = int(entry_bytes * 2.5)
+        cache.put("b" * 32, _detections(200, seed=1))
+        assert cache.get("a" * 32) is not None      # a is now the most recent
+        cache.put("c" * 32, _detections(200, seed=2))  # evicts b
+        assert cache.get("b" * 32) is None
+        assert cache.get("a" * 32) is not None
+        assert cache.evictions == 1
+        # A new instance on the same directory sees the surviving entries
+        assert len(InferenceCache(Path(tmp) / "cache")) == 2
+
+
+def test_class_filter():
+    dets = _detections(9)
+    kept = filter_detections(dets, 0.0, class_filter=['IC'])
+    assert kept and all(d['class_name'] == 'IC' for d in kept)
+
+
+if __name__ == "__main__":
+    print("Testing inference cache...")
+    print("=" * 60)
+    for test in (test_keys_depend_on_image_model_and_flags, test_hit_miss_and_confidence_floor,
+                 test_lru_eviction_by_size, test_class_filter):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
+    print("✅ All inference cache tests passed!")
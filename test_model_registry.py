@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for the process-wide model registry (caching by path/mtime/
+backend, reload on file change, LRU eviction under the memory cap).
+
+Usage:
+    python test_model_registry.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+import json
+
+from model_registry import (ModelRegistry, MEMORY_FACTOR, discover_models,
+                            quantized_model_path, quantization_report_path)
+
+
+class CountingRegistry(ModelRegistry):
+    """Registry whose "models" are plain objects, counting each load."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, warmup=False, **kwargs)
+        self.loaded = []
+
+    def _load(self, model_path, backend, intra_op_threads, inter_op_threads):
+        self.loaded.append(model_path)
+        return object()
+
+
+def _weights(directory, name, size_bytes):
+    path = Path(directory) / name
+    path.write_bytes(b"\0" * size_bytes)
+    return str(path)
+
+
+def test_same_model_is_loaded_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _weights(tmp, "a.pt", 1024)
+        registry = CountingRegistry()
+        first = registry.get(path)
+        assert registry.get(path) is first
+        assert registry.loaded == [path]
+        assert registry.stats()['hits'] == 1
+        # A different backend is a different model
+        registry.get(path, backend='onnxruntime')
+        assert len(registry.loaded) == 2
+
+
+def test_changed_file_is_reloaded():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _weights(tmp, "a.pt", 1024)
+        registry = CountingRegistry()
+        first = registry.get(path)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert registry.get(path) is not first
+        # The stale copy is dropped rather than kept alongside the new one
+        assert len(registry) == 1
+
+
+def test_lru_eviction_under_memory_cap():
+    with tempfile.TemporaryDirectory() as tmp:
+        mb = 1024 * 1024
+        # Room for two 1 MB weight files once the memory factor is applied
+        registry = CountingRegistry(max_mb=2 * MEMORY_FACTOR)
+        a, b, c = (_weights(tmp, f"{n}.pt", mb) for n in "abc")
+        registry.get(a)
+        registry.get(b)
+        registry.get(a)          # a is now the most recently used
+        registry.get(c)          # evicts b, the least recently used
+        paths = {Path(m['path']).name for m in registry.stats()['models']}
+        assert paths == {"a.pt", "c.pt"}
+        assert registry.evictions == 1
+
+
+def test_shared_model_shares_its_call_lock():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _weights(tmp, "a.pt", 1024)
+        registry = CountingRegistry()
+        model, lock = registry.get_with_lock(path)
+        other_model, other_lock = registry.get_with_lock(path)
+        assert other_model is model and other_lock is lock and lock is not None
+        # ONNX Runtime sessions are called concurrently without a lock
+        assert registry.get_with_lock(path, backend='onnxruntime')[1] is None
+
+
+def test_discover_models_lists_int8_variants():
+    with tempfile.TemporaryDirectory() as tmp:
+        fp32 = _weights(tmp, "smd_comp.onnx", 10)
+        int8 = quantized_model_path(fp32)
+        assert int8.name == "smd_comp.int8.onnx"
+        int8.write_bytes(b"\0")
+        _weights(tmp, "smd_comp.pt", 10)
+        quantization_report_path(int8).write_text(
+            json.dumps({'agreement': 0.98, 'speedup': 2.1, 'passed': True}))
+        models = {m['name']: m for m in discover_models(tmp)}
+        assert set(models) == {"smd_comp.onnx", "smd_comp.int8.onnx", "smd_comp.pt"}
+        assert models["smd_comp.int8.onnx"]['format'] == 'ONNX INT8'
+        assert models["smd_comp.int8.onnx"]['report']['passed'] is True
+
+
+if __name__ == "__main__":
+    print("Testing model registry...")
+    print("=" * 60)
+    for test in (test_same_model_is_loaded_once, test_changed_file_is_reloaded,
+                 test_lru_eviction_under_memory_cap, test_shared_model_shares_its_call_lock,
+                 test_discover_models_lists_int8_variants):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
+    print("✅ All model registry tests passed!")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the multi-process worker pool (per-process state, input
+order, failed items, crashed workers).
+
+Usage:
+    python test_parallel.py
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from parallel import WorkerPool, threads_per_worker
+
+
+class _Worker:
+    """Per-process state built once by the pool (stands in for a pipeline)."""
+
+    def __init__(self, offset):
+        self.offset = offset
+        self.pid = os.getpid()
+        self.threads = os.environ.get("OMP_NUM_THREADS")
+
+
+def _add(worker, value, delay=0.0):
+    time.sleep(delay)
+    if value < 0:
+        raise ValueError(f"negative value {value}")
+    return value + worker.offset, worker.pid, worker.threads
+
+
+def _crash_on(worker, value):
+    if value == 3:
+        os._exit(1)  # simulates a worker killed mid-image (e.g. out of memory)
+    return value + worker.offset
+
+
+def test_results_in_input_order():
+    # Early items are slow, so later ones finish first
+    items = [(i, 0.2 if i < 2 else 0.0) for i in range(8)]
+    with WorkerPool(_Worker, {"offset": 100}, workers=2, threads=1) as pool:
+        results = pool.map(_add, items)
+    assert [value for ok, (value, _, _) in results] == [100 + i for i in range(8)]
+    assert {threads for ok, (_, _, threads) in results} == {"1"}
+    assert len({pid for ok, (_, pid, _) in results}) == 2
+    assert pool.last_stats["images"] == 8 and pool.last_stats["failed"] == 0
+
+
+def test_failed_item_does_not_stop_the_pool():
+    with WorkerPool(_Worker, {"offset": 0}, workers=2) as pool:
+        results = pool.map(_add, [(1,), (-1,), (2,)])
+    assert results[0][0] and results[2][0]
+    assert results[1] == (False, "ValueError: negative value -1")
+    assert pool.last_stats["failed"] == 1
+
+
+def test_crashed_worker_is_replaced():
+    with WorkerPool(_Worker, {"offset": 10}, workers=2) as pool:
+        results = pool.map(_crash_on, [(i,) for i in range(6)])
+    assert [ok for ok, _ in results] == [True, True, True, False, True, True]
+    assert [value for ok, value in results if ok] == [10, 11, 12, 14, 15]
+    assert "died" in results[3][1]
+
+
+def test_threads_per_worker():
+    cpus = os.cpu_count() or 1
+    assert threads_per_worker(1) == cpus
+    assert threads_per_worker(cpus * 2) == 1
+
+
+if __name__ == "__main__":
+    print("Testing worker pool...")
+    print("=" * 60)
+    for test in (test_results_in_input_order, test_failed_item_does_not_stop_the_pool,
+                 test_crashed_worker_is_replaced, test_threads_per_worker):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
+    print("✅ All worker pool tests passed!")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for letterbox-first preprocessing (same filters as the
+full-resolution path, reused buffers, batch items safe to keep).
+
+Usage:
+    python test_preprocess.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from detect import ComponentDetector
+from imaging import letterbox
+from model_registry import ModelRegistry
+
+
+class _NoModelRegistry(ModelRegistry):
+    """Registry that skips loading weights — only preprocessing is tested."""
+
+    def __init__(self):
+        super().__init__(warmup=False)
+
+    def _load(self, model_path, backend, intra_op_threads, inter_op_threads):
+        return object()
+
+
+def _detector(tmp, order):
+    weights = Path(tmp) / "model.pt"
+    weights.write_bytes(b"\0")
+    return ComponentDetector(str(weights), registry=_NoModelRegistry(), preprocess_order=order)
+
+
+def _image(width=1200, height=900):
+    rng = np.random.default_rng(0)
+    return (rng.random((height, width, 3)) * 255).astype(np.uint8)
+
+
+def test_letterboxed_filters_match_preprocess_image():
+    with tempfile.TemporaryDirectory() as tmp:
+        detector = _detector(tmp, 'letterbox')
+        boxed, _, _ = letterbox(_image(), detector.imgsz)
+        for clahe, sharpen in ((False, False), (True, False), (False, True), (True, True)):
+            expected, _ = detector.preprocess_image(boxed, apply_clahe=clahe, apply_sharpen=sharpen)
+            actual = detector.preprocess_letterboxed(boxed, apply_clahe=clahe, apply_sharpen=sharpen)
+            assert np.array_equal(actual, expected), (clahe, sharpen)
+
+
+def test_scratch_buffers_are_reused():
+    with tempfile.TemporaryDirectory() as tmp:
+        detector = _detector(tmp, 'letterbox')
+        boxed, _, _ = letterbox(_image(), detector.imgsz)
+        first = detector.preprocess_letterboxed(boxed, apply_clahe=True)
+        second = detector.preprocess_letterboxed(boxed, apply_clahe=True)
+        assert first is second
+
+
+def test_batch_items_own_their_input():
+    with tempfile.TemporaryDirectory() as tmp:
+        detector = _detector(tmp, 'letterbox')
+        a = detector.prepare_batch_item(_image())
+        b = detector.prepare_batch_item(_image(800, 800))
+        assert a['input'] is not b['input']
+        assert a['input'].shape == (detector.imgsz, detector.imgsz, 3)
+        assert a['shape'] == (900, 1200)
+
+
+if __name__ == "__main__":
+    print("Testing letterbox-first preprocessing...")
+    print("=" * 60)
+    for test in (test_letterboxed_filters_match_preprocess_image,
+                 test_scratch_buffers_are_reused,
+                 test_batch_items_own_their_input):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
+    print("✅ All preprocessing tests passed!")
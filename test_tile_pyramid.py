@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the deep-zoom tile pyramid (levels, region rendering,
+overview size, lazy build).
+
+Usage:
+    python test_tile_pyramid.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from tile_pyramid import MANIFEST_NAME, build_pyramid, ensure_pyramid, pyramid_dir
+
+
+def _image(h=300, w=500):
+    """Smooth gradient (JPEG tiles stay close to the source)."""
+    ys, xs = np.mgrid[0:h, 0:w]
+    return np.dstack([xs * 255 // w, ys * 255 // h, (xs + ys) * 255 // (w + h)]).astype(np.uint8)
+
+
+def test_levels_and_tiles():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "input.png"
+        cv2.imwrite(str(path), _image())
+        pyramid = build_pyramid(str(path), tile_size=64)
+        assert pyramid.directory == pyramid_dir(str(path)) == Path(tmp) / "tiles" / "input"
+        grids = [(l['width'], l['height'], l['cols'], l['rows']) for l in pyramid.levels]
+        assert grids == [(500, 300, 8, 5), (250, 150, 4, 3), (125, 75, 2, 2), (63, 38, 1, 1)]
+        edge = cv2.imread(str(pyramid.directory / "0" / "7_4.jpg"))
+        assert edge.shape[:2] == (300 - 4 * 64, 500 - 7 * 64)
+
+
+def test_region_and_overview():
+    image = _image()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "result.png"
+        cv2.imwrite(str(path), image)
+        pyramid = build_pyramid(str(path), tile_size=64, quality=95)
+        # Full resolution across tile borders
+        detail = pyramid.region(50, 40, 210, 170, max_size=1000)
+        assert detail.shape == (130, 160, 3)
+        assert np.abs(detail.astype(int) - image[40:170, 50:210]).mean() < 3
+        # Coarse levels for a downscaled view
+        overview = pyramid.overview(max_size=100)
+        assert max(overview.shape[:2]) == 100 and overview.shape[1] == 100
+        reference = cv2.resize(image, (100, 60), interpolation=cv2.INTER_AREA)
+        assert np.abs(overview.astype(int) - reference).mean() < 4
+
+
+def test_ensure_builds_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "input.png"
+        cv2.imwrite(str(path), _image())
+        first = ensure_pyramid(str(path), tile_size=128)
+        manifest = first.directory / MANIFEST_NAME
+        mtime = manifest.stat().st_mtime_ns
+        second = ensure_pyramid(str(path), tile_size=128)
+        assert manifest.stat().st_mtime_ns == mtime
+        assert second.levels == first.levels
+
+
+if __name__ == "__main__":
+    print("Testing tile pyramid...")
+    print("=" * 60)
+    for test in (test_levels_and_tiles, test_region_and_overview, test_ensure_builds_once):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
+    print("✅ All tile pyramid tests passed!")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-stage timers.
+
+Usage:
+    python test_timing.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from timing import StageTimer, timed
+
+
+def test_stages_accumulate_in_canonical_order():
+    timer = StageTimer()
+    with timer.stage("encode"):
+        time.sleep(0.002)
+    with timer.stage("decode"):
+        pass
+    with timer.stage("encode"):
+        time.sleep(0.002)
+    timer.add("custom", 1.5)
+    result = timer.as_dict()
+    assert list(result) == ["decode", "encode", "custom", "total"]
+    assert result["encode"] >= 4.0
+    assert result["total"] >= result["encode"]
+    assert "total" not in timer.as_dict(total=False)
+
+
+def test_merge_with_prefix():
+    timer, ic = StageTimer(), StageTimer()
+    ic.add("inference", 3.0)
+    timer.add("inference", 5.0)
+    timer.merge(ic, prefix="ic_")
+    assert timer.get("inference") == 5.0
+    assert timer.get("ic_inference") == 3.0
+
+
+def test_timed_without_timer_is_a_no_op():
+    with timed(None, "decode"):
+        pass
+    timer = StageTimer()
+    with timed(timer, "decode"):
+        pass
+    assert "decode" in timer.as_dict()
+
+
+if __name__ == "__main__":
+    print("Testing stage timers...")
+    print("=" * 60)
+    for test in (test_stages_accumulate_in_canonical_order, test_merge_with_prefix,
+                 test_timed_without_timer_is_a_no_op):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
+    print("✅ All timing tests passed!")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for on-demand (virtual) crops: rendering from input.* and the
+stored boxes, metadata.json#N references, the decoded-input LRU and export.
+
+Usage:
+    python test_virtual_crops.py
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from crop import crop_view
+from virtual_crops import DecodedImageCache, export_crops, load_crop, render_crop
+
+
+def _job(tmp):
+    """Virtual-crop job folder with a lossless input photo."""
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 255, size=(240, 320, 3), dtype=np.uint8)
+    job_dir = Path(tmp) / "board_20250101_120000"
+    job_dir.mkdir()
+    cv2.imwrite(str(job_dir / "input.png"), image)
+    metadata = {
+        "crop_storage": "virtual", "crop_padding": 5, "crop_format": "png",
+        "detections": [
+            {"index": i, "class_name": name, "confidence": 0.9, "bbox": bbox,
+             "crop_file": f"metadata.json#{i}"}
+            for i, (name, bbox) in enumerate([("IC", [10, 20, 60, 70]), ("Led", [200, 100, 230, 140])])
+        ],
+    }
+    (job_dir / "metadata.json").write_text(json.dumps(metadata))
+    return job_dir, image
+
+
+def _decode(data):
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+
+def test_render_matches_crop_of_input():
+    with tempfile.TemporaryDirectory() as tmp:
+        job_dir, image = _job(tmp)
+        expected = crop_view(image, [200, 100, 230, 140], 5)
+        assert np.array_equal(_decode(render_crop(str(job_dir), 1)), expected)
+        assert np.array_equal(_decode(load_crop(str(job_dir / "metadata.json#1"))), expected)
+        assert not (job_dir / "crops").exists()
+
+
+def test_input_cache_is_bounded():
+    with tempfile.TemporaryDirectory() as tmp:
+        job_dir, image = _job(tmp)
+        other = Path(tmp) / "other.png"
+        cv2.imwrite(str(other), image)
+        cache = DecodedImageCache(max_mb=1.5 * image.nbytes / (1024 * 1024))
+        first = cache.get(str(job_dir / "input.png"))
+        assert cache.get(str(job_dir / "input.png")) is first
+        assert not first.flags.writeable
+        cache.get(str(other))  # evicts input.png
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["images"]) == (1, 2, 1)
+
+
+def test_export_to_files_and_pack():
+    with tempfile.TemporaryDirectory() as tmp:
+        job_dir, image = _job(tmp)
+        written = export_crops(str(job_dir))
+        assert [Path(p).name for p in written] == ["000_IC.png", "001_Led.png"]
+        metadata = json.loads((job_dir / "metadata.json").read_text())
+        assert metadata["crop_storage"] == "files"
+        assert [d["crop_file"] for d in metadata["detections"]] == ["000_IC.png", "001_Led.png"]
+        assert np.array_equal(cv2.imread(written[0]), crop_view(image, [10, 20, 60, 70], 5))
+
+        refs = export_crops(str(job_dir), pack=True)
+        assert np.array_equal(_decode(load_crop(refs[1])), crop_view(image, [200, 100, 230, 140], 5))
+        metadata = json.loads((job_dir / "metadata.json").read_text())
+        assert metadata["crop_storage"] == "pack"
+
+
+if __name__ == "__main__":
+    print("Testing virtual crops...")
+    print("=" * 60)
+    for test in (test_render_matches_crop_of_input, test_input_cache_is_bounded,
+                 test_export_to_files_and_pack):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
+    print("✅ All virtual crop tests passed!")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the hot-folder watcher (settle detection, bounded queue,
+worker threads, statistics).
+
+Usage:
+    python test_watch.py
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from watch import HotFolderWatcher
+
+
+class _RecordingPipeline:
+    """Stands in for ComponentAnalysisPipeline.process_image."""
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+        self.lock = threading.Lock()
+
+    def process_image(self, image_path, jobs_base_dir="jobs"):
+        with self.lock:
+            self.calls.append(Path(image_path).name)
+        if Path(image_path).name in self.fail:
+            raise ValueError("unreadable image")
+        return {"job_folder": jobs_base_dir, "reused": Path(image_path).name.startswith("dup")}
+
+
+def test_waits_for_files_to_settle():
+    with tempfile.TemporaryDirectory() as tmp:
+        watcher = HotFolderWatcher(_RecordingPipeline(), tmp, settle_time=0.2)
+        photo = Path(tmp) / "board.jpg"
+        photo.write_bytes(b"x" * 100)
+        (Path(tmp) / "notes.txt").write_text("ignored")
+        (Path(tmp) / ".board2.jpg").write_bytes(b"partial upload")
+        assert watcher.scan() == 0
+        time.sleep(0.25)
+        with open(photo, "ab") as f:  # still being written: settle clock restarts
+            f.write(b"y" * 100)
+        assert watcher.scan() == 0
+        time.sleep(0.25)
+        assert watcher.scan() == 1
+        assert watcher.queue.get_nowait() == str(photo)
+        assert watcher.scan() == 0  # unchanged file is not queued again
+
+
+def test_queue_is_bounded():
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("a.jpg", "b.png", "c.jpeg"):
+            (Path(tmp) / name).write_bytes(b"data")
+        watcher = HotFolderWatcher(_RecordingPipeline(), tmp, queue_size=1, settle_time=0)
+        assert watcher.scan() == 1
+        assert watcher.scan() == 0
+        assert watcher.stats()["pending"] == 2
+        watcher.queue.get_nowait()
+        assert watcher.scan() == 1
+
+
+def test_workers_process_everything():
+    with tempfile.TemporaryDirectory() as tmp:
+        names = [f"board{i}.jpg" for i in range(5)] + ["dup.jpg", "broken.jpg"]
+        for name in names:
+            (Path(tmp) / name).write_bytes(b"data")
+        pipeline = _RecordingPipeline(fail={"broken.jpg"})
+        results = []
+        watcher = HotFolderWatcher(pipeline, tmp, workers=3, queue_size=2, settle_time=0,
+                                   on_result=lambda path, result: results.append(path))
+        watcher.start()
+        deadline = time.monotonic() + 5
+        while len(pipeline.calls) < len(names) and time.monotonic() < deadline:
+            watcher.scan()
+            time.sleep(0.01)
+        watcher.stop()
+        assert sorted(pipeline.calls) == sorted(names)
+        stats = watcher.stats()
+        assert (stats["processed"], stats["reused"], stats["failed"]) == (6, 1, 1)
+        assert (stats["queued"], stats["busy"]) == (0, 0)
+        assert len(results) == 6
+
+
+if __name__ == "__main__":
+    print("Testing hot-folder watcher...")
+    print("=" * 60)
+    for test in (test_waits_for_files_to_settle, test_queue_is_bounded,
+                 test_workers_process_everything):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
+    print("✅ All watcher tests passed!")